@@ -0,0 +1,501 @@
+"""
+Time-partitioned audit log storage and archival to compressed segments.
+
+Live entries stay in ``audit_logs``. On PostgreSQL that table is range
+partitioned by month of ``created_at``: ``ensure_audit_partitions`` keeps a
+partition ready for the current month and ``AUDIT_PARTITIONS_AHEAD`` more,
+and carves one out for any month that ended up in ``audit_logs_default``.
+Queries on a date range then only touch the partitions of those months.
+SQLite keeps one table; retention bounds its size and the ``created_at``
+indexes do the range pruning.
+
+Whole months older than ``AUDIT_RETENTION_DAYS`` are moved out of the
+database into segments: gzipped JSONL files of at most
+``AUDIT_ARCHIVE_SEGMENT_ROWS`` entries (oldest first) under
+``AUDIT_ARCHIVE_DIR``. A segment file is written and fsynced before the
+transaction that deletes its rows and adds its ``audit_archive_segments``
+row commits, and it is never modified afterwards. If the delete removes
+fewer rows than were exported (another worker archived them first), the
+transaction is rolled back and the file removed. An emptied month partition
+is dropped.
+
+``archived_rows`` and ``count_archived`` let the audit queries read both
+sides: the catalog is searched by ``created_at`` range, so only segments
+overlapping the requested window (or lying past a cursor) are opened, and
+decoded segments are kept in a small per-worker LRU. Audit statistics keep
+counting archived entries through the rollups, which are not reduced when
+rows are archived.
+
+The directory must be shared by every host running the API; segments are
+referenced by their path relative to it.
+"""
+
+import asyncio
+import gzip
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.admin.audit_writer import row_from_json, row_to_json
+from app.core.config import settings
+from app.core.logger import LOGS_DIR
+from app.db.database import AsyncSessionLocal
+from app.db.models import AuditArchiveSegment, AuditLog
+from app.utils.counting import mark_written
+from app.utils.pagination import NEXT, Cursor
+
+logger = logging.getLogger("sensesafe.audit_archive")
+
+# Rows per DELETE ... WHERE id IN (...), below every backend's parameter limit
+_DELETE_CHUNK = 500
+
+
+def archive_dir() -> Path:
+    return Path(settings.AUDIT_ARCHIVE_DIR) if settings.AUDIT_ARCHIVE_DIR else LOGS_DIR / "audit_archive"
+
+
+def month_start(ts: datetime) -> datetime:
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def archive_cutoff(now: Optional[datetime] = None) -> Optional[datetime]:
+    """Entries created before this are archived; None when retention is off."""
+    if settings.AUDIT_RETENTION_DAYS <= 0:
+        return None
+    return month_start((now or datetime.utcnow()) - timedelta(days=settings.AUDIT_RETENTION_DAYS))
+
+
+# ---- PostgreSQL partitions --------------------------------------------------
+
+def partition_name(month: datetime) -> str:
+    return f"audit_logs_p{month:%Y_%m}"
+
+
+async def _is_partitioned(db: AsyncSession) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(await db.scalar(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('audit_logs')"
+    )))
+
+
+async def _partitions(db: AsyncSession) -> set:
+    rows = await db.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass('audit_logs')"
+    ))
+    return set(rows)
+
+
+async def ensure_audit_partitions() -> List[str]:
+    """
+    Create the monthly partitions of audit_logs that are missing (PostgreSQL only).
+
+    Covers the current month, ``AUDIT_PARTITIONS_AHEAD`` future months and
+    every month with rows in the default partition; those rows are moved
+    into the new partition. Run at startup and before each archival pass.
+
+    Returns:
+        List[str]: Names of the partitions created
+    """
+    async with AsyncSessionLocal() as db:
+        if not await _is_partitioned(db):
+            return []
+        # One worker at a time; inserts into the default partition wait while rows move out of it
+        await db.execute(text("SELECT pg_advisory_xact_lock(hashtext('audit_logs_partitions'))"))
+
+        month = month_start(datetime.utcnow())
+        months = set()
+        for _ in range(settings.AUDIT_PARTITIONS_AHEAD + 1):
+            months.add(month)
+            month = next_month(month)
+        months.update(await db.scalars(text("SELECT DISTINCT date_trunc('month', created_at) FROM audit_logs_default")))
+        existing = await _partitions(db)
+
+        created = []
+        for month in sorted(months):
+            name = partition_name(month)
+            if name in existing:
+                continue
+            bounds = {"lo": month, "hi": next_month(month)}
+            await db.execute(text("LOCK TABLE audit_logs_default IN EXCLUSIVE MODE"))
+            await db.execute(text(f"CREATE TABLE {name} (LIKE audit_logs INCLUDING DEFAULTS)"))
+            await db.execute(text(
+                f"WITH moved AS (DELETE FROM audit_logs_default WHERE created_at >= :lo AND created_at < :hi "
+                f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+            ), bounds)
+            await db.execute(text(
+                f"ALTER TABLE audit_logs ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{bounds['lo']:%Y-%m-%d}') TO ('{bounds['hi']:%Y-%m-%d}')"
+            ))
+            created.append(name)
+        await db.commit()
+
+    if created:
+        logger.info("Created audit log partitions: %s", ", ".join(created))
+    return created
+
+
+async def _drop_partition_if_empty(db: AsyncSession, month: datetime) -> None:
+    name = partition_name(month)
+    if name not in await _partitions(db):
+        return
+    if await db.scalar(text(f"SELECT 1 FROM {name} LIMIT 1")) is None:
+        await db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
+        logger.info("Dropped archived audit log partition %s", name)
+
+
+# ---- archival ---------------------------------------------------------------
+
+def _write_segment(rows: List[Dict], month: datetime) -> Tuple[Path, str]:
+    """Write ``rows`` to a new segment file; returns its path and its name relative to the archive dir."""
+    relative = f"{month:%Y}/audit-{month:%Y-%m}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+    path = archive_dir() / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            for row in rows:
+                f.write((row_to_json(row) + "\n").encode())
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, path)
+    return path, relative
+
+
+async def _archive_segment(db: AsyncSession, lo: datetime, hi: datetime) -> int:
+    """Move the oldest entries of ``[lo, hi)`` into one segment; returns how many."""
+    result = await db.execute(
+        select(AuditLog.__table__)
+        .where(AuditLog.created_at >= lo, AuditLog.created_at < hi)
+        .order_by(AuditLog.created_at, AuditLog.id)
+        .limit(settings.AUDIT_ARCHIVE_SEGMENT_ROWS)
+    )
+    rows = [dict(row._mapping) for row in result]
+    await db.rollback()  # end the read transaction before the file write
+    if not rows:
+        return 0
+
+    path, relative = await asyncio.to_thread(_write_segment, rows, lo)
+    try:
+        ids = [row["id"] for row in rows]
+        deleted = 0
+        for start in range(0, len(ids), _DELETE_CHUNK):
+            chunk = ids[start:start + _DELETE_CHUNK]
+            # The created_at bounds let PostgreSQL prune the DELETE to the month's partition
+            result = await db.execute(delete(AuditLog).where(
+                AuditLog.created_at >= lo, AuditLog.created_at < hi, AuditLog.id.in_(chunk)
+            ))
+            deleted += result.rowcount
+        if deleted != len(rows):
+            raise _Raced()
+        await db.execute(insert(AuditArchiveSegment).values(
+            path=relative,
+            min_created_at=rows[0]["created_at"],
+            max_created_at=rows[-1]["created_at"],
+            rows=len(rows),
+            archived_at=datetime.utcnow(),
+        ))
+        mark_written(db.sync_session, ["audit_logs"])
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        path.unlink(missing_ok=True)
+        raise
+    return len(rows)
+
+
+class _Raced(Exception):
+    """Another worker archived some of the same rows first."""
+
+
+async def archive_audit_logs() -> int:
+    """
+    Move every whole month older than ``AUDIT_RETENTION_DAYS`` to segments.
+
+    Returns:
+        int: Number of entries archived
+    """
+    cutoff = archive_cutoff()
+    if cutoff is None:
+        return 0
+
+    archived = 0
+    async with AsyncSessionLocal() as db:
+        partitioned = await _is_partitioned(db)
+        while True:
+            oldest = await db.scalar(select(func.min(AuditLog.created_at)).where(AuditLog.created_at < cutoff))
+            await db.rollback()
+            if oldest is None:
+                break
+            month = month_start(oldest)
+            try:
+                moved = await _archive_segment(db, month, min(next_month(month), cutoff))
+            except _Raced:
+                logger.info("Audit archival raced another worker; leaving the rest to it")
+                break
+            archived += moved
+            if partitioned and await db.scalar(
+                select(func.count()).select_from(AuditLog)
+                .where(AuditLog.created_at >= month, AuditLog.created_at < next_month(month))
+            ) == 0:
+                await _drop_partition_if_empty(db, month)
+            await db.rollback()
+
+    if archived:
+        logger.info("Archived %d audit log entries older than %s", archived, cutoff.date())
+    return archived
+
+
+# ---- reading ----------------------------------------------------------------
+
+class SegmentCache:
+    """LRU of decoded segments; segments never change, so entries never go stale."""
+
+    def __init__(self, max_segments: int):
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._segments: "OrderedDict[int, List[Dict]]" = OrderedDict()
+        self._counts: "OrderedDict[tuple, int]" = OrderedDict()
+
+    def get(self, segment_id: int) -> Optional[List[Dict]]:
+        with self._lock:
+            rows = self._segments.get(segment_id)
+            if rows is not None:
+                self._segments.move_to_end(segment_id)
+            return rows
+
+    def put(self, segment_id: int, rows: List[Dict]) -> None:
+        with self._lock:
+            self._segments[segment_id] = rows
+            self._segments.move_to_end(segment_id)
+            while len(self._segments) > self.max_segments:
+                self._segments.popitem(last=False)
+
+    def get_count(self, key: tuple) -> Optional[int]:
+        with self._lock:
+            return self._counts.get(key)
+
+    def put_count(self, key: tuple, count: int) -> None:
+        with self._lock:
+            self._counts[key] = count
+            while len(self._counts) > 10_000:
+                self._counts.popitem(last=False)
+
+
+segment_cache = SegmentCache(settings.AUDIT_ARCHIVE_CACHE_SEGMENTS)
+
+
+def _read_segment(relative: str) -> List[Dict]:
+    with gzip.open(archive_dir() / relative, "rt") as f:
+        return [row_from_json(line) for line in f if line.strip()]
+
+
+async def load_segment(segment: AuditArchiveSegment) -> List[Dict]:
+    """The entries of one segment, oldest first, as dicts of AuditLog column values."""
+    rows = segment_cache.get(segment.id)
+    if rows is None:
+        rows = await asyncio.to_thread(_read_segment, segment.path)
+        segment_cache.put(segment.id, rows)
+    return rows
+
+
+def _segments_query(start_date: Optional[datetime], end_date: Optional[datetime]):
+    query = select(AuditArchiveSegment)
+    if start_date:
+        query = query.where(AuditArchiveSegment.max_created_at >= start_date)
+    if end_date:
+        query = query.where(AuditArchiveSegment.min_created_at <= end_date)
+    return query
+
+
+def _matcher(admin_id=None, action=None, resource_type=None, resource_id=None, start_date=None, end_date=None):
+    """Python version of AuditService._filtered_query for archived rows."""
+    def matches(row: Dict) -> bool:
+        return (
+            (not admin_id or row["admin_id"] == admin_id)
+            and (not action or row["action"] == action)
+            and (not resource_type or row["resource_type"] == resource_type)
+            and (not resource_id or row["resource_id"] == resource_id)
+            and (not start_date or row["created_at"] >= start_date)
+            and (not end_date or row["created_at"] <= end_date)
+        )
+    return matches
+
+
+def _key(row: Dict) -> tuple:
+    return (row["created_at"], row["id"])
+
+
+async def archived_rows(
+    db: AsyncSession,
+    position: Optional[Cursor],
+    direction: str,
+    limit: int,
+    **filters,
+) -> List[AuditLog]:
+    """
+    Archived entries matching ``filters``, past ``position``, in page order.
+
+    Meant as ``paginate``'s ``merge_with``: newest first for NEXT, oldest
+    first otherwise, at most ``limit`` of them.
+
+    Args:
+        db: Database session (for the segment catalog)
+        position: Cursor position, or None for the newest entries
+        direction: NEXT or PREV
+        limit: Maximum number of entries
+        **filters: AuditService filters (admin_id, action, ..., end_date)
+
+    Returns:
+        List[AuditLog]: Transient AuditLog objects
+    """
+    newest_first = direction == NEXT
+    query = _segments_query(filters.get("start_date"), filters.get("end_date"))
+    if position is not None:
+        if newest_first:
+            query = query.where(AuditArchiveSegment.min_created_at <= position.created_at)
+        else:
+            query = query.where(AuditArchiveSegment.max_created_at >= position.created_at)
+    if newest_first:
+        query = query.order_by(AuditArchiveSegment.max_created_at.desc())
+    else:
+        query = query.order_by(AuditArchiveSegment.min_created_at)
+    segments = list(await db.scalars(query))
+    if not segments:
+        return []
+
+    matches = _matcher(**filters)
+    if position is not None:
+        at = (position.created_at, position.id)
+        past = (lambda row: _key(row) < at) if newest_first else (lambda row: _key(row) > at)
+    else:
+        past = None
+
+    found: List[Dict] = []
+    for i, segment in enumerate(segments):
+        for row in await load_segment(segment):
+            if matches(row) and (past is None or past(row)):
+                found.append(row)
+        if len(found) >= limit and i + 1 < len(segments):
+            # Stop once the next segment cannot hold anything ahead of the limit-th row
+            found.sort(key=_key, reverse=newest_first)
+            edge = found[limit - 1]["created_at"]
+            following = segments[i + 1]
+            if (following.max_created_at < edge) if newest_first else (following.min_created_at > edge):
+                break
+    found.sort(key=_key, reverse=newest_first)
+    return [AuditLog(**row) for row in found[:limit]]
+
+
+async def count_archived(db: AsyncSession, **filters) -> Tuple[int, bool]:
+    """
+    Number of archived entries matching ``filters``.
+
+    Segments entirely inside the date window are counted from the catalog
+    when no other filter is set. Otherwise each segment is scanned once per
+    filter combination and the result cached; at most
+    ``AUDIT_ARCHIVE_CACHE_SEGMENTS`` uncached segments are scanned per call,
+    and the count is then a lower bound.
+
+    Returns:
+        Tuple of the count and whether it is exact
+    """
+    start_date, end_date = filters.get("start_date"), filters.get("end_date")
+    segments = list(await db.scalars(_segments_query(start_date, end_date)))
+    if not segments:
+        return 0, True
+
+    only_dates = not any(filters.get(key) for key in ("admin_id", "action", "resource_type", "resource_id"))
+    filter_key = tuple(sorted((key, str(value)) for key, value in filters.items() if value))
+    matches = _matcher(**filters)
+    total, exact, budget = 0, True, settings.AUDIT_ARCHIVE_CACHE_SEGMENTS
+    for segment in segments:
+        inside = (not start_date or segment.min_created_at >= start_date) and (
+            not end_date or segment.max_created_at <= end_date
+        )
+        if only_dates and inside:
+            total += segment.rows
+            continue
+        key = (segment.id, filter_key)
+        count = segment_cache.get_count(key)
+        if count is None:
+            if segment_cache.get(segment.id) is None:
+                if budget <= 0:
+                    exact = False
+                    continue
+                budget -= 1
+            count = sum(1 for row in await load_segment(segment) if matches(row))
+            segment_cache.put_count(key, count)
+        total += count
+    return total, exact
+
+
+async def iter_archived_rows(
+    db: AsyncSession,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+) -> AsyncIterator[Dict]:
+    """Every archived entry in ``[start_date, end_date]``, as dicts of AuditLog column values."""
+    matches = _matcher(start_date=start_date, end_date=end_date)
+    query = _segments_query(start_date, end_date).order_by(AuditArchiveSegment.min_created_at)
+    for segment in list(await db.scalars(query)):
+        rows = segment_cache.get(segment.id) or await asyncio.to_thread(_read_segment, segment.path)
+        for row in rows:
+            if matches(row):
+                yield row
+
+
+# ---- background task --------------------------------------------------------
+
+class AuditArchiver:
+    """Background task keeping partitions ahead and archiving expired months, every ``interval`` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="audit-archiver")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await ensure_audit_partitions()
+                await archive_audit_logs()
+            except Exception:
+                logger.exception("Audit log archival failed")
+            await asyncio.sleep(self.interval)
+
+
+audit_archiver = AuditArchiver(settings.AUDIT_ARCHIVE_INTERVAL)
@@ -0,0 +1,389 @@
+"""
+Write-behind pipeline for audit log entries.
+
+``AuditService.log_action`` hands finished rows to ``audit_writer`` instead
+of inserting them inside the request. A background task drains the bounded
+queue and bulk-inserts up to ``AUDIT_BATCH_SIZE`` rows per transaction,
+waiting at most ``AUDIT_FLUSH_INTERVAL`` seconds for a batch to fill. The
+admin log file and Azure events are emitted after each insert, off the
+request path.
+
+Backpressure: when the queue is full a request waits up to
+``AUDIT_ENQUEUE_TIMEOUT`` seconds for room. If there is still none, the row
+is appended to the spill file, a JSONL file fsynced on every write. Batches
+that fail to insert and rows still queued when the shutdown drain times out
+are spilled too. Spilled rows are replayed on startup and after the next
+successful flush. Replay skips ids that are already stored, so a crash in
+the middle of a replay cannot duplicate rows.
+
+The spill file may be shared by every worker and instance. A writer
+replays only files it renamed to a name of its own
+(``audit_spill.<host>.<pid>-<process>.<random>.replay``), so two writers never
+replay the same rows. At startup it also adopts replay files whose owner
+on this host is no longer running. Each batch updates the audit
+rollups (app.admin.rollups) in its own transaction.
+
+Rows still in memory when the process is killed without a shutdown are
+lost. That window is bounded by the flush interval.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select
+
+from app.admin.rollups import add_to_rollups
+from app.core.azure_logging import log_admin_action_azure
+from app.core.config import settings
+from app.core.logger import LOGS_DIR, log_admin_action
+from app.db.database import AsyncSessionLocal
+from app.db.models import AuditAction, AuditLog
+
+logger = logging.getLogger("sensesafe.audit_writer")
+
+
+def row_to_json(row: dict) -> str:
+    """One audit row (AuditLog column values) as a JSON line; used by the spill file and archive segments."""
+    data = dict(row)
+    for key in ("id", "admin_id", "resource_id"):
+        if data.get(key) is not None:
+            data[key] = str(data[key])
+    data["action"] = data["action"].value
+    data["created_at"] = data["created_at"].isoformat()
+    return json.dumps(data)
+
+
+def row_from_json(line: str) -> dict:
+    """Inverse of ``row_to_json``."""
+    data = json.loads(line)
+    for key in ("id", "admin_id", "resource_id"):
+        if data.get(key) is not None:
+            data[key] = uuid.UUID(data[key])
+    data["action"] = AuditAction(data["action"])
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return data
+
+
+def emit_side_channels(row: dict) -> None:
+    """Write one stored row to the admin log file and to Azure (if configured)."""
+    resource_id = str(row["resource_id"]) if row.get("resource_id") else None
+    log_admin_action(
+        admin_id=str(row["admin_id"]),
+        admin_email=row["admin_email"],
+        action=row["action"].value,
+        resource_type=row["resource_type"],
+        resource_id=resource_id,
+        details=json.loads(row["details"]) if row.get("details") else None,
+        success=bool(row["success"]),
+        error_message=row.get("error_message")
+    )
+    try:
+        log_admin_action_azure(
+            admin_id=str(row["admin_id"]),
+            admin_email=row["admin_email"],
+            action=row["action"].value,
+            resource_type=row["resource_type"],
+            resource_id=resource_id,
+            success=bool(row["success"]),
+            error_message=row.get("error_message")
+        )
+    except Exception:
+        pass  # Azure logging is optional
+
+
+# Tells this process's replay files from those of an earlier one with the same pid
+_PROCESS = uuid.uuid4().hex[:8]
+
+
+def _alive(pid: int) -> bool:
+    if os.name != "posix":
+        return True  # cannot probe without side effects; leave the file to its owner
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class AuditWriter:
+    """Bounded queue plus a background task that batch-inserts audit rows."""
+
+    def __init__(
+        self,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        enqueue_timeout: float,
+        spill_path: Path,
+        shutdown_timeout: float
+    ):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_path = Path(spill_path)
+        self.shutdown_timeout = shutdown_timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._spill_lock = threading.Lock()
+        self._spill_pending = False
+        self._claimed: List[Path] = []  # replay files this writer owns
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.backpressure_waits = 0
+        self.spilled = 0
+        self.replayed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # ---- lifecycle --------------------------------------------------------
+
+    async def start(self) -> None:
+        """Replay anything spilled by a previous process, then start draining."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._batch_full = asyncio.Event()
+        self._stopping = False
+        self._spill_pending = True
+        await self._replay_spill(adopt=True)
+        self._task = asyncio.create_task(self._run(), name="audit-writer")
+
+    async def stop(self) -> None:
+        """Drain the queue to the database; spill whatever is left after the timeout."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._batch_full.set()
+        try:
+            self._queue.put_nowait(None)  # wake an idle writer
+        except asyncio.QueueFull:
+            pass  # a busy writer checks _stopping between batches
+
+        try:
+            await asyncio.wait_for(self._task, self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            logger.error("Audit writer drain timed out; spilling the remaining entries")
+            self._task.cancel()
+
+        leftover = []
+        while not self._queue.empty():
+            row = self._queue.get_nowait()
+            if row is not None:
+                leftover.append(row)
+        if leftover:
+            await asyncio.to_thread(self._spill, leftover)
+        self._task = None
+
+    # ---- producer side ----------------------------------------------------
+
+    async def submit(self, row: Dict) -> None:
+        """Queue one audit row; waits briefly when full, then spills to disk."""
+        self.enqueued += 1
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+            try:
+                await asyncio.wait_for(self._queue.put(row), self.enqueue_timeout)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self._spill, [row])
+                return
+        if self._queue.qsize() >= self.batch_size:
+            self._batch_full.set()
+
+    # ---- consumer side ----------------------------------------------------
+
+    async def _run(self) -> None:
+        while True:
+            idle = False
+            try:
+                first = await asyncio.wait_for(self._queue.get(), self.flush_interval)
+            except asyncio.TimeoutError:
+                idle = True
+
+            if idle:
+                if self._stopping:
+                    return
+                # A good moment to retry entries spilled while the DB was down
+                if self._spill_pending:
+                    await self._replay_spill()
+                continue
+
+            if first is None:
+                if self._stopping and self._queue.empty():
+                    return
+                continue
+
+            # Give the batch up to one flush interval to fill
+            if not self._stopping and self._queue.qsize() + 1 < self.batch_size:
+                self._batch_full.clear()
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = [first]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                row = self._queue.get_nowait()
+                if row is not None:
+                    batch.append(row)
+
+            if await self._flush(batch) and self._spill_pending:
+                await self._replay_spill()
+
+            if self._stopping and self._queue.empty():
+                return
+
+    async def _insert(self, rows: List[Dict]) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(AuditLog), rows)
+            await add_to_rollups(db, rows)
+            await db.commit()
+
+    async def _flush(self, batch: List[Dict]) -> bool:
+        try:
+            await self._insert(batch)
+        except Exception:
+            logger.exception("Audit batch insert failed; spilling %d entries", len(batch))
+            self.failed_batches += 1
+            await asyncio.to_thread(self._spill, batch)
+            return False
+
+        self.written += len(batch)
+        self.batches += 1
+        try:
+            await asyncio.to_thread(self._emit, batch)
+        except Exception:
+            logger.exception("Audit side-channel logging failed")
+        return True
+
+    @staticmethod
+    def _emit(batch: List[Dict]) -> None:
+        for row in batch:
+            emit_side_channels(row)
+
+    # ---- spill file -------------------------------------------------------
+
+    def _spill(self, rows: List[Dict]) -> None:
+        with self._spill_lock:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(row_to_json(row) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.spilled += len(rows)
+            self._spill_pending = True
+
+    def _claim_path(self) -> Path:
+        """A replay file name no other writer, here or on another host, will pick."""
+        owner = f"{socket.gethostname()}.{os.getpid()}-{_PROCESS}.{uuid.uuid4().hex[:8]}"
+        return self.spill_path.with_name(f"{self.spill_path.stem}.{owner}.replay")
+
+    def _orphans(self) -> List[Path]:
+        """Replay files left behind by dead writers on this host (or by older versions)."""
+        orphans = []
+        for path in self.spill_path.parent.glob(f"{self.spill_path.stem}.*.replay"):
+            if path in self._claimed:
+                continue
+            owner = path.name[len(self.spill_path.stem) + 1:-len(".replay")].rsplit(".", 2)
+            if len(owner) == 3:
+                host, process, _ = owner
+                pid, _, token = process.partition("-")
+                if host != socket.gethostname() or not pid.isdigit() or token == _PROCESS:
+                    continue
+                # Our own pid with another token is a previous process that had it
+                if int(pid) != os.getpid() and _alive(int(pid)):
+                    continue
+            orphans.append(path)
+        return orphans
+
+    def _claim_spill(self, adopt: bool = False) -> List[Path]:
+        """
+        Rename the spill file to a name of our own so new spills do not race
+        the replay and no other writer replays the same rows.
+
+        Returns this writer's replay files: the one just claimed plus any
+        whose replay failed before (and, with ``adopt``, orphans).
+        """
+        with self._spill_lock:
+            self._spill_pending = False
+            candidates = self._orphans() if adopt else []
+            if self.spill_path.exists():
+                candidates.append(self.spill_path)
+            for path in candidates:
+                claimed = self._claim_path()
+                try:
+                    os.replace(path, claimed)
+                except FileNotFoundError:
+                    continue  # another writer claimed it first
+                self._claimed.append(claimed)
+            return list(self._claimed)
+
+    async def _replay_spill(self, adopt: bool = False) -> None:
+        for replay_path in self._claim_spill(adopt):
+            try:
+                with open(replay_path, encoding="utf-8") as f:
+                    rows = [row_from_json(line) for line in f if line.strip()]
+
+                for start in range(0, len(rows), self.batch_size):
+                    chunk = rows[start:start + self.batch_size]
+                    async with AsyncSessionLocal() as db:
+                        stored = set(await db.scalars(
+                            select(AuditLog.id).where(AuditLog.id.in_([row["id"] for row in chunk]))
+                        ))
+                    fresh = [row for row in chunk if row["id"] not in stored]
+                    if fresh:
+                        await self._insert(fresh)
+                    self.replayed += len(fresh)
+            except Exception:
+                logger.exception("Audit spill replay failed; will retry after the next flush")
+                self._spill_pending = True
+                return
+
+            replay_path.unlink(missing_ok=True)
+            self._claimed.remove(replay_path)
+            logger.info("Replayed %d spilled audit entries", len(rows))
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self.max_queue,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_batches": self.failed_batches,
+            "backpressure_waits": self.backpressure_waits,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+        }
+
+
+audit_writer = AuditWriter(
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+    enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT,
+    spill_path=Path(settings.AUDIT_SPILL_PATH) if settings.AUDIT_SPILL_PATH else LOGS_DIR / "audit_spill.jsonl",
+    shutdown_timeout=settings.AUDIT_SHUTDOWN_TIMEOUT,
+)
@@ -0,0 +1,184 @@
+"""
+Snapshot behind ``GET /api/admin/dashboard``.
+
+The headline numbers (users, open incidents, active SOS alerts, active
+alerts, message counts; most of them from the stats counters in
+app.utils.counters) and the recent audit activity are computed by one
+background task per worker, not per request. Every
+``DASHBOARD_REFRESH_SECONDS`` it compares the collection versions used for
+ETags (app.utils.etag) with the ones of the last snapshot and only runs the
+queries when one of them moved, or when the snapshot is older than
+``_MAX_AGE`` (alerts expire without a write). The response body is encoded
+once per snapshot and served as-is to every admin and every poll, with an
+ETag derived from its content.
+
+The numbers can therefore lag a write by up to one refresh interval plus
+``ETAG_VERSION_TTL``. The task is started by the first dashboard request
+and stopped at shutdown.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import orjson
+from sqlalchemy import func, select
+
+from app.admin.schemas import (
+    AuditLogResponse,
+    DashboardIncidentStats,
+    DashboardMessageStats,
+    DashboardResponse,
+    DashboardSOSStats,
+)
+from app.admin.service import AuditService
+from app.core.config import settings
+from app.db.database import AsyncSessionLocal
+from app.db.models import Alert, Incident, IncidentStatus, Message, SOS, SOSStatus, User, alert_active
+from app.utils.counters import load_counts
+from app.utils.etag import collection_versions
+from app.utils.serialization import to_models
+
+logger = logging.getLogger("sensesafe.dashboard")
+
+COLLECTIONS = ("alerts", "audit_logs", "incidents", "messages", "sos", "users")
+
+# Recompute at least this often even without writes, for alerts that expire
+_MAX_AGE = 60.0
+
+
+class DashboardSnapshot:
+    """The latest dashboard body and ETag, refreshed by a background task."""
+
+    def __init__(self, refresh_interval: float, recent_activity: int):
+        self.refresh_interval = refresh_interval
+        self.recent_activity = recent_activity
+
+        self._body: Optional[bytes] = None
+        self._etag: Optional[str] = None
+        self._versions: Optional[Dict[str, int]] = None
+        self._refreshed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    # ---- lifecycle --------------------------------------------------------
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="dashboard-snapshot")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # ---- readers ----------------------------------------------------------
+
+    async def current(self) -> Tuple[bytes, str]:
+        """
+        The latest snapshot, computed on the spot if there is none yet.
+
+        Returns:
+            Tuple of the encoded JSON body and its weak ETag
+        """
+        if not self.running:
+            await self.start()
+        if self._body is None:
+            await self.refresh()
+        return self._body, self._etag
+
+    # ---- refresh ----------------------------------------------------------
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Dashboard snapshot refresh failed; keeping the previous one")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self) -> None:
+        """Recompute the snapshot unless nothing it reads has changed."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            versions = await collection_versions.get(COLLECTIONS)
+            fresh = self._refreshed_at is not None and time.monotonic() - self._refreshed_at < _MAX_AGE
+            if self._body is not None and fresh and versions == self._versions:
+                return
+
+            refreshed_at = time.monotonic()
+            snapshot = await self._compute()
+            content = snapshot.model_dump(exclude={"generated_at"})
+            etag = f'W/"{hashlib.blake2b(orjson.dumps(content), digest_size=16).hexdigest()}"'
+            if etag != self._etag:  # else keep the old body, and its generated_at
+                self._body = orjson.dumps(snapshot.model_dump())
+                self._etag = etag
+            self._versions = versions
+            self._refreshed_at = refreshed_at
+
+    async def _compute(self) -> DashboardResponse:
+        async with AsyncSessionLocal() as db:
+            users = await db.scalar(select(func.count()).select_from(User))
+
+            incidents = await load_counts(db, Incident)
+            sos = await load_counts(db, SOS)
+            active_alerts = await db.scalar(
+                select(func.count()).select_from(Alert).where(alert_active(datetime.utcnow()))
+            )
+            messages = await load_counts(db, Message)
+
+            recent = await AuditService(db).get_recent_activity(limit=self.recent_activity)
+            recent_activity = to_models(AuditLogResponse, recent)
+
+        by_type: Dict[str, int] = {}
+        unread = 0
+        for (message_type, is_read), count in messages.items():
+            by_type[message_type] = by_type.get(message_type, 0) + count
+            if is_read == "0":
+                unread += count
+        message_total = sum(by_type.values())
+
+        return DashboardResponse(
+            users=users,
+            incidents=DashboardIncidentStats(
+                total=sum(incidents.values()),
+                open=sum(n for (s,), n in incidents.items() if s != IncidentStatus.RESOLVED.value),
+                by_status={s: n for (s,), n in incidents.items() if n},
+            ),
+            sos=DashboardSOSStats(
+                total=sum(sos.values()),
+                active=sum(n for (s,), n in sos.items() if s != SOSStatus.SAFE.value),
+                by_status={s: n for (s,), n in sos.items() if n},
+            ),
+            active_alerts=active_alerts,
+            messages=DashboardMessageStats(
+                total=message_total,
+                unread=unread,
+                read=message_total - unread,
+                by_type=by_type,
+            ),
+            recent_activity=recent_activity,
+            status="healthy",
+            version=settings.APP_VERSION,
+            generated_at=datetime.utcnow(),
+        )
+
+
+dashboard_snapshot = DashboardSnapshot(
+    refresh_interval=settings.DASHBOARD_REFRESH_SECONDS,
+    recent_activity=settings.DASHBOARD_RECENT_ACTIVITY,
+)
@@ -0,0 +1,145 @@
+"""
+Map data for the admin dashboard.
+
+Only the columns a marker needs are selected, so no ORM objects are
+built. Below ``MAP_CLUSTER_MAX_ZOOM`` the database groups the open
+incidents and active SOS alerts into grid cells sized for the zoom level.
+It returns one cluster per cell and type, with the count, the centroid,
+the worst status and the lowest battery, instead of one marker per row.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Incident, IncidentStatus, SOS, SOSStatus, INCIDENT_OPEN, SOS_ACTIVE
+from app.utils.geo import BBox, bbox_filter, cell_size_for_zoom, lat_cell, lng_cell
+
+# Higher is worse. A confirmed incident still waiting for help outranks one
+# under review or already being handled.
+INCIDENT_STATUS_RANK = {
+    IncidentStatus.VERIFIED: 4,
+    IncidentStatus.UNDER_REVIEW: 3,
+    IncidentStatus.PENDING: 2,
+    IncidentStatus.HELP_ASSIGNED: 1,
+}
+SOS_STATUS_RANK = {
+    SOSStatus.TRAPPED: 3,
+    SOSStatus.INJURED: 2,
+    SOSStatus.NEED_HELP: 1,
+}
+
+
+def use_clusters(zoom: Optional[int]) -> bool:
+    """Whether a request at ``zoom`` gets clusters rather than markers."""
+    return zoom is not None and zoom < settings.MAP_CLUSTER_MAX_ZOOM
+
+
+def _where(query, model, active, bbox: Optional[BBox]):
+    query = query.where(active)
+    if bbox is not None:
+        query = query.where(bbox_filter(model.lat, model.lng, bbox))
+    return query
+
+
+async def load_markers(db: AsyncSession, bbox: Optional[BBox]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    One marker per open incident and active SOS alert inside ``bbox``.
+
+    Args:
+        db: Database session
+        bbox: Viewport, or None for everything
+
+    Returns:
+        (incident markers, SOS markers) as MapMarkerResponse field dicts
+    """
+    incidents = await db.execute(_where(
+        select(Incident.id, Incident.lat, Incident.lng, Incident.status, Incident.type,
+               Incident.risk_level, Incident.created_at),
+        Incident, INCIDENT_OPEN, bbox
+    ))
+    sos_alerts = await db.execute(_where(
+        select(SOS.id, SOS.lat, SOS.lng, SOS.status, SOS.ability, SOS.battery, SOS.created_at),
+        SOS, SOS_ACTIVE, bbox
+    ))
+
+    incident_markers = [
+        dict(
+            id=inc.id,
+            type="incident",
+            lat=inc.lat,
+            lng=inc.lng,
+            status=inc.status.value if inc.status else "UNKNOWN",
+            title=f"Incident: {inc.type}",
+            severity=inc.risk_level,
+            ability=None,
+            battery=None,
+            created_at=inc.created_at
+        )
+        for inc in incidents
+    ]
+    sos_markers = [
+        dict(
+            id=sos.id,
+            type="sos",
+            lat=sos.lat,
+            lng=sos.lng,
+            status=sos.status.value if sos.status else "NEED_HELP",
+            title=f"SOS — Status: {sos.status.value if sos.status else 'NEED_HELP'}",
+            severity="critical",
+            ability=sos.ability.value if sos.ability else None,
+            battery=sos.battery,
+            created_at=sos.created_at
+        )
+        for sos in sos_alerts
+    ]
+    return incident_markers, sos_markers
+
+
+async def _cluster(db, model, active, ranks, bbox, size, kind) -> List[Dict]:
+    row = lat_cell(model.lat, size)
+    col = lng_cell(model.lng, size)
+    worst = func.max(case(*((model.status == status, rank) for status, rank in ranks.items()), else_=0))
+    min_battery = func.min(model.battery) if kind == "sos" else None
+
+    query = select(
+        func.count().label("count"),
+        func.avg(model.lat).label("lat"),
+        func.avg(model.lng).label("lng"),
+        worst.label("worst"),
+        *([min_battery.label("min_battery")] if min_battery is not None else []),
+    )
+    query = _where(query.select_from(model), model, active, bbox).group_by(row, col)
+
+    by_rank = {rank: status.value for status, rank in ranks.items()}
+    return [
+        dict(
+            type=kind,
+            lat=cluster.lat,
+            lng=cluster.lng,
+            count=cluster.count,
+            worst_status=by_rank.get(cluster.worst),
+            min_battery=cluster.min_battery if min_battery is not None else None
+        )
+        for cluster in await db.execute(query)
+    ]
+
+
+async def load_clusters(db: AsyncSession, bbox: Optional[BBox], zoom: int) -> List[Dict]:
+    """
+    Grid clusters of open incidents and active SOS alerts inside ``bbox``.
+
+    Args:
+        db: Database session
+        bbox: Viewport, or None for everything
+        zoom: Web-map zoom level the cell size is derived from
+
+    Returns:
+        MapClusterResponse field dicts, incident clusters first
+    """
+    size = cell_size_for_zoom(zoom, settings.MAP_CLUSTER_CELLS_PER_TILE)
+    incidents = await _cluster(db, Incident, INCIDENT_OPEN, INCIDENT_STATUS_RANK, bbox, size, "incident")
+    sos_alerts = await _cluster(db, SOS, SOS_ACTIVE, SOS_STATUS_RANK, bbox, size, "sos")
+    return incidents + sos_alerts
@@ -0,0 +1,213 @@
+"""
+Hourly and daily rollups of the audit log, behind the audit statistics.
+
+``audit_rollup_hourly`` and ``audit_rollup_daily`` hold one row per time
+bucket, action, admin and outcome with the number of audit entries in it.
+Whatever inserts audit entries calls ``add_to_rollups`` in the same
+transaction (the write-behind writer once per batch, ``log_action`` when it
+writes inline), so the rollups always agree with the committed log.
+
+``rollup_stats`` answers a window from whole days where it can, whole hours
+at the ragged ends and the raw log only for the partial hours at either
+edge. A year of statistics is a handful of small range scans instead of one
+count per action and per admin over the whole range.
+
+Archiving entries (app.admin.audit_archive) leaves the rollups as they
+are, so statistics keep covering archived months.
+
+``rebuild_rollups`` recomputes both tables from the log, e.g. after rows
+were inserted or deleted behind the app's back; see
+``scripts/audit_rollups.py``, which also checks the rollups against a raw
+GROUP BY.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import DateTime, delete, func, insert, literal_column, or_, select, text, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import AuditAction, AuditLog, AuditRollupDaily, AuditRollupHourly
+
+GRAINS = ((AuditRollupHourly, "hour"), (AuditRollupDaily, "day"))
+
+_STEP = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+
+def floor_bucket(ts: datetime, grain: str) -> datetime:
+    """Start of the ``grain`` ("hour" or "day") bucket containing ``ts``."""
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if grain == "day" else ts
+
+
+def _ceil_bucket(ts: datetime, grain: str) -> datetime:
+    floor = floor_bucket(ts, grain)
+    return floor if floor == ts else floor + _STEP[grain]
+
+
+def bucket_expression(column, grain: str, dialect: str):
+    """SQL for ``floor_bucket(column, grain)``, as stored in the rollup tables."""
+    if dialect == "postgresql":
+        return func.date_trunc(literal_column(f"'{grain}'"), column)
+    if dialect == "sqlite":
+        # The text format SQLAlchemy stores DateTime values in on SQLite
+        pattern = "%Y-%m-%d %H:00:00.000000" if grain == "hour" else "%Y-%m-%d 00:00:00.000000"
+        return type_coerce(func.strftime(literal_column(f"'{pattern}'"), column), DateTime)
+    raise NotImplementedError(f"audit rollups do not support {dialect}")
+
+
+def _upsert(table, dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"audit rollups do not support {dialect}")
+    stmt = dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.bucket, table.c.action, table.c.admin_id, table.c.success],
+        set_={"count": table.c.count + stmt.excluded.count, "admin_email": stmt.excluded.admin_email},
+    )
+
+
+async def add_to_rollups(db: AsyncSession, rows: List[Dict]) -> None:
+    """
+    Count audit entries into both rollups, in ``db``'s current transaction.
+
+    Args:
+        db: The session inserting the entries; commit it afterwards
+        rows: The entries, as dicts of AuditLog column values
+    """
+    dialect = db.get_bind().dialect.name
+    for model, grain in GRAINS:
+        buckets: Dict[Tuple, List] = {}
+        for row in rows:
+            key = (floor_bucket(row["created_at"], grain), row["action"], row["admin_id"], row["success"])
+            bucket = buckets.setdefault(key, [0, row["admin_email"]])
+            bucket[0] += 1
+            bucket[1] = row["admin_email"]
+        # Sorted, so concurrent batches lock rows in the same order
+        params = [
+            {"bucket": b, "action": action, "admin_id": admin_id, "success": success, "admin_email": email, "count": n}
+            for (b, action, admin_id, success), (n, email) in sorted(buckets.items())
+        ]
+        if params:
+            await db.execute(_upsert(model.__table__, dialect), params)
+
+
+async def rollup_stats(db: AsyncSession, start: Optional[datetime] = None, end: Optional[datetime] = None) -> dict:
+    """
+    Audit statistics for ``start <= created_at <= end``.
+
+    Args:
+        db: Database session
+        start: Start of the window; None for everything before ``end``
+        end: End of the window (inclusive); None for now
+
+    Returns:
+        dict: total, successful, failed, by_action and by_admin (keyed by email)
+    """
+    from app.admin.audit_archive import iter_archived_rows
+
+    start = start or datetime.min
+    end = end or datetime.utcnow()
+
+    # [start, h0) and [h1, end] come from the log, [h0, h1) from the rollups:
+    # whole days from the daily table and the hours around them from the hourly one
+    h0, h1 = _ceil_bucket(start, "hour"), floor_bucket(end, "hour")
+    if h0 >= h1:
+        edges = [(start, end, True)]
+        hourly, daily = [], []
+    else:
+        edges = [(start, h0, False), (h1, end, True)]
+        d0, d1 = _ceil_bucket(h0, "day"), floor_bucket(h1, "day")
+        if d0 < d1:
+            hourly, daily = [(h0, d0), (d1, h1)], [(d0, d1)]
+        else:
+            hourly, daily = [(h0, h1)], []
+
+    counts: Dict[Tuple[AuditAction, UUID, int], int] = defaultdict(int)
+    emails: Dict[UUID, str] = {}
+
+    def add(rows):
+        for action, admin_id, success, email, n in rows:
+            counts[(action, admin_id, success)] += n
+            emails[admin_id] = email
+
+    raw = or_(*(
+        (AuditLog.created_at >= lo) & ((AuditLog.created_at <= hi) if closed else (AuditLog.created_at < hi))
+        for lo, hi, closed in edges
+    ))
+    keys = (AuditLog.action, AuditLog.admin_id, AuditLog.success)
+    add((await db.execute(
+        select(*keys, func.max(AuditLog.admin_email), func.count()).where(raw).group_by(*keys)
+    )).all())
+    # Entries of those edge hours that were archived are no longer in audit_logs
+    for lo, hi, closed in edges:
+        async for row in iter_archived_rows(db, lo, hi):
+            if closed or row["created_at"] < hi:
+                add([(row["action"], row["admin_id"], row["success"], row["admin_email"], 1)])
+    for model, ranges in ((AuditRollupHourly, hourly), (AuditRollupDaily, daily)):
+        if not ranges:
+            continue
+        keys = (model.action, model.admin_id, model.success)
+        in_window = or_(*((model.bucket >= lo) & (model.bucket < hi) for lo, hi in ranges))
+        add((await db.execute(
+            select(*keys, func.max(model.admin_email), func.sum(model.count)).where(in_window).group_by(*keys)
+        )).all())
+
+    by_action: Dict[str, int] = defaultdict(int)
+    by_admin: Dict[str, int] = defaultdict(int)
+    successful = failed = 0
+    for (action, admin_id, success), n in counts.items():
+        if not n:
+            continue
+        by_action[action.value] += n
+        by_admin[emails[admin_id]] += n
+        if success:
+            successful += n
+        else:
+            failed += n
+
+    return {
+        "total": successful + failed,
+        "successful": successful,
+        "failed": failed,
+        "by_action": dict(by_action),
+        "by_admin": dict(by_admin),
+    }
+
+
+async def rebuild_rollups(db: AsyncSession) -> None:
+    """
+    Recompute both rollup tables from audit_logs and the archived
+    segments, in ``db``'s transaction.
+
+    Audit inserts wait for the rebuild to commit (a SHARE lock on
+    PostgreSQL, the database write lock on SQLite), so none is lost.
+    """
+    from app.admin.audit_archive import iter_archived_rows
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        await db.execute(text("LOCK TABLE audit_logs IN SHARE MODE"))
+    for model, grain in GRAINS:
+        bucket = bucket_expression(AuditLog.created_at, grain, dialect)
+        keys = (bucket, AuditLog.action, AuditLog.admin_id, AuditLog.success)
+        await db.execute(delete(model))
+        await db.execute(insert(model).from_select(
+            ["bucket", "action", "admin_id", "success", "admin_email", "count"],
+            select(*keys, func.max(AuditLog.admin_email), func.count()).group_by(*keys),
+        ))
+
+    # Archived entries still count
+    batch = []
+    async for row in iter_archived_rows(db):
+        batch.append(row)
+        if len(batch) >= 10_000:
+            await add_to_rollups(db, batch)
+            batch = []
+    if batch:
+        await add_to_rollups(db, batch)
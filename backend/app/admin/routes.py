@@ -1,34 +1,68 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.db.database import get_db
-from app.core.security import require_admin
+from app.db.database import AsyncSessionLocal, get_db, registry
+from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.principals import Principal, principal_cache
+from app.core.events import ALERT_CREATED, INCIDENT_STATUS_CHANGED, SOS_STATUS_CHANGED, event_broker, publish
+from app.core.security import get_current_user, optional_security, require_admin
+from app.core.azure_logging import telemetry_stats
 
-from app.db.models import User, Incident, Alert, SOS, IncidentStatus, AlertSeverity, AlertType, SOSStatus
-from app.incidents.schemas import IncidentResponse, IncidentListResponse, IncidentUpdate
+from app.db.models import User, Incident, IncidentGroup, Alert, SOS, IncidentStatus, AlertSeverity, AlertType, SOSStatus
+from app.incidents.schemas import IncidentResponse, IncidentListResponse, IncidentChangesResponse, IncidentUpdate
+from app.incidents.schemas import IncidentGroupResponse, IncidentGroupListResponse
+from app.incidents.grouping import incident_grid, normalize_type
+from app.incidents.service import get_incident_changes
 from app.alerts.schemas import AlertResponse, AlertCreate
-from app.sos.schemas import SOSResponse, SOSListResponse
+from app.alerts.geofence import polygon_json
+from app.sos.schemas import SOSResponse, SOSListResponse, SOSChangesResponse
+from app.sos.service import get_sos_changes
 from app.admin.schemas import AuditLogResponse, AuditLogListResponse, AuditLogStatsResponse, SOSStatsResponse
+from app.admin.schemas import AuditWriterStatsResponse, PoolStatsResponse, PrincipalCacheStatsResponse, TelemetryStatsResponse
+from app.admin.schemas import PasswordHashingStatsResponse
+from app.admin.schemas import DashboardResponse, EventStreamStatsResponse, StreamTicketResponse
+from app.admin.audit_writer import audit_writer
+from app.admin.dashboard import dashboard_snapshot
+from app.admin.map_data import load_clusters, load_markers, use_clusters
 from app.admin.service import AuditService, log_incident_action, log_alert_action
+from app.admin.stream_tickets import issue_stream_ticket, redeem_stream_ticket
 from app.admin.schemas import AuditAction
 from app.auth.schemas import UserListResponse, UserResponse
+from app.utils.counters import load_counts
+from app.utils.counting import count_total
+from app.utils.etag import conditional_get, etag_matches
+from app.utils.pagination import paginate
+from app.utils.geo import parse_bbox
+from app.utils.serialization import respond, to_models
 
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
 
-@router.get("/users", response_model=UserListResponse)
-def get_all_users(
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Timestamps are stored as naive UTC; query params may carry an offset
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@router.get("/users", response_model=UserListResponse, dependencies=[Depends(conditional_get("users"))])
+async def get_all_users(
     request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     search: str = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -38,31 +72,30 @@ def get_all_users(
     - **page**: Page number (default: 1)
     - **page_size**: Items per page (default: 20, max: 100)
     - **search**: Search by name or email (optional)
+    - **cursor**: Keyset cursor from a previous response (optional, overrides page)
     
     Admin access required.
     """
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
     # Build query
-    query = db.query(User)
+    query = select(User)
     
     # Apply search filter if provided
     if search:
         search_filter = f"%{search}%"
-        query = query.filter(
+        query = query.where(
             (User.name.ilike(search_filter)) | 
             (User.email.ilike(search_filter))
         )
     
-    total = query.count()
-    users = query.order_by(User.created_at.desc()).offset(offset).limit(page_size).all()
+    total = await count_total(db, query)
+    result = await paginate(db, query, User, page, page_size, cursor)
+    users = result.items
     
     # Log admin action
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    AuditService(db).log_action(
+    await AuditService(db).log_action(
         admin_user=admin_user,
         action=AuditAction.VIEW_INCIDENTS, # Using generic view action until we have VIEW_USERS
         resource_type="USER",
@@ -70,7 +103,7 @@ def get_all_users(
             "page": page,
             "page_size": page_size,
             "search": search,
-            "total_users": total,
+            "total_users": total.value,
             "returned_count": len(users)
         },
         ip_address=client_host,
@@ -78,21 +111,25 @@ def get_all_users(
         success=True
     )
     
-    return UserListResponse(
-        users=[UserResponse.from_orm(user) for user in users],
-        total=total,
+    return respond(UserListResponse(
+        users=to_models(UserResponse, users),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
-        page_size=page_size
-    )
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
+    ))
 
 
-@router.get("/incidents", response_model=IncidentListResponse)
-def get_all_incidents(
+@router.get("/incidents", response_model=IncidentListResponse, dependencies=[Depends(conditional_get("incidents"))])
+async def get_all_incidents(
     request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status_filter: str = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -102,34 +139,33 @@ def get_all_incidents(
     - **page**: Page number (default: 1)
     - **page_size**: Items per page (default: 20, max: 100)
     - **status_filter**: Filter by status (optional)
+    - **cursor**: Keyset cursor from a previous response (optional, overrides page)
     
     Admin access required.
     """
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
     # Build query
-    query = db.query(Incident)
+    query = select(Incident)
     
     # Apply status filter if provided
     if status_filter:
         try:
             status_enum = IncidentStatus[status_filter]
-            query = query.filter(Incident.status == status_enum)
+            query = query.where(Incident.status == status_enum)
         except KeyError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid status: {status_filter}"
             )
     
-    total = query.count()
-    incidents = query.order_by(Incident.created_at.desc()).offset(offset).limit(page_size).all()
+    total = await count_total(db, query)
+    result = await paginate(db, query, Incident, page, page_size, cursor)
+    incidents = result.items
     
     # Log admin action - viewing incidents list
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    AuditService(db).log_action(
+    await AuditService(db).log_action(
         admin_user=admin_user,
         action=AuditAction.VIEW_INCIDENTS,
         resource_type="INCIDENT",
@@ -137,7 +173,7 @@ def get_all_incidents(
             "page": page,
             "page_size": page_size,
             "status_filter": status_filter,
-            "total_incidents": total,
+            "total_incidents": total.value,
             "returned_count": len(incidents)
         },
         ip_address=client_host,
@@ -145,19 +181,150 @@ def get_all_incidents(
         success=True
     )
     
-    return IncidentListResponse(
-        incidents=[IncidentResponse.from_orm(inc) for inc in incidents],
-        total=total,
+    return respond(IncidentListResponse(
+        incidents=to_models(IncidentResponse, incidents),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
+    ))
+
+
+@router.get(
+    "/incidents/changes",
+    response_model=IncidentChangesResponse,
+    dependencies=[Depends(conditional_get("incidents"))],
+)
+async def get_incident_changes_admin(
+    since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+    limit: int = Query(200, ge=1, le=settings.SYNC_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Get incidents created or changed since a sync token (admin only).
+
+    Send the returned sync_token back as **since** on the next poll. Meant
+    for frequent polling, so not itself audit-logged.
+
+    Admin access required.
+    """
+    return respond(await get_incident_changes(db, None, since, limit))
+
+
+@router.get(
+    "/incident-groups",
+    response_model=IncidentGroupListResponse,
+    dependencies=[Depends(conditional_get("incident_groups", window=60))],  # active_only moves with the clock
+)
+async def get_incident_groups(
+    request: Request,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    type_filter: Optional[str] = Query(None, description="Incident type; matched after normalisation"),
+    active_only: bool = Query(False, description="Only groups with a report inside the grouping window"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Get incident groups (admin only).
+
+    Reports of the same type close in space and time are grouped when they
+    are created; each group has its report count and the centroid of its
+    reports. Newest group first.
+
+    - **type_filter**: Only groups of this type (optional)
+    - **active_only**: Only groups still accepting reports (optional)
+
+    Admin access required.
+    """
+    query = select(IncidentGroup)
+    if type_filter:
+        query = query.where(IncidentGroup.type == normalize_type(type_filter))
+    if active_only:
+        query = query.where(IncidentGroup.last_report_at >= datetime.utcnow() - incident_grid.window)
+
+    total = await count_total(db, query)
+    result = await paginate(db, query, IncidentGroup, page, page_size, cursor)
+
+    client_host = request.client.host if request.client else None
+    user_agent = request.headers.get("user-agent", None)
+
+    await AuditService(db).log_action(
+        admin_user=admin_user,
+        action=AuditAction.VIEW_INCIDENTS,
+        resource_type="INCIDENT_GROUP",
+        details={
+            "page": page,
+            "page_size": page_size,
+            "type_filter": type_filter,
+            "active_only": active_only,
+            "total_groups": total.value,
+            "returned_count": len(result.items)
+        },
+        ip_address=client_host,
+        user_agent=user_agent,
+        success=True
     )
 
+    return respond(IncidentGroupListResponse(
+        groups=to_models(IncidentGroupResponse, result.items),
+        total=total.value,
+        total_exact=total.exact,
+        page=page,
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
+    ))
+
+
+@router.get(
+    "/incident-groups/{group_id}/incidents",
+    response_model=IncidentListResponse,
+    dependencies=[Depends(conditional_get("incidents"))],
+)
+async def get_incident_group_reports(
+    group_id: UUID,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Get the individual reports of an incident group, newest first (admin only).
+
+    Admin access required.
+    """
+    if await db.get(IncidentGroup, group_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Incident group not found"
+        )
+
+    query = select(Incident).where(Incident.group_id == group_id)
+    total = await count_total(db, query)
+    result = await paginate(db, query, Incident, page, page_size, cursor)
+
+    return respond(IncidentListResponse(
+        incidents=to_models(IncidentResponse, result.items),
+        total=total.value,
+        total_exact=total.exact,
+        page=page,
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
+    ))
+
 
 @router.patch("/incidents/{incident_id}/verify", response_model=IncidentResponse)
-def verify_incident(
+async def verify_incident(
     incident_id: UUID,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -166,7 +333,7 @@ def verify_incident(
     Changes incident status to VERIFIED.
     Admin access required.
     """
-    incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    incident = await db.get(Incident, incident_id)
     
     if not incident:
         raise HTTPException(
@@ -176,14 +343,14 @@ def verify_incident(
     
     previous_status = incident.status.value if incident.status else None
     incident.status = IncidentStatus.VERIFIED
-    db.commit()
-    db.refresh(incident)
+    await db.commit()
+    await db.refresh(incident)
     
     # Log admin action - verify incident
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    log_incident_action(
+    await log_incident_action(
         db=db,
         admin_user=admin_user,
         action=AuditAction.VERIFY_INCIDENT,
@@ -199,14 +366,16 @@ def verify_incident(
         success=True
     )
     
-    return IncidentResponse.from_orm(incident)
+    response = IncidentResponse.from_orm(incident)
+    publish(INCIDENT_STATUS_CHANGED, {**response.model_dump(), "previous_status": previous_status})
+    return response
 
 
 @router.patch("/incidents/{incident_id}/resolve", response_model=IncidentResponse)
-def resolve_incident(
+async def resolve_incident(
     incident_id: UUID,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -215,7 +384,7 @@ def resolve_incident(
     Changes incident status to RESOLVED.
     Admin access required.
     """
-    incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    incident = await db.get(Incident, incident_id)
     
     if not incident:
         raise HTTPException(
@@ -225,14 +394,14 @@ def resolve_incident(
     
     previous_status = incident.status.value if incident.status else None
     incident.status = IncidentStatus.RESOLVED
-    db.commit()
-    db.refresh(incident)
+    await db.commit()
+    await db.refresh(incident)
     
     # Log admin action - resolve incident
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    log_incident_action(
+    await log_incident_action(
         db=db,
         admin_user=admin_user,
         action=AuditAction.RESOLVE_INCIDENT,
@@ -250,15 +419,17 @@ def resolve_incident(
         success=True
     )
     
-    return IncidentResponse.from_orm(incident)
+    response = IncidentResponse.from_orm(incident)
+    publish(INCIDENT_STATUS_CHANGED, {**response.model_dump(), "previous_status": previous_status})
+    return response
 
 
 @router.patch("/incidents/{incident_id}", response_model=IncidentResponse)
-def update_incident(
+async def update_incident(
     incident_id: UUID,
     update_data: IncidentUpdate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -267,7 +438,7 @@ def update_incident(
     Allows updating status, risk_score, and risk_level.
     Admin access required.
     """
-    incident = db.query(Incident).filter(Incident.id == incident_id).first()
+    incident = await db.get(Incident, incident_id)
     
     if not incident:
         raise HTTPException(
@@ -287,14 +458,14 @@ def update_incident(
     if update_data.risk_level:
         incident.risk_level = update_data.risk_level
     
-    db.commit()
-    db.refresh(incident)
+    await db.commit()
+    await db.refresh(incident)
     
     # Log admin action - update incident
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    log_incident_action(
+    await log_incident_action(
         db=db,
         admin_user=admin_user,
         action=AuditAction.UPDATE_INCIDENT,
@@ -318,14 +489,17 @@ def update_incident(
         success=True
     )
     
-    return IncidentResponse.from_orm(incident)
+    response = IncidentResponse.from_orm(incident)
+    if response.status.value != previous_status:
+        publish(INCIDENT_STATUS_CHANGED, {**response.model_dump(), "previous_status": previous_status})
+    return response
 
 
 @router.post("/alerts", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
-def create_alert(
+async def create_alert(
     alert_data: AlertCreate,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -334,6 +508,10 @@ def create_alert(
     - **title**: Alert title
     - **message**: Alert message
     - **severity**: LOW, MEDIUM, HIGH, or CRITICAL
+    - **center_lat**, **center_lng**, **radius_m** or **polygon**: Target area
+      (optional; omitted = everyone)
+    - **expires_at**: When the alert stops being shown (default:
+      ALERT_DEFAULT_TTL_HOURS from now)
     
     Admin access required.
     """
@@ -341,18 +519,23 @@ def create_alert(
         title=alert_data.title,
         message=alert_data.message,
         severity=AlertSeverity[alert_data.severity],
-        alert_type=alert_data.alert_type
+        alert_type=alert_data.alert_type,
+        center_lat=alert_data.center_lat,
+        center_lng=alert_data.center_lng,
+        radius_m=alert_data.radius_m,
+        polygon=polygon_json(alert_data.polygon),
+        expires_at=alert_data.expires_at or datetime.utcnow() + timedelta(hours=settings.ALERT_DEFAULT_TTL_HOURS)
     )
     
     db.add(new_alert)
-    db.commit()
-    db.refresh(new_alert)
+    await db.commit()
+    await db.refresh(new_alert)
     
     # Log admin action - create alert
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    log_alert_action(
+    await log_alert_action(
         db=db,
         admin_user=admin_user,
         action=AuditAction.CREATE_ALERT,
@@ -361,27 +544,36 @@ def create_alert(
         details={
             "title": alert_data.title,
             "severity": alert_data.severity,
-            "message_length": len(alert_data.message)
+            "message_length": len(alert_data.message),
+            "area": "circle" if alert_data.radius_m else "polygon" if alert_data.polygon else None,
+            "expires_at": new_alert.expires_at.isoformat()
         },
         ip_address=client_host,
         user_agent=user_agent,
         success=True
     )
     
-    return AlertResponse.from_orm(new_alert)
+    response = AlertResponse.from_orm(new_alert)
+    publish(ALERT_CREATED, response)
+    return response
 
 
 # ==================== AUDIT LOG ENDPOINTS ====================
 
+# No conditional_get on these two: each 200 writes a VIEW entry, which bumps the
+# audit_logs version, so their ETags would never match on the next poll.
 @router.get("/audit-logs", response_model=AuditLogListResponse)
-def get_audit_logs(
+async def get_audit_logs(
     request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
     action: str = Query(None),
     resource_type: str = Query(None),
     admin_id: UUID = Query(None),
-    db: Session = Depends(get_db),
+    start_date: Optional[datetime] = Query(None, description="Only entries created at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only entries created at or before this time"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -393,9 +585,16 @@ def get_audit_logs(
     - **action**: Filter by action type (optional)
     - **resource_type**: Filter by resource type (optional)
     - **admin_id**: Filter by admin user ID (optional)
+    - **start_date** / **end_date**: Filter by creation time (optional)
+    - **cursor**: Keyset cursor from a previous response (optional, overrides page)
+    
+    Entries past the retention period are read from the archive
+    transparently; a date range narrows which archive segments are opened.
     
     Admin access required.
     """
+    start_date, end_date = _naive_utc(start_date), _naive_utc(end_date)
+
     # Parse action enum if provided
     action_enum = None
     if action:
@@ -408,27 +607,30 @@ def get_audit_logs(
             )
     
     service = AuditService(db)
-    audit_logs = service.get_audit_logs(
+    result = await service.get_audit_logs(
         admin_id=admin_id,
         action=action_enum,
         resource_type=resource_type,
+        start_date=start_date,
+        end_date=end_date,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor
     )
     
-    total = len(service.get_audit_logs(
+    total = await service.count_audit_logs(
         admin_id=admin_id,
         action=action_enum,
         resource_type=resource_type,
-        page=1,
-        page_size=10000  # Get total count
-    ))
+        start_date=start_date,
+        end_date=end_date
+    )
     
     # Log this access
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    service.log_action(
+    await service.log_action(
         admin_user=admin_user,
         action=AuditAction.VIEW_INCIDENTS,  # Using VIEW_INCIDENTS as proxy
         resource_type="AUDIT_LOG",
@@ -438,7 +640,9 @@ def get_audit_logs(
             "filters": {
                 "action": action,
                 "resource_type": resource_type,
-                "admin_id": str(admin_id) if admin_id else None
+                "admin_id": str(admin_id) if admin_id else None,
+                "start_date": start_date.isoformat() if start_date else None,
+                "end_date": end_date.isoformat() if end_date else None
             }
         },
         ip_address=client_host,
@@ -446,19 +650,22 @@ def get_audit_logs(
         success=True
     )
     
-    return AuditLogListResponse(
-        audit_logs=[AuditLogResponse.from_orm(log) for log in audit_logs],
-        total=total,
+    return respond(AuditLogListResponse(
+        audit_logs=to_models(AuditLogResponse, result.items),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
-        page_size=page_size
-    )
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
+    ))
 
 
 @router.get("/audit-logs/stats", response_model=AuditLogStatsResponse)
-def get_audit_stats(
+async def get_audit_stats(
     request: Request,
     days: int = Query(7, ge=1, le=365),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -476,13 +683,13 @@ def get_audit_stats(
     end_date = datetime.utcnow()
     
     service = AuditService(db)
-    stats = service.get_audit_stats(start_date=start_date, end_date=end_date)
+    stats = await service.get_audit_stats(start_date=start_date, end_date=end_date)
     
     # Log this access
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    service.log_action(
+    await service.log_action(
         admin_user=admin_user,
         action=AuditAction.VIEW_INCIDENTS,  # Using VIEW_INCIDENTS as proxy
         resource_type="AUDIT_LOG",
@@ -498,15 +705,31 @@ def get_audit_stats(
     return AuditLogStatsResponse(**stats)
 
 
+@router.get("/audit-logs/writer", response_model=AuditWriterStatsResponse)
+async def get_audit_writer_stats(
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Get write-behind audit pipeline statistics (admin only).
+    
+    Queue depth, batches written, backpressure waits and entries spilled
+    to (or replayed from) the spill file. Not itself audit-logged.
+    
+    Admin access required.
+    """
+    return AuditWriterStatsResponse(**audit_writer.stats())
+
+
 # ==================== SOS ADMIN ENDPOINTS ====================
 
-@router.get("/sos", response_model=SOSListResponse)
-def get_all_sos_alerts(
+@router.get("/sos", response_model=SOSListResponse, dependencies=[Depends(conditional_get("sos"))])
+async def get_all_sos_alerts(
     request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status_filter: str = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -516,34 +739,33 @@ def get_all_sos_alerts(
     - **page**: Page number (default: 1)
     - **page_size**: Items per page (default: 20, max: 100)
     - **status_filter**: Filter by status (optional)
+    - **cursor**: Keyset cursor from a previous response (optional, overrides page)
     
     Admin access required.
     """
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
     # Build query
-    query = db.query(SOS)
+    query = select(SOS)
     
     # Apply status filter if provided
     if status_filter:
         try:
             status_enum = SOSStatus[status_filter]
-            query = query.filter(SOS.status == status_enum)
+            query = query.where(SOS.status == status_enum)
         except KeyError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid status: {status_filter}"
             )
     
-    total = query.count()
-    sos_alerts = query.order_by(SOS.created_at.desc()).offset(offset).limit(page_size).all()
+    total = await count_total(db, query)
+    result = await paginate(db, query, SOS, page, page_size, cursor)
+    sos_alerts = result.items
     
     # Log admin action
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    AuditService(db).log_action(
+    await AuditService(db).log_action(
         admin_user=admin_user,
         action=AuditAction.VIEW_INCIDENTS,
         resource_type="SOS",
@@ -551,7 +773,7 @@ def get_all_sos_alerts(
             "page": page,
             "page_size": page_size,
             "status_filter": status_filter,
-            "total_sos": total,
+            "total_sos": total.value,
             "returned_count": len(sos_alerts)
         },
         ip_address=client_host,
@@ -559,19 +781,40 @@ def get_all_sos_alerts(
         success=True
     )
     
-    return SOSListResponse(
-        sos_alerts=[SOSResponse.from_orm(sos) for sos in sos_alerts],
-        total=total,
+    return respond(SOSListResponse(
+        sos_alerts=to_models(SOSResponse, sos_alerts),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
-        page_size=page_size
-    )
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
+    ))
+
+
+@router.get("/sos/changes", response_model=SOSChangesResponse, dependencies=[Depends(conditional_get("sos"))])
+async def get_sos_changes_admin(
+    since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+    limit: int = Query(200, ge=1, le=settings.SYNC_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Get SOS alerts created or changed since a sync token (admin only).
+
+    Send the returned sync_token back as **since** on the next poll. Meant
+    for frequent polling, so not itself audit-logged.
+
+    Admin access required.
+    """
+    return respond(await get_sos_changes(db, None, since, limit))
 
 
 @router.patch("/sos/{sos_id}/resolve", response_model=SOSResponse)
-def resolve_sos(
+async def resolve_sos(
     sos_id: UUID,
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -580,7 +823,7 @@ def resolve_sos(
     Changes SOS status to SAFE.
     Admin access required.
     """
-    sos_alert = db.query(SOS).filter(SOS.id == sos_id).first()
+    sos_alert = await db.get(SOS, sos_id)
     
     if not sos_alert:
         raise HTTPException(
@@ -590,18 +833,18 @@ def resolve_sos(
     
     previous_status = sos_alert.status.value if sos_alert.status else None
     sos_alert.status = SOSStatus.SAFE
-    db.commit()
-    db.refresh(sos_alert)
+    await db.commit()
+    await db.refresh(sos_alert)
     
     # Log admin action
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
     
-    AuditService(db).log_action(
+    await AuditService(db).log_action(
         admin_user=admin_user,
         action=AuditAction.RESOLVE_INCIDENT,
         resource_type="SOS",
-        resource_id=str(sos_id),
+        resource_id=sos_id,
         details={
             "previous_status": previous_status,
             "new_status": "SAFE",
@@ -613,15 +856,40 @@ def resolve_sos(
         success=True
     )
     
-    return SOSResponse.from_orm(sos_alert)
+    response = SOSResponse.from_orm(sos_alert)
+    publish(SOS_STATUS_CHANGED, {**response.model_dump(), "previous_status": previous_status})
+    return response
 
 
 # ==================== STATS ENDPOINTS ====================
 
-@router.get("/stats/sos", response_model=SOSStatsResponse)
-def get_sos_stats(
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    request: Request,
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Get the dashboard headline numbers and recent activity (admin only).
+
+    Served from a snapshot shared by all admins and refreshed in the
+    background every DASHBOARD_REFRESH_SECONDS, so the numbers can lag a
+    write by a few seconds. Send the ETag back as If-None-Match to get a
+    304 until the snapshot changes. Not itself audit-logged.
+
+    Admin access required.
+    """
+    body, etag = await dashboard_snapshot.current()
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/stats/sos", response_model=SOSStatsResponse, dependencies=[Depends(conditional_get("sos"))])
+async def get_sos_stats(
     request: Request,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
@@ -634,13 +902,14 @@ def get_sos_stats(
     Admin access required.
     """
     # Count SOS alerts where status is not SAFE
-    active_count = db.query(SOS).filter(SOS.status != SOSStatus.SAFE).count()
+    counts = await load_counts(db, SOS)
+    active_count = sum(n for (sos_status,), n in counts.items() if sos_status != SOSStatus.SAFE.value)
 
     # Log admin action
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
 
-    AuditService(db).log_action(
+    await AuditService(db).log_action(
         admin_user=admin_user,
         action=AuditAction.VIEW_INCIDENTS,
         resource_type="SOS_STATS",
@@ -653,6 +922,166 @@ def get_sos_stats(
     return SOSStatsResponse(active_sos=active_count)
 
 
+@router.get("/db/pool", response_model=PoolStatsResponse)
+async def get_db_pool_stats(admin_user: User = Depends(require_admin)):
+    """
+    Get live database connection pool statistics (admin only).
+
+    Reports checked-out connections, overflow in use, checkout wait time
+    and checkout timeouts for each engine in this worker process.
+
+    Admin access required.
+    """
+    return PoolStatsResponse(
+        pre_ping=settings.DB_POOL_PRE_PING,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        engines=registry.pool_status()
+    )
+
+
+@router.get("/auth/principals", response_model=PrincipalCacheStatsResponse)
+async def get_principal_cache_stats(admin_user: User = Depends(require_admin)):
+    """
+    Get authenticated-principal cache statistics for this worker process (admin only).
+
+    Hits are requests authenticated without decoding the token or loading
+    the user; invalidations count commits that changed users.
+
+    Admin access required.
+    """
+    return PrincipalCacheStatsResponse(**principal_cache.stats())
+
+
+@router.get("/auth/hashing", response_model=PasswordHashingStatsResponse)
+async def get_password_hashing_stats(admin_user: User = Depends(require_admin)):
+    """
+    Get password hashing pool statistics for this worker process (admin only).
+
+    Queue times are how long sign-ins waited for a free bcrypt worker;
+    rejected calls were answered 503 because too many were already waiting.
+
+    Admin access required.
+    """
+    return PasswordHashingStatsResponse(**password_hasher.stats())
+
+
+@router.get("/telemetry", response_model=TelemetryStatsResponse)
+async def get_telemetry_stats(admin_user: User = Depends(require_admin)):
+    """
+    Get telemetry exporter statistics (admin only).
+
+    Queue depth, batches sent, retries and events dropped on overflow or
+    after failed sends, for this worker process.
+
+    Admin access required.
+    """
+    stats = telemetry_stats()
+    if stats is None:
+        return TelemetryStatsResponse(enabled=False)
+    return TelemetryStatsResponse(enabled=True, **stats)
+
+
+# ==================== EVENT STREAM ====================
+
+@router.post("/stream/ticket", response_model=StreamTicketResponse)
+async def create_stream_ticket(
+    db: AsyncSession = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Issue a ticket for opening the event stream (admin only).
+
+    Pass it as ``?ticket=`` to GET /api/admin/stream, which is how
+    EventSource clients authenticate without putting the bearer token in
+    the URL. A ticket opens one stream and expires after
+    STREAM_TICKET_TTL_SECONDS; reconnecting needs a new one.
+
+    Admin access required.
+    """
+    ticket = await issue_stream_ticket(db, admin_user.id)
+    return StreamTicketResponse(ticket=ticket, expires_in=settings.STREAM_TICKET_TTL_SECONDS)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_events(
+    request: Request,
+    ticket: Optional[str] = Query(None, description="Ticket from POST /api/admin/stream/ticket, for EventSource clients that cannot send headers"),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event id (the Last-Event-ID header takes precedence)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """
+    Live admin events as Server-Sent Events (admin only).
+
+    Events: sos.created, sos.status_changed, incident.created,
+    incident.status_changed, alert.created and message.created, each with the
+    affected record as JSON. A reconnecting EventSource resumes after its
+    Last-Event-ID. A ``reset`` event means events were missed; the client
+    should re-fetch its data.
+
+    Authenticate with an Authorization header or a single-use ``ticket``;
+    access tokens are not accepted in the query string, which ends up in
+    access logs.
+
+    Admin access required.
+    """
+    if not credentials and not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Short-lived session: an open stream must not hold a pooled connection
+    async with AsyncSessionLocal() as db:
+        if credentials:
+            user = await get_current_user(credentials, db)
+        else:
+            user_id = await redeem_stream_ticket(db, ticket)
+            user = await db.get(User, user_id) if user_id else None
+            if user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired stream ticket",
+                )
+            user = Principal.of(user)
+        admin_user = await require_admin(user)
+        resume_from = request.headers.get("last-event-id") or last_event_id
+
+        if event_broker.connections >= event_broker.max_connections:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many event stream connections",
+                headers={"Retry-After": "10"},
+            )
+
+        await AuditService(db).log_action(
+            admin_user=admin_user,
+            action=AuditAction.VIEW_INCIDENTS,
+            resource_type="EVENT_STREAM",
+            details={"last_event_id": resume_from},
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent", None),
+            success=True
+        )
+
+    return StreamingResponse(
+        event_broker.stream(resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stream/stats", response_model=EventStreamStatsResponse)
+async def get_event_stream_stats(admin_user: User = Depends(require_admin)):
+    """
+    Get event stream statistics for this worker process (admin only).
+
+    Admin access required.
+    """
+    return EventStreamStatsResponse(**event_broker.stats())
+
+
 # ==================== MAP DATA ENDPOINT ====================
 
 class MapMarkerResponse(BaseModel):
@@ -672,90 +1101,84 @@ class MapMarkerResponse(BaseModel):
         from_attributes = True
 
 
+class MapClusterResponse(BaseModel):
+    """Schema for a grid cluster of incidents or SOS alerts."""
+    type: str  # "incident" or "sos"
+    lat: float  # centroid
+    lng: float
+    count: int
+    worst_status: Optional[str] = None
+    min_battery: Optional[int] = None  # SOS clusters only
+
+
 class MapDataResponse(BaseModel):
     """Schema for combined map data response."""
     incidents: List[MapMarkerResponse]
     sos_alerts: List[MapMarkerResponse]
+    clusters: List[MapClusterResponse] = []
+    clustered: bool = False
 
 
-@router.get("/map-data", response_model=MapDataResponse)
-def get_map_data(
+@router.get(
+    "/map-data",
+    response_model=MapDataResponse,
+    dependencies=[Depends(conditional_get("incidents", "sos"))],
+)
+async def get_map_data(
     request: Request,
-    db: Session = Depends(get_db),
+    bbox: Optional[str] = Query(None, description="Viewport as west,south,east,north in degrees"),
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Map zoom level; low zooms return clusters"),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
-    Get all incidents and SOS alerts for map visualization (admin only).
+    Get incidents and SOS alerts for map visualization (admin only).
+
+    - **bbox**: Only return points inside this viewport (optional)
+    - **zoom**: Below MAP_CLUSTER_MAX_ZOOM, points are aggregated into grid
+      clusters sized for this zoom level (optional; omitted = markers)
 
     Returns:
     - incidents: List of incident markers (status != RESOLVED)
     - sos_alerts: List of SOS markers (status != SAFE)
+    - clusters: Per-cell count, centroid, worst status and minimum battery
+      (when clustered; incidents and sos_alerts are then empty)
 
     Admin access required.
     """
-    # Get active incidents (not resolved)
-    active_incidents = db.query(Incident).filter(
-        Incident.status != IncidentStatus.RESOLVED
-    ).all()
-
-    # Get active SOS alerts (not SAFE)
-    active_sos = db.query(SOS).filter(
-        SOS.status != SOSStatus.SAFE
-    ).all()
-
-    # Format incidents
-    incident_markers = [
-        MapMarkerResponse(
-            id=inc.id,
-            type="incident",
-            lat=inc.lat,
-            lng=inc.lng,
-            status=inc.status.value if inc.status else "UNKNOWN",
-            title=f"Incident: {inc.type}",
-            severity=inc.risk_level,
-            ability=None,
-            battery=None,
-            created_at=inc.created_at
-        )
-        for inc in active_incidents
-    ]
-
-    # Format SOS
-    sos_markers = [
-        MapMarkerResponse(
-            id=sos.id,
-            type="sos",
-            lat=sos.lat,
-            lng=sos.lng,
-            status=sos.status.value if sos.status else "NEED_HELP",
-            title=f"SOS — Status: {sos.status.value if sos.status else 'NEED_HELP'}",
-            severity="critical",
-            ability=sos.ability.value if sos.ability else None,
-            battery=sos.battery,
-            created_at=sos.created_at
-        )
-        for sos in active_sos
-    ]
+    viewport = parse_bbox(bbox)
+    incident_markers, sos_markers, clusters = [], [], []
+    clustered = use_clusters(zoom)
+    if clustered:
+        clusters = to_models(MapClusterResponse, await load_clusters(db, viewport, zoom))
+    else:
+        incidents, sos_alerts = await load_markers(db, viewport)
+        incident_markers = to_models(MapMarkerResponse, incidents)
+        sos_markers = to_models(MapMarkerResponse, sos_alerts)
 
     # Log admin action
     client_host = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent", None)
 
-    AuditService(db).log_action(
+    await AuditService(db).log_action(
         admin_user=admin_user,
         action=AuditAction.VIEW_INCIDENTS,
         resource_type="MAP_DATA",
         details={
             "incident_count": len(incident_markers),
-            "sos_count": len(sos_markers)
+            "sos_count": len(sos_markers),
+            "cluster_count": len(clusters),
+            "bbox": bbox,
+            "zoom": zoom
         },
         ip_address=client_host,
         user_agent=user_agent,
         success=True
     )
 
-    return MapDataResponse(
+    return respond(MapDataResponse(
         incidents=incident_markers,
-        sos_alerts=sos_markers
-    )
-
+        sos_alerts=sos_markers,
+        clusters=clusters,
+        clustered=clustered
+    ))
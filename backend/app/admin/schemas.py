@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 from datetime import datetime
 
@@ -30,8 +30,11 @@ class AuditLogListResponse(BaseModel):
     """Schema for paginated audit log list."""
     audit_logs: List[AuditLogResponse]
     total: int
+    total_exact: bool = True
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class AuditLogStatsResponse(BaseModel):
@@ -43,6 +46,20 @@ class AuditLogStatsResponse(BaseModel):
     by_admin: dict
 
 
+class AuditWriterStatsResponse(BaseModel):
+    """Schema for write-behind audit pipeline statistics."""
+    running: bool
+    queue_depth: int
+    queue_capacity: int
+    enqueued: int
+    written: int
+    batches: int
+    failed_batches: int
+    backpressure_waits: int
+    spilled: int
+    replayed: int
+
+
 class AuditLogFilter(BaseModel):
     """Schema for filtering audit logs."""
     admin_id: Optional[UUID] = None
@@ -67,3 +84,121 @@ class ActivityStatsResponse(BaseModel):
 class SOSStatsResponse(BaseModel):
     """Schema for SOS statistics response."""
     active_sos: int
+
+
+class PoolEngineStats(BaseModel):
+    """Live statistics for one engine's connection pool."""
+    engine: str  # "async" (API routes) or "sync" (scripts)
+    pool_class: str
+    size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    idle: Optional[int] = None
+    overflow_in_use: Optional[int] = None
+    checked_out: int
+    total_checkouts: int
+    connects: int
+    timeouts: int
+    wait_avg_ms: float
+    wait_p95_ms: float
+    wait_max_ms: float
+
+
+class PoolStatsResponse(BaseModel):
+    """Schema for database connection pool statistics."""
+    pre_ping: bool
+    pool_timeout: float
+    pool_recycle: int
+    engines: List[PoolEngineStats]
+
+
+class PrincipalCacheStatsResponse(BaseModel):
+    """Schema for authenticated-principal cache statistics."""
+    entries: int
+    max_entries: int
+    ttl: float
+    hits: int
+    misses: int
+    invalidations: int
+
+
+class PasswordHashingStatsResponse(BaseModel):
+    """Schema for password hashing pool statistics."""
+    running: bool
+    workers: int
+    max_pending: int
+    rounds: int  # bcrypt cost of new hashes
+    target_ms: Optional[float] = None  # calibration target; None when the cost is fixed
+    in_flight: int
+    waiting: int
+    completed: int
+    rejected: int
+    queue_avg_ms: float
+    queue_p95_ms: float
+    queue_max_ms: float
+    run_avg_ms: float
+
+
+class EventStreamStatsResponse(BaseModel):
+    """Schema for admin event stream statistics."""
+    epoch: str
+    last_event_id: str
+    buffered: int
+    buffer_size: int
+    connections: int
+    max_connections: int
+    published: int
+    resets: int
+
+
+class StreamTicketResponse(BaseModel):
+    """Schema for a single-use admin event stream ticket."""
+    ticket: str
+    expires_in: int  # seconds
+
+
+class TelemetryStatsResponse(BaseModel):
+    """Schema for telemetry exporter statistics."""
+    enabled: bool
+    sink: Optional[str] = None  # "azure", "file" or "socket"
+    running: bool = False
+    queue_depth: int = 0
+    queue_capacity: int = 0
+    enqueued: int = 0
+    sent: int = 0
+    batches: int = 0
+    retries: int = 0
+    dropped_overflow: int = 0
+    dropped_failed: int = 0
+    last_error: Optional[str] = None
+
+
+class DashboardIncidentStats(BaseModel):
+    total: int
+    open: int  # not RESOLVED
+    by_status: Dict[str, int]
+
+
+class DashboardSOSStats(BaseModel):
+    total: int
+    active: int  # not SAFE
+    by_status: Dict[str, int]
+
+
+class DashboardMessageStats(BaseModel):
+    total: int
+    unread: int
+    read: int
+    by_type: Dict[str, int]
+
+
+class DashboardResponse(BaseModel):
+    """Schema for the admin dashboard snapshot (app/admin/dashboard.py)."""
+    users: int
+    incidents: DashboardIncidentStats
+    sos: DashboardSOSStats
+    active_alerts: int
+    messages: DashboardMessageStats
+    recent_activity: List[AuditLogResponse]
+    status: str
+    version: str
+    generated_at: datetime  # when the snapshot was computed (UTC)
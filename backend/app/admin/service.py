@@ -5,15 +5,19 @@ Provides database operations for audit logging.
 
 import json
 from typing import Optional, List
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID, uuid4
 from datetime import datetime, timedelta
 
+from app.admin.audit_archive import archived_rows, count_archived
+from app.admin.audit_writer import audit_writer, emit_side_channels
+from app.admin.rollups import add_to_rollups, rollup_stats
+from app.core.config import settings
 from app.db.models import AuditLog, AuditAction, User
-from app.core.logger import log_admin_action
+from app.utils.counting import Total, count_total
+from app.utils.pagination import Page, paginate
 from app.core.azure_logging import (
-    log_admin_action_azure,
     log_incident_action_azure,
     log_alert_action_azure,
     log_security_event_azure
@@ -23,10 +27,10 @@ from app.core.azure_logging import (
 class AuditService:
     """Service for managing audit logs."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def log_action(
+    async def log_action(
         self,
         admin_user: User,
         action: AuditAction,
@@ -39,7 +43,12 @@ class AuditService:
         error_message: Optional[str] = None
     ) -> AuditLog:
         """
-        Log an admin action to the database.
+        Record an admin action.
+        
+        With AUDIT_WRITE_BEHIND on (and the writer started by the app
+        lifespan) the row is queued for a batched background insert and
+        the request does not wait on the database, the log file or Azure.
+        Otherwise it is inserted immediately, as scripts expect.
         
         Args:
             admin_user: The admin user performing the action
@@ -53,55 +62,36 @@ class AuditService:
             error_message: Error message if action failed
         
         Returns:
-            AuditLog: The created audit log entry
+            AuditLog: The audit log entry (transient when queued)
         """
-        # Create audit log entry
-        audit_entry = AuditLog(
-            admin_id=admin_user.id,
-            admin_email=admin_user.email,
-            action=action,
-            resource_type=resource_type,
-            resource_id=resource_id,
-            details=json.dumps(details) if details else None,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            success=1 if success else 0,
-            error_message=error_message
-        )
+        row = {
+            "id": uuid4(),
+            "admin_id": admin_user.id,
+            "admin_email": admin_user.email,
+            "action": action,
+            "resource_type": resource_type,
+            "resource_id": resource_id,
+            "details": json.dumps(details) if details else None,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "success": 1 if success else 0,
+            "error_message": error_message,
+            "created_at": datetime.utcnow()
+        }
         
-        self.db.add(audit_entry)
-        self.db.commit()
-        self.db.refresh(audit_entry)
+        if settings.AUDIT_WRITE_BEHIND and audit_writer.running:
+            await audit_writer.submit(row)
+            return AuditLog(**row)
         
-        # Also log to application logger
-        log_admin_action(
-            admin_id=str(admin_user.id),
-            admin_email=admin_user.email,
-            action=action.value,
-            resource_type=resource_type,
-            resource_id=str(resource_id) if resource_id else None,
-            details=details,
-            success=success,
-            error_message=error_message
-        )
-        
-        # Also log to Azure (if configured)
-        try:
-            log_admin_action_azure(
-                admin_id=str(admin_user.id),
-                admin_email=admin_user.email,
-                action=action.value,
-                resource_type=resource_type,
-                resource_id=str(resource_id) if resource_id else None,
-                success=success,
-                error_message=error_message
-            )
-        except Exception:
-            pass  # Azure logging is optional
+        audit_entry = AuditLog(**row)
+        self.db.add(audit_entry)
+        await add_to_rollups(self.db, [row])
+        await self.db.commit()
+        emit_side_channels(row)
         
         return audit_entry
     
-    def get_audit_logs(
+    async def get_audit_logs(
         self,
         admin_id: Optional[UUID] = None,
         action: Optional[AuditAction] = None,
@@ -110,11 +100,15 @@ class AuditService:
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
         page: int = 1,
-        page_size: int = 50
-    ) -> List[AuditLog]:
+        page_size: int = 50,
+        cursor: Optional[str] = None
+    ) -> Page:
         """
         Get audit logs with filtering and pagination.
         
+        Archived entries (app.admin.audit_archive) are merged in, so pages
+        and cursors run on past the retention period.
+        
         Args:
             admin_id: Filter by admin user ID
             action: Filter by action type
@@ -124,34 +118,70 @@ class AuditService:
             end_date: Filter by end date
             page: Page number (1-indexed)
             page_size: Items per page
+            cursor: Keyset cursor from a previous page (overrides page)
         
         Returns:
-            List[AuditLog]: List of audit log entries
+            Page: Audit log entries plus next/prev cursors
         """
-        query = self.db.query(AuditLog)
+        filters = dict(
+            admin_id=admin_id, action=action, resource_type=resource_type,
+            resource_id=resource_id, start_date=start_date, end_date=end_date,
+        )
+        
+        async def from_archive(position, direction, limit):
+            return await archived_rows(self.db, position, direction, limit, **filters)
+        
+        query = self._filtered_query(**filters)
+        return await paginate(self.db, query, AuditLog, page, page_size, cursor, merge_with=from_archive)
+    
+    async def count_audit_logs(
+        self,
+        admin_id: Optional[UUID] = None,
+        action: Optional[AuditAction] = None,
+        resource_type: Optional[str] = None,
+        resource_id: Optional[UUID] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Total:
+        """
+        Count audit logs matching the same filters as get_audit_logs.
+        
+        Returns:
+            Total: Cached or capped count, estimated for very large results,
+            plus the matching archived entries
+        """
+        query = self._filtered_query(admin_id, action, resource_type, resource_id, start_date, end_date)
+        live = await count_total(self.db, query)
+        archived, exact = await count_archived(
+            self.db, admin_id=admin_id, action=action, resource_type=resource_type,
+            resource_id=resource_id, start_date=start_date, end_date=end_date,
+        )
+        return Total(live.value + archived, live.exact and exact)
+    
+    @staticmethod
+    def _filtered_query(admin_id, action, resource_type, resource_id, start_date, end_date):
+        query = select(AuditLog)
         
         if admin_id:
-            query = query.filter(AuditLog.admin_id == admin_id)
+            query = query.where(AuditLog.admin_id == admin_id)
         if action:
-            query = query.filter(AuditLog.action == action)
+            query = query.where(AuditLog.action == action)
         if resource_type:
-            query = query.filter(AuditLog.resource_type == resource_type)
+            query = query.where(AuditLog.resource_type == resource_type)
         if resource_id:
-            query = query.filter(AuditLog.resource_id == resource_id)
+            query = query.where(AuditLog.resource_id == resource_id)
         if start_date:
-            query = query.filter(AuditLog.created_at >= start_date)
+            query = query.where(AuditLog.created_at >= start_date)
         if end_date:
-            query = query.filter(AuditLog.created_at <= end_date)
-        
-        offset = (page - 1) * page_size
+            query = query.where(AuditLog.created_at <= end_date)
         
-        return query.order_by(desc(AuditLog.created_at)).offset(offset).limit(page_size).all()
+        return query
     
-    def get_audit_log_by_id(self, log_id: UUID) -> Optional[AuditLog]:
-        """Get a single audit log by ID."""
-        return self.db.query(AuditLog).filter(AuditLog.id == log_id).first()
+    async def get_audit_log_by_id(self, log_id: UUID) -> Optional[AuditLog]:
+        """Get a single audit log by ID (live entries only)."""
+        return await self.db.scalar(select(AuditLog).where(AuditLog.id == log_id))
     
-    def get_audit_stats(
+    async def get_audit_stats(
         self,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
@@ -159,6 +189,9 @@ class AuditService:
         """
         Get audit log statistics.
         
+        Summed from the hourly and daily rollups (app.admin.rollups); only
+        the partial hours at either end of the window read audit_logs.
+        
         Args:
             start_date: Start date for statistics
             end_date: End date for statistics
@@ -166,46 +199,9 @@ class AuditService:
         Returns:
             dict: Statistics about audit logs
         """
-        query = self.db.query(AuditLog)
-        
-        if start_date:
-            query = query.filter(AuditLog.created_at >= start_date)
-        if end_date:
-            query = query.filter(AuditLog.created_at <= end_date)
-        
-        total = query.count()
-        successful = query.filter(AuditLog.success == 1).count()
-        failed = query.filter(AuditLog.success == 0).count()
-        
-        # Count by action type
-        action_counts = {}
-        for action in AuditAction:
-            count = query.filter(AuditLog.action == action).count()
-            if count > 0:
-                action_counts[action.value] = count
-        
-        # Count by admin
-        admin_counts = {}
-        for admin_id, email in self.db.query(
-            AuditLog.admin_id, 
-            AuditLog.admin_email
-        ).filter(
-            AuditLog.created_at >= (start_date or datetime.min)
-        ).filter(
-            AuditLog.created_at <= (end_date or datetime.utcnow())
-        ).distinct().all():
-            count = query.filter(AuditLog.admin_id == admin_id).count()
-            admin_counts[email] = count
-        
-        return {
-            "total": total,
-            "successful": successful,
-            "failed": failed,
-            "by_action": action_counts,
-            "by_admin": admin_counts
-        }
+        return await rollup_stats(self.db, start_date, end_date)
     
-    def get_recent_activity(
+    async def get_recent_activity(
         self,
         admin_id: Optional[UUID] = None,
         limit: int = 10
@@ -220,16 +216,12 @@ class AuditService:
         Returns:
             List[AuditLog]: Recent audit log entries
         """
-        query = self.db.query(AuditLog)
-        
-        if admin_id:
-            query = query.filter(AuditLog.admin_id == admin_id)
-        
-        return query.order_by(desc(AuditLog.created_at)).limit(limit).all()
+        page = await self.get_audit_logs(admin_id=admin_id, page_size=limit)
+        return page.items
 
 
-def log_incident_action(
-    db: Session,
+async def log_incident_action(
+    db: AsyncSession,
     admin_user: User,
     action: AuditAction,
     incident_id: UUID,
@@ -280,7 +272,7 @@ def log_incident_action(
     except Exception:
         pass
     
-    return service.log_action(
+    return await service.log_action(
         admin_user=admin_user,
         action=action,
         resource_type="INCIDENT",
@@ -293,8 +285,8 @@ def log_incident_action(
     )
 
 
-def log_alert_action(
-    db: Session,
+async def log_alert_action(
+    db: AsyncSession,
     admin_user: User,
     action: AuditAction,
     alert_id: UUID,
@@ -342,7 +334,7 @@ def log_alert_action(
     except Exception:
         pass
     
-    return service.log_action(
+    return await service.log_action(
         admin_user=admin_user,
         action=action,
         resource_type="ALERT",
@@ -355,8 +347,8 @@ def log_alert_action(
     )
 
 
-def log_auth_action(
-    db: Session,
+async def log_auth_action(
+    db: AsyncSession,
     admin_user: Optional[User],
     action: AuditAction,
     email: str,
@@ -405,7 +397,7 @@ def log_auth_action(
         return None
     
     service = AuditService(db)
-    return service.log_action(
+    return await service.log_action(
         admin_user=admin_user,
         action=action,
         resource_type="AUTH",
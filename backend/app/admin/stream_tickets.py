@@ -0,0 +1,61 @@
+"""
+Single-use tickets for opening the admin event stream.
+
+Browser ``EventSource`` cannot send an Authorization header, so the stream
+URL has to carry its credential, and URLs end up in access and proxy logs.
+Instead of the bearer token the dashboard puts a ticket there: a random
+value issued by an authenticated POST, valid for
+``STREAM_TICKET_TTL_SECONDS`` and deleted when the stream redeems it, so a
+logged URL is useless by the time anyone reads it.
+
+Tickets live in ``stream_tickets`` (only their SHA-256 is stored) so any
+worker can redeem one issued by another. Expired tickets are pruned
+whenever a new one is issued.
+"""
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import StreamTicket
+
+
+def _digest(ticket: str) -> str:
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+
+async def issue_stream_ticket(db: AsyncSession, user_id: UUID) -> str:
+    """Create a ticket for ``user_id`` and commit it; returns the ticket."""
+    now = datetime.utcnow()
+    await db.execute(delete(StreamTicket).where(StreamTicket.expires_at <= now))
+    ticket = secrets.token_urlsafe(32)
+    db.add(StreamTicket(
+        id=_digest(ticket),
+        user_id=user_id,
+        expires_at=now + timedelta(seconds=settings.STREAM_TICKET_TTL_SECONDS),
+    ))
+    await db.commit()
+    return ticket
+
+
+async def redeem_stream_ticket(db: AsyncSession, ticket: str) -> Optional[UUID]:
+    """
+    Consume ``ticket`` and commit.
+
+    Returns:
+        The user it was issued to, or None if it is unknown, expired or
+        already used
+    """
+    user_id = await db.scalar(
+        delete(StreamTicket)
+        .where(StreamTicket.id == _digest(ticket), StreamTicket.expires_at > datetime.utcnow())
+        .returning(StreamTicket.user_id)
+    )
+    await db.commit()
+    return user_id
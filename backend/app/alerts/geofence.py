@@ -0,0 +1,181 @@
+"""
+In-memory index of active alerts for "which alerts cover this point".
+
+Each worker keeps the active alerts bucketed on a lat/lng grid of
+``ALERT_INDEX_CELL_DEG`` cells: an alert is listed in every cell its area's
+bounding box touches, so a lookup reads one cell and runs the exact circle or
+polygon test on the few alerts listed there. Alerts without an area, and
+areas spanning more than ``_MAX_CELLS`` cells, are kept in short lists that
+every lookup checks.
+
+Expiry needs no clean-up job: a heap ordered by ``expires_at`` is popped on
+every lookup and expired alerts are unlinked from their cells. The index is
+reloaded from the database when this worker commits a change to the alerts
+table (tracked through the count cache's table generations) and at least
+every ``ALERT_INDEX_REFRESH_SECONDS`` for changes made by other workers.
+"""
+
+import asyncio
+import heapq
+import json
+import math
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.alerts.schemas import AlertResponse
+from app.core.config import settings
+from app.db.models import Alert, alert_active
+from app.utils.counting import count_cache
+from app.utils.geo import BBox, circle_bbox, distance_m, point_in_polygon
+from app.utils.serialization import to_models
+
+_MAX_CELLS = 4096
+
+
+class _Area:
+    __slots__ = ("alert", "expires_at", "polygon", "cells")
+
+    def __init__(self, alert: AlertResponse, polygon: Optional[List[Tuple[float, float]]]):
+        self.alert = alert
+        self.expires_at = alert.expires_at
+        self.polygon = polygon
+        self.cells: List[Tuple[int, int]] = []
+
+    def bbox(self) -> Optional[BBox]:
+        alert = self.alert
+        if alert.radius_m is not None:
+            return circle_bbox(alert.center_lat, alert.center_lng, alert.radius_m)
+        if self.polygon is not None:
+            lats = [lat for lat, _ in self.polygon]
+            lngs = [lng for _, lng in self.polygon]
+            return BBox(min(lngs), min(lats), max(lngs), max(lats))
+        return None
+
+    def covers(self, lat: float, lng: float) -> bool:
+        alert = self.alert
+        if alert.radius_m is not None:
+            return distance_m(lat, lng, alert.center_lat, alert.center_lng) <= alert.radius_m
+        if self.polygon is not None:
+            return point_in_polygon(lat, lng, self.polygon)
+        return True
+
+
+class AlertIndex:
+    """Grid-bucketed active alerts with lazy expiry."""
+
+    def __init__(self, cell_deg: float, refresh_seconds: float):
+        self.cell_deg = cell_deg
+        self.refresh_seconds = refresh_seconds
+        self._rows = math.ceil(180 / cell_deg)
+        self._cols = math.ceil(360 / cell_deg)
+        self._cells: Dict[Tuple[int, int], List[_Area]] = {}
+        self._unbucketed: List[_Area] = []  # no area, or too large to bucket
+        self._expiry: List[Tuple[datetime, int, _Area]] = []
+        self._loaded_at: Optional[float] = None
+        self._generation: Optional[int] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _row(self, lat: float) -> int:
+        return min(self._rows - 1, max(0, int((lat + 90) // self.cell_deg)))
+
+    def _col(self, lng: float) -> int:
+        return min(self._cols - 1, max(0, int((lng + 180) // self.cell_deg)))
+
+    def _cells_for(self, bbox: BBox) -> Optional[List[Tuple[int, int]]]:
+        if bbox.crosses_antimeridian:
+            spans = [(bbox.west, 180.0), (-180.0, bbox.east)]
+        else:
+            spans = [(bbox.west, bbox.east)]
+        rows = range(self._row(bbox.south), self._row(bbox.north) + 1)
+        cols = [c for west, east in spans for c in range(self._col(west), self._col(east) + 1)]
+        if len(rows) * len(cols) > _MAX_CELLS:
+            return None
+        return [(r, c) for r in rows for c in cols]
+
+    def _add(self, area: _Area) -> None:
+        bbox = area.bbox()
+        cells = self._cells_for(bbox) if bbox is not None else None
+        if cells is None:
+            self._unbucketed.append(area)
+        else:
+            area.cells = cells
+            for cell in cells:
+                self._cells.setdefault(cell, []).append(area)
+        if area.expires_at is not None:
+            heapq.heappush(self._expiry, (area.expires_at, id(area), area))
+
+    def _remove(self, area: _Area) -> None:
+        if not area.cells:
+            self._unbucketed.remove(area)
+        for cell in area.cells:
+            bucket = self._cells[cell]
+            bucket.remove(area)
+            if not bucket:
+                del self._cells[cell]
+
+    def _expire(self, now: datetime) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            self._remove(heapq.heappop(self._expiry)[2])
+
+    def load(self, alerts: List[AlertResponse]) -> None:
+        """Replace the index contents with ``alerts``."""
+        self._cells.clear()
+        self._unbucketed.clear()
+        self._expiry.clear()
+        for alert in alerts:
+            polygon = [(p.lat, p.lng) for p in alert.polygon] if alert.polygon else None
+            self._add(_Area(alert, polygon))
+
+    def _stale(self) -> bool:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            return True
+        return count_cache.generations(["alerts"])["alerts"] != self._generation
+
+    async def _refresh(self, db: AsyncSession) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._stale():
+                return  # another request reloaded while we waited
+            generation = count_cache.generations(["alerts"])["alerts"]
+            rows = await db.scalars(select(Alert).where(alert_active(datetime.utcnow())))
+            self.load(to_models(AlertResponse, rows))
+            self._generation = generation
+            self._loaded_at = time.monotonic()
+
+    async def covering(self, db: AsyncSession, lat: float, lng: float) -> List[AlertResponse]:
+        """
+        Active alerts whose area contains the point, newest first.
+
+        Args:
+            db: Database session, used only when the index needs a reload
+            lat, lng: Point to look up
+
+        Returns:
+            Matching alerts, including alerts without an area
+        """
+        if self._stale():
+            await self._refresh(db)
+        now = datetime.utcnow()
+        self._expire(now)
+        candidates = self._cells.get((self._row(lat), self._col(lng)), [])
+        found = [
+            area.alert for area in (*candidates, *self._unbucketed)
+            if area.covers(lat, lng)
+        ]
+        found.sort(key=lambda alert: (alert.created_at, alert.id), reverse=True)
+        return found
+
+
+alert_index = AlertIndex(settings.ALERT_INDEX_CELL_DEG, settings.ALERT_INDEX_REFRESH_SECONDS)
+
+
+def polygon_json(points) -> Optional[str]:
+    """Storage form of a polygon: JSON list of [lat, lng] pairs."""
+    if points is None:
+        return None
+    return json.dumps([[point.lat, point.lng] for point in points])
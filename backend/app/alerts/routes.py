@@ -1,12 +1,24 @@
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
+from app.core.config import settings
 from app.db.database import get_db
-from app.db.models import Alert
+from app.db.models import Alert, alert_active
+from app.alerts.geofence import alert_index
+from app.utils.exceptions import bad_request
+from app.utils.counting import count_total
+from app.utils.etag import conditional_get
+from app.utils.pagination import paginate
+from app.utils.serialization import respond, to_models
+from app.utils.sync import load_changes, record_deletion
 from app.alerts.schemas import (
     AlertResponse,
     AlertListResponse,
+    AlertChangesResponse,
     AlertType,
 )
 
@@ -14,41 +26,105 @@ from app.alerts.schemas import (
 router = APIRouter(prefix="/api/alerts", tags=["Alerts"])
 
 
-@router.get("", response_model=AlertListResponse)
-def get_alerts(
+@router.get(
+    "",
+    response_model=AlertListResponse,
+    dependencies=[Depends(conditional_get(
+        "alerts",
+        auth=False,
+        window=settings.ALERTS_CACHE_MAX_AGE,  # alerts expire without a write
+        cache_control=f"public, max-age={settings.ALERTS_CACHE_MAX_AGE}, s-maxage={settings.ALERTS_CACHE_MAX_AGE}",
+    ))],
+)
+async def get_alerts(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    include_expired: bool = Query(False),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
 ):
-    offset = (page - 1) * page_size
-
-    query = db.query(Alert)
-
-    total = query.count()
-
-    alerts = (
-        query.order_by(Alert.created_at.desc())
-        .offset(offset)
-        .limit(page_size)
-        .all()
-    )
+    """
+    Get active alerts, newest first.
 
-    return AlertListResponse(
-        alerts=[AlertResponse.from_orm(alert) for alert in alerts],
-        total=total,
+    - **lat**, **lng**: Only alerts whose area covers this point, plus alerts
+      without an area. Answered from the in-memory alert index as a single
+      page of at most page_size alerts.
+    - **include_expired**: Also list expired alerts (not with lat/lng)
+    """
+    if (lat is None) != (lng is None):
+        raise bad_request("lat and lng must be given together")
+    if lat is not None:
+        if include_expired:
+            raise bad_request("include_expired cannot be combined with lat/lng")
+        alerts = await alert_index.covering(db, lat, lng)
+        return respond(AlertListResponse(
+            alerts=alerts[:page_size],
+            total=len(alerts),
+            page=1,
+            page_size=page_size,
+        ))
+
+    query = select(Alert)
+    if not include_expired:
+        query = query.where(alert_active(datetime.utcnow()))
+
+    total = await count_total(db, query)
+
+    result = await paginate(db, query, Alert, page, page_size, cursor)
+
+    return respond(AlertListResponse(
+        alerts=to_models(AlertResponse, result.items),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
         page_size=page_size,
-    )
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
+    ))
+
+
+@router.get(
+    "/changes",
+    response_model=AlertChangesResponse,
+    dependencies=[Depends(conditional_get(
+        "alerts",
+        auth=False,
+        window=settings.ALERTS_CACHE_MAX_AGE,
+        cache_control=f"public, max-age={settings.ALERTS_CACHE_MAX_AGE}, s-maxage={settings.ALERTS_CACHE_MAX_AGE}",
+    ))],
+)
+async def get_alert_changes(
+    since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+    limit: int = Query(200, ge=1, le=settings.SYNC_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Active alerts created or changed since the sync token.
+
+    Resolved alerts are listed in **deleted**. Alerts that reach expires_at
+    are not; clients drop them by their expires_at.
+    """
+    query = select(Alert).where(alert_active(datetime.utcnow()))
+    changes = await load_changes(db, query, Alert, "alerts", since, limit)
+
+    return respond(AlertChangesResponse(
+        alerts=to_models(AlertResponse, changes.items),
+        deleted=changes.deleted,
+        sync_token=changes.sync_token,
+        has_more=changes.has_more,
+    ))
 
 
 @router.delete("/{alert_id}/resolve")
-def resolve_alert(alert_id: UUID, db: Session = Depends(get_db)):
+async def resolve_alert(alert_id: UUID, db: AsyncSession = Depends(get_db)):
     """
-    Resolve an alert by deleting it.
+    Resolve an alert by expiring it now.
     Only INCIDENT alerts can be resolved.
     """
 
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id)
 
     if not alert:
         raise HTTPException(
@@ -67,7 +143,10 @@ def resolve_alert(alert_id: UUID, db: Session = Depends(get_db)):
             detail="Only incident alerts can be resolved.",
         )
 
-    db.delete(alert)
-    db.commit()
+    now = datetime.utcnow()
+    if alert.expires_at is None or alert.expires_at > now:
+        alert.expires_at = now
+        await record_deletion(db, "alerts", alert.id)
+        await db.commit()
 
     return {"message": "Alert resolved successfully"}
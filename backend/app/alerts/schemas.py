@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field
+import json
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Optional
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 from app.db.models import AlertSeverity
@@ -13,11 +15,49 @@ class AlertType(str, Enum):
     EMERGENCY = "EMERGENCY"
 
 
+class AlertPoint(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+
+
 class AlertCreate(BaseModel):
+    """
+    Alert to publish. Give a circle (center_lat, center_lng, radius_m) or a
+    polygon to target an area, or neither for everyone. Without expires_at
+    the alert expires after ALERT_DEFAULT_TTL_HOURS.
+    """
     title: str = Field(..., min_length=3, max_length=200)
     message: str = Field(..., min_length=5)
     severity: AlertSeverity
     alert_type: AlertType = AlertType.GENERAL
+    center_lat: Optional[float] = Field(None, ge=-90, le=90)
+    center_lng: Optional[float] = Field(None, ge=-180, le=180)
+    radius_m: Optional[float] = Field(None, gt=0)
+    polygon: Optional[List[AlertPoint]] = Field(None, min_length=3)
+    expires_at: Optional[datetime] = None
+
+    @field_validator("expires_at")
+    @classmethod
+    def _naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Timestamps are stored as naive UTC
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    @model_validator(mode="after")
+    def _check_area(self) -> "AlertCreate":
+        circle = (self.center_lat, self.center_lng, self.radius_m)
+        if any(v is not None for v in circle) and any(v is None for v in circle):
+            raise ValueError("center_lat, center_lng and radius_m must be given together")
+        if self.polygon is not None and self.radius_m is not None:
+            raise ValueError("give either a circle or a polygon, not both")
+        if self.polygon is not None:
+            lngs = [point.lng for point in self.polygon]
+            if max(lngs) - min(lngs) > 180:
+                raise ValueError("polygon must not cross the antimeridian; split it in two alerts")
+        if self.expires_at is not None and self.expires_at <= datetime.utcnow():
+            raise ValueError("expires_at must be in the future")
+        return self
 
 
 class AlertResponse(BaseModel):
@@ -26,8 +66,21 @@ class AlertResponse(BaseModel):
     message: str
     severity: AlertSeverity
     alert_type: AlertType
+    center_lat: Optional[float] = None
+    center_lng: Optional[float] = None
+    radius_m: Optional[float] = None
+    polygon: Optional[List[AlertPoint]] = None
+    expires_at: Optional[datetime] = None
     created_at: datetime
 
+    @field_validator("polygon", mode="before")
+    @classmethod
+    def _parse_polygon(cls, value):
+        # Stored as a JSON list of [lat, lng] pairs
+        if isinstance(value, str):
+            value = [{"lat": lat, "lng": lng} for lat, lng in json.loads(value)]
+        return value
+
     class Config:
         from_attributes = True
 
@@ -35,5 +88,16 @@ class AlertResponse(BaseModel):
 class AlertListResponse(BaseModel):
     alerts: list[AlertResponse]
     total: int
+    total_exact: bool = True
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class AlertChangesResponse(BaseModel):
+    """Active alerts created or changed since a sync token; resolved ones are in deleted."""
+    alerts: list[AlertResponse]
+    deleted: list[UUID] = []  # ids removed since the token
+    sync_token: str  # send back as since= on the next poll
+    has_more: bool = False  # more changes are waiting; poll again right away
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.database import get_db
 from app.core.security import get_current_user
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_db)):
     """
     Register a new user.
     
@@ -24,11 +24,11 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
     
     Returns JWT token and user information.
     """
-    return register_user(db, user_data)
+    return await register_user(db, user_data)
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Login with email and password.
     
@@ -38,11 +38,11 @@ def login(credentials: UserLogin, request: Request, db: Session = Depends(get_db
     Returns JWT token and user information.
     """
     client_host = request.client.host if request.client else None
-    return login_user(db, credentials, ip_address=client_host)
+    return await login_user(db, credentials, ip_address=client_host)
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     """
     Get current authenticated user information.
     
@@ -52,7 +52,7 @@ def get_me(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout")
-def logout(request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def logout(request: Request, current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     """
     Logout current user.
     
@@ -60,5 +60,5 @@ def logout(request: Request, current_user: User = Depends(get_current_user), db:
     Note: JWT tokens are stateless, so this doesn't invalidate the token.
     """
     client_host = request.client.host if request.client else None
-    return logout_user(db, current_user, ip_address=client_host)
+    return await logout_user(db, current_user, ip_address=client_host)
 
@@ -53,5 +53,8 @@ class UserListResponse(BaseModel):
     """Schema for list of users."""
     users: list[UserResponse]
     total: int
+    total_exact: bool = True
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
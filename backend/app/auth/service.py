@@ -1,18 +1,20 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.db.models import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.hashing import password_hasher
+from app.core.security import create_access_token, pwd_context
 from app.auth.schemas import UserRegister, UserLogin, AuthResponse, UserResponse
 from app.admin.service import log_auth_action
 from app.admin.schemas import AuditAction
 
 
-def register_user(db: Session, user_data: UserRegister) -> AuthResponse:
+async def register_user(db: AsyncSession, user_data: UserRegister) -> AuthResponse:
     """Register a new user and return auth token."""
     
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -23,21 +25,22 @@ def register_user(db: Session, user_data: UserRegister) -> AuthResponse:
     new_user = User(
         name=user_data.name,
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        # bcrypt is CPU-bound; runs on the hashing process pool
+        password_hash=await password_hasher.hash(user_data.password),
         role=user_data.role,
         ability=user_data.ability
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Generate token
     access_token = create_access_token(data={"sub": str(new_user.id)})
     
     # Log registration
     try:
-        log_auth_action(
+        await log_auth_action(
             db=db,
             admin_user=new_user,
             action=AuditAction.LOGIN,
@@ -54,15 +57,15 @@ def register_user(db: Session, user_data: UserRegister) -> AuthResponse:
     )
 
 
-def login_user(db: Session, credentials: UserLogin, ip_address: str = None) -> AuthResponse:
+async def login_user(db: AsyncSession, credentials: UserLogin, ip_address: str = None) -> AuthResponse:
     """Authenticate user and return auth token."""
     
     # Find user by email
-    user = db.query(User).filter(User.email == credentials.email).first()
+    user = await db.scalar(select(User).where(User.email == credentials.email))
     if not user:
         # Log failed login attempt
         try:
-            log_auth_action(
+            await log_auth_action(
                 db=db,
                 admin_user=None,
                 action=AuditAction.FAILED_LOGIN,
@@ -80,10 +83,10 @@ def login_user(db: Session, credentials: UserLogin, ip_address: str = None) -> A
         )
     
     # Verify password
-    if not verify_password(credentials.password, user.password_hash):
+    if not await password_hasher.verify(credentials.password, user.password_hash):
         # Log failed login attempt
         try:
-            log_auth_action(
+            await log_auth_action(
                 db=db,
                 admin_user=user,
                 action=AuditAction.FAILED_LOGIN,
@@ -100,12 +103,21 @@ def login_user(db: Session, credentials: UserLogin, ip_address: str = None) -> A
             detail="Invalid email or password"
         )
     
+    # Stored below the current bcrypt cost (or above the maximum): rehash while we have the password
+    if pwd_context.needs_update(user.password_hash):
+        try:
+            user.password_hash = await password_hasher.hash(credentials.password)
+            await db.commit()
+        except Exception:
+            await db.rollback()  # keep the old hash; retried on the next login
+            await db.refresh(user)
+    
     # Generate token
     access_token = create_access_token(data={"sub": str(user.id)})
     
     # Log successful login
     try:
-        log_auth_action(
+        await log_auth_action(
             db=db,
             admin_user=user,
             action=AuditAction.LOGIN,
@@ -128,7 +140,7 @@ def get_current_user_info(user: User) -> UserResponse:
     return UserResponse.from_orm(user)
 
 
-def logout_user(db: Session, user: User, ip_address: str = None) -> dict:
+async def logout_user(db: AsyncSession, user: User, ip_address: str = None) -> dict:
     """
     Logout user (for audit logging purposes).
     
@@ -136,7 +148,7 @@ def logout_user(db: Session, user: User, ip_address: str = None) -> dict:
     This function logs the logout event for audit purposes.
     """
     try:
-        log_auth_action(
+        await log_auth_action(
             db=db,
             admin_user=user,
             action=AuditAction.LOGOUT,
@@ -1,18 +1,25 @@
 """
 Azure Application Insights Integration
 Provides cloud logging for the SenseSafe application.
+
+Events are handed to a batched background exporter (app.core.telemetry), so
+callers on the request path never wait on the network. TELEMETRY_SINK can
+point the exporter at a local file or TCP socket instead of Azure.
 """
 
 from typing import Optional, Dict, Any
 from datetime import datetime
+from pathlib import Path
 import logging
 from app.core.config import settings
+from app.core.telemetry import AzureSink, FileSink, SocketSink, TelemetryExporter
 
 logger = logging.getLogger(__name__.split('.')[0])
 
 # Track if Azure is configured
 _azure_configured = False
 _telemetry_client = None
+_exporter: Optional[TelemetryExporter] = None
 
 
 def is_azure_configured() -> bool:
@@ -25,19 +32,11 @@ def is_azure_configured() -> bool:
     )
 
 
-def init_azure_logging() -> bool:
-    """
-    Initialize Azure Application Insights client.
-    
-    Returns:
-        bool: True if successfully initialized, False otherwise
-    """
-    global _azure_configured, _telemetry_client
-    
+def _create_azure_client():
+    """Build the Application Insights client, or None if unavailable."""
     if not is_azure_configured():
         logger.info("Azure Application Insights not configured - using local logging only")
-        _azure_configured = False
-        return False
+        return None
     
     try:
         # Try to import Azure SDK
@@ -46,20 +45,81 @@ def init_azure_logging() -> bool:
         except ImportError:
             # Azure SDK not installed
             logger.warning("Azure SDK not installed. Install with: pip install azure-monitor-telemetry")
-            _azure_configured = False
-            return False
+            return None
         
-        _telemetry_client = TelemetryClient(
+        client = TelemetryClient(
             instrumentation_key=settings.AZURE_CV_KEY,
             endpoint_suffix="in.monitor.azure.com"
         )
-        _azure_configured = True
         logger.info("Azure Application Insights initialized successfully")
-        return True
+        return client
     except Exception as e:
         logger.error(f"Failed to initialize Azure Application Insights: {e}")
+        return None
+
+
+def _create_sink():
+    """Pick the exporter sink from TELEMETRY_SINK."""
+    global _telemetry_client
+    
+    kind = settings.TELEMETRY_SINK.lower()
+    if kind == "azure":
+        _telemetry_client = _create_azure_client()
+        return AzureSink(_telemetry_client) if _telemetry_client is not None else None
+    if kind == "file":
+        path = settings.TELEMETRY_FILE_PATH or Path(__file__).parent.parent.parent / "logs" / "telemetry.jsonl"
+        return FileSink(path)
+    if kind == "socket":
+        host, _, port = settings.TELEMETRY_SOCKET_ADDR.rpartition(":")
+        return SocketSink(host or "127.0.0.1", int(port))
+    if kind != "none":
+        logger.warning(f"Unknown TELEMETRY_SINK '{settings.TELEMETRY_SINK}' - telemetry disabled")
+    return None
+
+
+def init_azure_logging() -> bool:
+    """
+    Initialize the telemetry sink and start the background exporter.
+    
+    Called once from the application lifespan, not on import.
+    
+    Returns:
+        bool: True if an exporter is running, False otherwise
+    """
+    global _azure_configured, _exporter
+    
+    sink = _create_sink()
+    if sink is None:
         _azure_configured = False
         return False
+    
+    _exporter = TelemetryExporter(
+        sink,
+        max_queue=settings.TELEMETRY_QUEUE_SIZE,
+        batch_size=settings.TELEMETRY_BATCH_SIZE,
+        flush_interval=settings.TELEMETRY_FLUSH_INTERVAL,
+        max_retries=settings.TELEMETRY_MAX_RETRIES,
+        backoff_base=settings.TELEMETRY_BACKOFF_BASE,
+        backoff_max=settings.TELEMETRY_BACKOFF_MAX
+    )
+    _exporter.start()
+    _azure_configured = True
+    return True
+
+
+def shutdown_azure_logging(timeout: float = 10.0) -> None:
+    """Flush queued events and stop the exporter; called on app shutdown."""
+    global _azure_configured, _exporter
+    
+    if _exporter is not None:
+        _exporter.stop(timeout)
+    _exporter = None
+    _azure_configured = False
+
+
+def telemetry_stats() -> Optional[Dict[str, Any]]:
+    """Exporter queue depth and counters, or None when telemetry is off."""
+    return _exporter.stats() if _exporter is not None else None
 
 
 def log_to_azure(
@@ -68,7 +128,9 @@ def log_to_azure(
     metrics: Optional[Dict[str, float]] = None
 ) -> bool:
     """
-    Log an event to Azure Application Insights.
+    Queue an event for Azure Application Insights (or the configured sink).
+    
+    Never blocks: the event is sent later in a batch by the exporter thread.
     
     Args:
         name: Event name
@@ -76,25 +138,16 @@ def log_to_azure(
         metrics: Custom metrics to log
     
     Returns:
-        bool: True if logged successfully, False otherwise
+        bool: True if queued, False if telemetry is off or the queue is full
     """
-    if not _azure_configured:
+    if not _azure_configured or _exporter is None:
         return False
     
-    if _telemetry_client is None:
-        return False
-    
-    try:
-        _telemetry_client.track_event(
-            name=name,
-            properties=properties,
-            metrics=metrics
-        )
-        _telemetry_client.flush()
-        return True
-    except Exception as e:
-        logger.error(f"Failed to log to Azure: {e}")
-        return False
+    return _exporter.enqueue({
+        "name": name,
+        "properties": properties,
+        "metrics": metrics
+    })
 
 
 def log_admin_action_azure(
@@ -229,8 +282,3 @@ def log_alert_action_azure(
         name=f"AlertAction_{action}",
         properties=properties
     )
-
-
-# Initialize on module import
-init_azure_logging()
-
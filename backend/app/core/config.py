@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 
 class Settings(BaseSettings):
@@ -12,12 +12,121 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    # Create missing tables on startup. Turn off once Alembic owns the schema.
+    DB_AUTO_CREATE_SCHEMA: bool = True
+
+    # Connection pool (per engine, per worker). Ignored for SQLite.
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10.0     # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800       # seconds; replaces connections before server idle timeouts (-1 = never)
+    # Pessimistic liveness check (one extra round-trip per checkout).
+    # Off by default - DB_POOL_RECYCLE handles stale connections optimistically.
+    DB_POOL_PRE_PING: bool = False
+
+    # List totals (app/utils/counting.py). Counts above COUNT_EXACT_LIMIT are
+    # estimated; cached totals are dropped on writes or after COUNT_CACHE_TTL seconds.
+    COUNT_EXACT_LIMIT: int = 10000
+    COUNT_CACHE_TTL: float = 30.0
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+
+    # Hot list routes return pre-rendered JSON (app/utils/serialization.py);
+    # True re-validates every response against its response_model.
+    VALIDATE_RESPONSES: bool = False
+
+    # Admin map-data (app/admin/map_data.py): zooms below MAP_CLUSTER_MAX_ZOOM get
+    # grid clusters of roughly 256/MAP_CLUSTER_CELLS_PER_TILE px instead of markers.
+    MAP_CLUSTER_MAX_ZOOM: int = 15
+    MAP_CLUSTER_CELLS_PER_TILE: int = 4
+
+    # GET /api/incidents/nearby: largest radius a client may ask for (meters)
+    NEARBY_MAX_RADIUS_M: float = 50000
+
+    # Incident report dedup (app/incidents/grouping.py): a report joins a group of
+    # the same type within this radius that had a report in the last window.
+    INCIDENT_GROUPING: bool = True
+    INCIDENT_GROUP_RADIUS_M: float = 250
+    INCIDENT_GROUP_WINDOW_MINUTES: float = 30
+
+    # Geofenced alerts (app/alerts/geofence.py)
+    ALERT_DEFAULT_TTL_HOURS: float = 24     # expiry for alerts created without expires_at
+    ALERT_INDEX_CELL_DEG: float = 0.5       # grid cell size of the point-lookup index
+    ALERT_INDEX_REFRESH_SECONDS: float = 5.0  # max staleness for alerts written by other workers
+
+    # Admin Server-Sent Events stream (app/core/events.py)
+    EVENT_STREAM_BUFFER: int = 2048           # events kept for Last-Event-ID resume
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    EVENT_STREAM_MAX_CONNECTIONS: int = 500   # per worker
+    STREAM_TICKET_TTL_SECONDS: int = 30       # lifetime of a single-use stream ticket
+
+    # Conditional GET (app/utils/etag.py): ETags come from per-table write versions,
+    # re-read by each worker at most every ETAG_VERSION_TTL seconds.
+    ETAG_VERSION_TTL: float = 1.0
+    ALERTS_CACHE_MAX_AGE: int = 15   # Cache-Control max-age / s-maxage of GET /api/alerts
+
+    # Delta sync (app/utils/sync.py): feeds re-send the last SYNC_LAG_SECONDS of
+    # changes; deletions are remembered for SYNC_TOMBSTONE_DAYS.
+    SYNC_LAG_SECONDS: float = 5.0
+    SYNC_TOMBSTONE_DAYS: int = 30
+    SYNC_MAX_LIMIT: int = 1000
+
+    # GET /api/admin/dashboard (app/admin/dashboard.py): snapshot refresh period and
+    # how many audit entries it lists as recent activity
+    DASHBOARD_REFRESH_SECONDS: float = 5.0
+    DASHBOARD_RECENT_ACTIVITY: int = 10
+
+    # Stats counters (app/utils/counters.py): kept up to date by each write and
+    # recounted every STAT_COUNTERS_RECONCILE_SECONDS to correct drift
+    STAT_COUNTERS_RECONCILE_SECONDS: float = 300.0
+
+    # Write-behind audit log (app/admin/audit_writer.py)
+    AUDIT_WRITE_BEHIND: bool = True
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 1.0     # max seconds an entry waits for its batch
+    AUDIT_ENQUEUE_TIMEOUT: float = 0.05   # backpressure wait before spilling to disk
+    AUDIT_SPILL_PATH: Optional[str] = None  # default: logs/audit_spill.jsonl
+    AUDIT_SHUTDOWN_TIMEOUT: float = 10.0
+
+    # Audit log storage (app/admin/audit_archive.py): monthly partitions on
+    # PostgreSQL; whole months older than AUDIT_RETENTION_DAYS move to gzipped
+    # JSONL segments under AUDIT_ARCHIVE_DIR (0 keeps everything in the database)
+    AUDIT_RETENTION_DAYS: int = 180
+    AUDIT_ARCHIVE_DIR: Optional[str] = None  # default: logs/audit_archive
+    AUDIT_ARCHIVE_SEGMENT_ROWS: int = 10000
+    AUDIT_ARCHIVE_INTERVAL: float = 3600.0
+    AUDIT_ARCHIVE_CACHE_SEGMENTS: int = 8   # decoded segments kept in memory per worker
+    AUDIT_PARTITIONS_AHEAD: int = 2         # future monthly partitions kept ready
 
     # JWT
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Authenticated principals cached per token (app/core/principals.py); user
+    # changes made by other workers show up after at most PRINCIPAL_CACHE_TTL seconds
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_TTL: float = 60.0
+
+    # bcrypt runs on a process pool (app/core/hashing.py); 0 workers keeps it on
+    # the threadpool. Calls beyond PASSWORD_HASH_MAX_PENDING waiting get a 503.
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # default: half the CPU cores
+    PASSWORD_HASH_MAX_PENDING: int = 256
+    # bcrypt cost: at startup the highest cost in [MIN_ROUNDS, MAX_ROUNDS] whose
+    # hash takes at most PASSWORD_HASH_TARGET_MS here (0 = always PASSWORD_HASH_ROUNDS)
+    PASSWORD_HASH_TARGET_MS: float = 250.0
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+    PASSWORD_HASH_MAX_ROUNDS: int = 16
+
+    # Logging (app/core/logger.py)
+    LOG_ASYNC: bool = True                  # QueueHandler + listener thread per logger
+    LOG_MAX_BYTES: int = 50 * 1024 * 1024   # rotate a log file at this size (0 = time only)
+    LOG_ROTATE_WHEN: str = "midnight"       # TimedRotatingFileHandler schedule (UTC)
+    LOG_BACKUP_COUNT: int = 14
+    # Fraction of INFO records kept per logger, e.g. {"sensesafe.admin": 0.1}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+
     # Admin bootstrap user
     ADMIN_EMAIL: str = "admin@sensesafe.com"
     ADMIN_PASSWORD: str = "admin123"   # keep under 72 chars (bcrypt requirement)
@@ -26,6 +135,17 @@ class Settings(BaseSettings):
     AZURE_CV_KEY: Optional[str] = None
     AZURE_CV_ENDPOINT: Optional[str] = None
 
+    # Telemetry exporter (app/core/telemetry.py)
+    TELEMETRY_SINK: str = "azure"              # azure | file | socket | none
+    TELEMETRY_FILE_PATH: Optional[str] = None  # file sink; default logs/telemetry.jsonl
+    TELEMETRY_SOCKET_ADDR: str = "127.0.0.1:5170"  # socket sink, host:port
+    TELEMETRY_QUEUE_SIZE: int = 10000          # events beyond this are dropped and counted
+    TELEMETRY_BATCH_SIZE: int = 100
+    TELEMETRY_FLUSH_INTERVAL: float = 2.0      # seconds
+    TELEMETRY_MAX_RETRIES: int = 5
+    TELEMETRY_BACKOFF_BASE: float = 0.5        # seconds, doubled per retry
+    TELEMETRY_BACKOFF_MAX: float = 30.0
+
     # CORS
     CORS_ORIGINS: List[str] = [
     # Local dev
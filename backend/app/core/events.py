@@ -0,0 +1,152 @@
+"""
+In-process event broker behind the admin Server-Sent Events stream.
+
+Services call ``publish`` right after committing a change. The event is
+encoded once into an SSE frame and appended to a ring buffer of the last
+``EVENT_STREAM_BUFFER`` events; publishing wakes every connected stream
+through one shared ``asyncio.Event``, so its cost does not depend on how
+many consoles are listening.
+
+Streams hold no queue of their own, only the id of the last event they sent.
+On waking they send everything after it from the ring buffer in one write.
+A console that reads slowly blocks only its own generator (the server waits
+for its socket to drain). If it falls further behind than the buffer
+reaches, it gets a ``reset`` event and should re-fetch its data. Memory
+therefore stays bounded however many consoles are slow.
+
+Event ids are ``<epoch>-<seq>``, where the epoch identifies this broker. A
+client resuming with a ``Last-Event-ID`` from another process, or from
+before a restart, also gets ``reset``. Events are only seen by streams in
+the worker that committed them.
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple, Union
+
+import orjson
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+# Event types
+SOS_CREATED = "sos.created"
+SOS_STATUS_CHANGED = "sos.status_changed"
+INCIDENT_CREATED = "incident.created"
+INCIDENT_STATUS_CHANGED = "incident.status_changed"
+ALERT_CREATED = "alert.created"
+MESSAGE_CREATED = "message.created"
+
+RESET = "reset"
+
+
+class EventBroker:
+    """Ring buffer of encoded events plus a wake-up signal for streams."""
+
+    def __init__(self, buffer_size: int, heartbeat: float, max_connections: int):
+        self.heartbeat = heartbeat
+        self.max_connections = max_connections
+        self.epoch = format(int(time.time() * 1000), "x")
+        self._events: Deque[Tuple[int, bytes]] = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._changed: Optional[asyncio.Event] = None
+        self.connections = 0
+        self.published = 0
+        self.resets = 0
+
+    def _signal(self) -> asyncio.Event:
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        return self._changed
+
+    def _frame(self, seq: int, event_type: str, data: bytes) -> bytes:
+        return b"id: %s-%d\nevent: %s\ndata: %s\n\n" % (self.epoch.encode(), seq, event_type.encode(), data)
+
+    def publish(self, event_type: str, payload: Union[BaseModel, dict]) -> None:
+        """Append an event and wake the streams. Call after the change is committed."""
+        if isinstance(payload, BaseModel):
+            payload = payload.model_dump()
+        self._seq += 1
+        self._events.append((self._seq, self._frame(self._seq, event_type, orjson.dumps(payload))))
+        self.published += 1
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+
+    def _resume_point(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence number to continue after, or None if the client must reset."""
+        if not last_event_id:
+            return self._seq
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        return int(seq)
+
+    def _after(self, cursor: int) -> Optional[List[Tuple[int, bytes]]]:
+        """Buffered events after ``cursor``; None if some were already dropped."""
+        if cursor >= self._seq:
+            return []
+        oldest = self._events[0][0] if self._events else self._seq + 1
+        if cursor < oldest - 1:
+            return None
+        return list(itertools.islice(self._events, cursor - oldest + 1, None))
+
+    def _reset_frame(self) -> bytes:
+        self.resets += 1
+        return self._frame(self._seq, RESET, b"{}")
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        SSE body for one connection: replay after ``last_event_id``, then live events.
+
+        Args:
+            last_event_id: Value of the client's Last-Event-ID, if resuming
+
+        Yields:
+            Encoded SSE frames, batched per wake-up, and heartbeat comments
+        """
+        self.connections += 1
+        try:
+            yield b"retry: 3000\n\n"
+            cursor = self._resume_point(last_event_id)
+            if cursor is None:
+                cursor = self._seq
+                yield self._reset_frame()
+            while True:
+                signal = self._signal()  # taken before reading, so no publish is missed
+                pending = self._after(cursor)
+                if pending is None:
+                    cursor = self._seq
+                    yield self._reset_frame()
+                elif pending:
+                    cursor = pending[-1][0]
+                    yield b"".join(frame for _, frame in pending)
+                else:
+                    try:
+                        await asyncio.wait_for(signal.wait(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        yield b": ping\n\n"
+        finally:
+            self.connections -= 1
+
+    def stats(self) -> dict:
+        return {
+            "epoch": self.epoch,
+            "last_event_id": f"{self.epoch}-{self._seq}",
+            "buffered": len(self._events),
+            "buffer_size": self._events.maxlen,
+            "connections": self.connections,
+            "max_connections": self.max_connections,
+            "published": self.published,
+            "resets": self.resets,
+        }
+
+
+event_broker = EventBroker(
+    buffer_size=settings.EVENT_STREAM_BUFFER,
+    heartbeat=settings.EVENT_STREAM_HEARTBEAT_SECONDS,
+    max_connections=settings.EVENT_STREAM_MAX_CONNECTIONS,
+)
+publish = event_broker.publish
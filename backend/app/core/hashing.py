@@ -0,0 +1,213 @@
+"""
+bcrypt on a dedicated process pool, off the event loop and the threadpool.
+
+A bcrypt hash or verify costs hundreds of milliseconds of CPU. Run on the
+request threadpool, a burst of logins occupies its threads and holds the
+GIL long enough to slow every other route in the worker (SOS included).
+``password_hasher`` sends that work to ``PASSWORD_HASH_WORKERS`` separate
+processes instead. At most that many calls run at once; the rest wait in
+the event loop, where their queue time is measured, and once
+``PASSWORD_HASH_MAX_PENDING`` are already waiting further calls are turned
+away with 503 so a login storm cannot build an unbounded backlog.
+
+With ``PASSWORD_HASH_WORKERS=0``, or before the pool is started (scripts),
+calls run on the threadpool as before. Workers are spawned, so they import
+the main module again: a script that runs the app in-process (TestClient)
+needs an ``if __name__ == "__main__":`` guard, as uvicorn and gunicorn have.
+At startup ``calibrate`` picks the bcrypt cost that meets
+``PASSWORD_HASH_TARGET_MS`` on this hardware; logins rehash passwords
+stored below that cost or above ``PASSWORD_HASH_MAX_ROUNDS``. Statistics are served by ``/api/admin/auth/hashing``.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, status
+from passlib.hash import bcrypt
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger("sensesafe.hashing")
+
+
+# ---- work done in the pool processes ----------------------------------------
+# Plain functions of their arguments, so a spawned worker only imports this module.
+
+def bcrypt_hash(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds, ident="2b").hash(password)
+
+
+def bcrypt_verify(password: str, password_hash: str) -> bool:
+    return bcrypt.verify(password, password_hash)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+# ---- pool -------------------------------------------------------------------
+
+class PasswordHasher:
+    """Bounded process pool for bcrypt, with queue-time statistics."""
+
+    # Recent queue and run times kept for percentiles
+    SAMPLES = 1024
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.running_calls = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_max = 0.0
+        self.target_ms: Optional[float] = None
+        self._queue_times = deque(maxlen=self.SAMPLES)
+        self._run_times = deque(maxlen=self.SAMPLES)
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    # ---- lifecycle --------------------------------------------------------
+
+    async def start(self) -> None:
+        if self.running or self.workers <= 0:
+            return
+        # spawn, not fork: the parent already runs threads (logging, telemetry, the loop)
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        loop = asyncio.get_running_loop()
+        try:
+            # Start every worker now rather than on the first logins
+            await asyncio.gather(*(loop.run_in_executor(executor, _ready) for _ in range(self.workers)))
+        except Exception:
+            logger.exception("Could not start the password hashing pool; hashing on the threadpool")
+            executor.shutdown(wait=False, cancel_futures=True)
+            return
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor = executor
+
+    async def stop(self) -> None:
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await run_in_threadpool(executor.shutdown, True, cancel_futures=True)
+
+    # ---- calls ------------------------------------------------------------
+
+    async def hash(self, password: str, rounds: Optional[int] = None) -> str:
+        """Hash ``password`` with bcrypt (``rounds`` defaults to the current cost)."""
+        from app.core.security import bcrypt_rounds
+
+        return await self._call(bcrypt_hash, password, rounds or bcrypt_rounds())
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """Check ``password`` against a bcrypt hash."""
+        return await self._call(bcrypt_verify, password, password_hash)
+
+    async def _call(self, fn, *args) -> Any:
+        if self._executor is None:
+            return await run_in_threadpool(fn, *args)
+
+        if self.waiting >= self.max_pending:
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        queued = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        started = time.perf_counter()
+        self.running_calls += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.running_calls -= 1
+            self._slots.release()
+            self._record(started - queued, time.perf_counter() - started)
+
+    async def calibrate(self, target_ms: float, min_rounds: int, max_rounds: int) -> int:
+        """
+        Pick the bcrypt cost for this machine and switch to it.
+
+        Times a few hashes at ``min_rounds`` where hashing really runs (the
+        pool, or the threadpool without one) and, since each extra round
+        doubles the work, takes the highest cost whose estimated time is
+        still within ``target_ms``. A verify costs the same as a hash.
+
+        Returns:
+            int: The cost now in use
+        """
+        from app.core.security import set_bcrypt_rounds
+
+        samples = []
+        for _ in range(3):
+            started = time.perf_counter()
+            await self._call(bcrypt_hash, "calibration", min_rounds)
+            samples.append(time.perf_counter() - started)
+        base_ms = min(samples) * 1000
+
+        rounds = min_rounds
+        while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+            rounds += 1
+        set_bcrypt_rounds(rounds)
+        self.target_ms = target_ms
+        logger.info(
+            "bcrypt cost %d (%.0f ms per hash at cost %d, target %.0f ms)",
+            rounds, base_ms * 2 ** (rounds - min_rounds), min_rounds, target_ms,
+        )
+        return rounds
+
+    def _record(self, queued: float, ran: float) -> None:
+        with self._lock:
+            self.completed += 1
+            self.queue_max = max(self.queue_max, queued)
+            self._queue_times.append(queued)
+            self._run_times.append(ran)
+
+    def stats(self) -> Dict[str, Any]:
+        from app.core.security import bcrypt_rounds
+
+        with self._lock:
+            queue_times = sorted(self._queue_times)
+            run_times = list(self._run_times)
+            timed = len(queue_times)
+            return {
+                "running": self.running,
+                "workers": self.workers if self.running else 0,
+                "max_pending": self.max_pending,
+                "rounds": bcrypt_rounds(),
+                "target_ms": self.target_ms,
+                "in_flight": self.running_calls,
+                "waiting": self.waiting,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_avg_ms": (sum(queue_times) / timed * 1000) if timed else 0.0,
+                "queue_p95_ms": (queue_times[min(timed - 1, int(timed * 0.95))] * 1000) if timed else 0.0,
+                "queue_max_ms": self.queue_max * 1000,
+                "run_avg_ms": (sum(run_times) / len(run_times) * 1000) if run_times else 0.0,
+            }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS if settings.PASSWORD_HASH_WORKERS is not None else max(1, (os.cpu_count() or 2) // 2),
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -1,28 +1,66 @@
 """
 Application Logger Configuration
 Provides structured logging for the SenseSafe application.
+
+With LOG_ASYNC on (the default), loggers only put records on a queue (a
+``QueueHandler``). A ``QueueListener`` thread per logger does the JSON
+encoding and the console/file writes, so request threads never block on
+disk or stdout. Log files rotate daily (LOG_ROTATE_WHEN) or when they reach
+LOG_MAX_BYTES, whichever comes first. LOG_SAMPLE_RATES can thin out
+high-volume INFO records per logger.
 """
 
+import copy
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
-from datetime import datetime
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 import json
-from datetime import datetime
 
-# Create logs directory
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+# Logs directory (created on first use by setup_logger)
 LOGS_DIR = Path(__file__).parent.parent.parent / "logs"
-LOGS_DIR.mkdir(exist_ok=True)
+
+# Listener threads started by setup_logger in async mode
+_listeners: List[logging.handlers.QueueListener] = []
+
+
+def _dumps(data: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode()
+    return json.dumps(data, default=str)
 
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured log output."""
     
+    # (second, "YYYY-MM-DDTHH:MM:SS") - strftime once per second, not per record
+    _second_cache = (None, "")
+    
+    def _timestamp(self, created: float) -> str:
+        # UTC time the record was created, not when (or on which thread) it is formatted
+        second = int(created)
+        cached_second, prefix = self._second_cache
+        if cached_second != second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}"
+    
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -31,15 +69,106 @@ class JSONFormatter(logging.Formatter):
             "line": record.lineno
         }
         
-        # Add exception info if present
+        # Add exception info if present (pre-rendered by _RecordQueueHandler in async mode)
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_data["exception"] = record.exc_text
         
         # Add extra fields if present
         if hasattr(record, 'extra_data'):
             log_data.update(record.extra_data)
         
-        return json.dumps(log_data)
+        return _dumps(log_data)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep roughly ``rate`` of the INFO-and-below records; WARNING and above always pass.
+    
+    Attached to the logger itself, so dropped records are never queued.
+    """
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.dropped = 0
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or random.random() < self.rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """
+    Rotates on the time schedule and also whenever the file exceeds ``max_bytes``.
+    
+    Size-triggered backups get a numbered suffix (audit.log.2026-01-07.001) so
+    several can exist for one period and still count towards ``backupCount``.
+    """
+    
+    def __init__(self, filename, max_bytes: int, when: str, backup_count: int):
+        super().__init__(filename, when=when, backupCount=backup_count, encoding="utf-8", delay=True, utc=True)
+        self.max_bytes = max_bytes
+    
+    def _over_size(self) -> bool:
+        if self.max_bytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() >= self.max_bytes
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return super().shouldRollover(record) or self._over_size()
+    
+    def doRollover(self) -> None:
+        if int(time.time()) >= self.rolloverAt:
+            super().doRollover()
+            return
+        
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        stamp = time.strftime(self.suffix, time.gmtime())
+        n = 1
+        while os.path.exists(f"{self.baseFilename}.{stamp}.{n:03d}"):
+            n += 1
+        self.rotate(self.baseFilename, f"{self.baseFilename}.{stamp}.{n:03d}")
+        if self.backupCount > 0:
+            for old in self.getFilesToDelete():
+                os.remove(old)
+        self.stream = self._open()
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+    
+    The stock ``prepare`` formats every record on the calling thread. Here
+    only the message arguments are merged (so later mutation cannot change
+    what is logged) and tracebacks are rendered, because exc_info cannot
+    safely outlive the except block.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _make_formatter(json_format: bool) -> logging.Formatter:
+    if json_format:
+        return JSONFormatter()
+    return logging.Formatter(
+        '[%(asctime)s] %(levelname)s - %(name)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
 
 
 def setup_logger(
@@ -54,7 +183,7 @@ def setup_logger(
     Args:
         name: Logger name
         level: Logging level (default: INFO)
-        log_file: Optional filename to log to file
+        log_file: Optional filename to log to file (rotated by size and time)
         json_format: Whether to use JSON formatting
     
     Returns:
@@ -67,37 +196,37 @@ def setup_logger(
     if logger.handlers:
         return logger
     
+    formatter = _make_formatter(json_format)
+    
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    handlers: List[logging.Handler] = [console_handler]
     
-    if json_format:
-        console_handler.setFormatter(JSONFormatter())
-    else:
-        console_handler.setFormatter(
-            logging.Formatter(
-                '[%(asctime)s] %(levelname)s - %(name)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
+    # Add file handler if log file specified
+    if log_file:
+        LOGS_DIR.mkdir(exist_ok=True)
+        file_handler = SizeAndTimeRotatingFileHandler(
+            LOGS_DIR / log_file,
+            max_bytes=settings.LOG_MAX_BYTES,
+            when=settings.LOG_ROTATE_WHEN,
+            backup_count=settings.LOG_BACKUP_COUNT
         )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
     
-    logger.addHandler(console_handler)
+    if settings.LOG_ASYNC:
+        listener = logging.handlers.QueueListener(queue.SimpleQueue(), *handlers, respect_handler_level=True)
+        listener.start()
+        _listeners.append(listener)
+        logger.addHandler(_RecordQueueHandler(listener.queue))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     
-    # Add file handler if log file specified
-    if log_file:
-        log_path = LOGS_DIR / log_file
-        file_handler = logging.FileHandler(log_path)
-        
-        if json_format:
-            file_handler.setFormatter(JSONFormatter())
-        else:
-            file_handler.setFormatter(
-                logging.Formatter(
-                    '[%(asctime)s] %(levelname)s - %(name)s - %(message)s',
-                    datefmt='%Y-%m-%d %H:%M:%S'
-                )
-            )
-        
-        logger.addHandler(file_handler)
+    rate = settings.LOG_SAMPLE_RATES.get(name)
+    if rate is not None and rate < 1:
+        logger.addFilter(SamplingFilter(rate))
     
     return logger
 
@@ -116,28 +245,57 @@ def get_logger(name: str) -> logging.Logger:
 
 
 # Audit-specific logger
-audit_logger = setup_logger(
-    name="sensesafe.audit",
-    level=logging.INFO,
-    log_file="audit.log",
-    json_format=True
-)
+audit_logger = logging.getLogger("sensesafe.audit")
 
 # Admin action logger
-admin_logger = setup_logger(
-    name="sensesafe.admin",
-    level=logging.INFO,
-    log_file="admin_actions.log",
-    json_format=True
-)
+admin_logger = logging.getLogger("sensesafe.admin")
 
 # Security logger
-security_logger = setup_logger(
-    name="sensesafe.security",
-    level=logging.DEBUG,
-    log_file="security.log",
-    json_format=True
-)
+security_logger = logging.getLogger("sensesafe.security")
+
+
+def configure_logging() -> None:
+    """
+    Attach handlers to the audit, admin and security loggers.
+    
+    Called from the application lifespan so that importing the app does
+    not create directories, open log files or start listener threads.
+    Safe to call more than once.
+    """
+    setup_logger(
+        name="sensesafe.audit",
+        level=logging.INFO,
+        log_file="audit.log",
+        json_format=True
+    )
+    setup_logger(
+        name="sensesafe.admin",
+        level=logging.INFO,
+        log_file="admin_actions.log",
+        json_format=True
+    )
+    setup_logger(
+        name="sensesafe.security",
+        level=logging.DEBUG,
+        log_file="security.log",
+        json_format=True
+    )
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener threads (app shutdown)."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+def sampling_stats() -> Dict[str, int]:
+    """Records dropped by sampling so far, per logger."""
+    stats = {}
+    for name in settings.LOG_SAMPLE_RATES:
+        for f in logging.getLogger(name).filters:
+            if isinstance(f, SamplingFilter):
+                stats[name] = f.dropped
+    return stats
 
 
 def log_admin_action(
@@ -0,0 +1,174 @@
+"""
+Per-worker cache of authenticated principals, keyed by bearer token.
+
+``get_current_user`` decodes the JWT and loads the user once per token;
+later requests with the same token get the cached ``Principal``, a frozen
+snapshot of the user's columns, without decoding or querying. An entry
+lives until the token's ``exp`` or ``PRINCIPAL_CACHE_TTL`` seconds,
+whichever comes first, and the least recently used entries are dropped
+beyond ``PRINCIPAL_CACHE_MAX_ENTRIES``.
+
+Committing a session that changed or deleted a user drops that user's
+entries in this worker (a bulk UPDATE/DELETE on users drops all of them);
+other workers pick the change up within the TTL. A lookup that started
+before such a commit does not store its possibly stale result.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import User, UserAbility, UserRole
+
+
+class Principal(NamedTuple):
+    """Immutable snapshot of a User, with the attributes routes read."""
+    id: UUID
+    name: str
+    email: str
+    role: UserRole
+    ability: UserAbility
+    created_at: datetime
+
+    @classmethod
+    def of(cls, user: User) -> "Principal":
+        return cls(user.id, user.name, user.email, user.role, user.ability, user.created_at)
+
+
+class PrincipalCache:
+    """LRU of token -> Principal, invalidated per user."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._tokens: Dict[UUID, Set[str]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        """Read before loading a user; pass to ``put`` so stale loads are not stored."""
+        return self._generation
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                principal, expires_at = entry
+                if time.time() < expires_at:
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return principal
+                self._remove(token)
+            self.misses += 1
+            return None
+
+    def put(self, token: str, principal: Principal, exp: Optional[float], generation: int) -> None:
+        """
+        Cache ``principal`` for ``token``.
+
+        Args:
+            token: The bearer token
+            principal: Snapshot of the token's user
+            exp: The token's ``exp`` claim (seconds since the epoch), if any
+            generation: ``generation`` as read before the user was loaded
+        """
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._remove(token)
+            self._entries[token] = (principal, expires_at)
+            self._tokens.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._tokens.get(entry[0].id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens[entry[0].id]
+
+    def invalidate(self, user_ids) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            for user_id in user_ids:
+                for token in list(self._tokens.get(user_id, ())):
+                    self._remove(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+            self._tokens.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL)
+
+
+# ---- invalidation ---------------------------------------------------------
+
+_CHANGED = "principal_cache_changed_users"
+_ALL = "all"
+
+
+@event.listens_for(Session, "before_flush")
+def _track_users(session, flush_context, instances):
+    changed = None
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            if changed is None:
+                changed = session.info.setdefault(_CHANGED, set())
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_users(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        if orm_execute_state.statement.table.name == User.__tablename__:
+            orm_execute_state.session.info.setdefault(_CHANGED, set()).add(_ALL)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_users(session):
+    changed = session.info.pop(_CHANGED, None)
+    if not changed:
+        return
+    if _ALL in changed:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_users(session):
+    session.info.pop(_CHANGED, None)
@@ -1,22 +1,31 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from uuid import UUID
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.principals import Principal, principal_cache
 from app.db.database import get_db
 from app.db.models import User, UserRole
 
 
-# Password hashing
+# Password hashing. The cost starts at PASSWORD_HASH_ROUNDS and is replaced at
+# startup by the calibrated one (app.core.hashing). Hashes from that cost up to
+# PASSWORD_HASH_MAX_ROUNDS are all current: workers that calibrate a little
+# differently must not keep rehashing each other's passwords. Hashes outside
+# the band report needs_update and are rehashed on the next login.
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
-    bcrypt__rounds=12,
+    bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__max_rounds=max(settings.PASSWORD_HASH_ROUNDS, settings.PASSWORD_HASH_MAX_ROUNDS),
     bcrypt__ident="2b"
 )
 
@@ -32,6 +41,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def bcrypt_rounds() -> int:
+    """The bcrypt cost new hashes are made with."""
+    return pwd_context.handler("bcrypt").default_rounds
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """Hash with ``rounds`` from now on and flag hashes below it or above the maximum for rehashing."""
+    pwd_context.update(
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=max(rounds, settings.PASSWORD_HASH_MAX_ROUNDS),
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
 
@@ -67,39 +90,57 @@ def decode_access_token(token: str) -> dict:
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """
+    The authenticated user, as an immutable snapshot.
+
+    Served from the principal cache (app.core.principals) when the token
+    was seen before; otherwise the token is decoded, the user loaded and
+    the result cached until the token expires.
+    """
     token = credentials.credentials
 
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    generation = principal_cache.generation
+
     # Demo token
     if token == "demo_token_for_testing_only":
-        user = db.query(User).filter(User.email == "admin@sensesafe.com").first()
+        user = await db.scalar(select(User).where(User.email == "admin@sensesafe.com"))
         if user:
-            return user
+            principal = Principal.of(user)
+            principal_cache.put(token, principal, None, generation)
+            return principal
 
     payload = decode_access_token(token)
 
     user_id: str = payload.get("sub")
-    if not user_id:
+    try:
+        user_uuid = UUID(user_id)
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_uuid)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
-    return user
+    principal = Principal.of(user)
+    principal_cache.put(token, principal, payload.get("exp"), generation)
+    return principal
 
 
 async def optional_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
-    db: Session = Depends(get_db),
-) -> Optional[User]:
+    db: AsyncSession = Depends(get_db),
+) -> Optional[Principal]:
     """
     Try to authenticate if token exists.
     If no token or invalid token -> return None (NO ERROR).
@@ -113,7 +154,7 @@ async def optional_user(
         return None
 
 
-async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -122,5 +163,5 @@ async def require_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
-async def require_user(current_user: User = Depends(get_current_user)) -> User:
+async def require_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     return current_user
@@ -0,0 +1,218 @@
+"""
+Batched, non-blocking telemetry exporter.
+
+``TelemetryExporter.enqueue`` never blocks. It puts the event on a bounded
+queue, or drops and counts it when the queue is full. A daemon thread
+collects events into batches of up to ``TELEMETRY_BATCH_SIZE``, or whatever
+arrived within ``TELEMETRY_FLUSH_INTERVAL`` seconds, and hands each batch to
+a sink. Failed sends are retried with exponential backoff and jitter. A
+batch that still fails after ``TELEMETRY_MAX_RETRIES`` attempts is dropped
+and counted.
+
+Sinks:
+    AzureSink   - Application Insights: track_event per event, one flush per batch
+    FileSink    - newline-delimited JSON appended to a local file
+    SocketSink  - newline-delimited JSON over TCP (load tests, log shippers)
+"""
+
+import json
+import logging
+import queue
+import random
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("sensesafe.telemetry")
+
+
+class AzureSink:
+    """Sends a batch through an Application Insights TelemetryClient."""
+
+    name = "azure"
+
+    def __init__(self, client):
+        self.client = client
+
+    def send(self, batch: List[Dict[str, Any]]) -> None:
+        for event in batch:
+            self.client.track_event(
+                name=event["name"],
+                properties=event.get("properties"),
+                metrics=event.get("metrics")
+            )
+        self.client.flush()
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink:
+    """Appends each event as one JSON line."""
+
+    name = "file"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def send(self, batch: List[Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(event) + "\n" for event in batch))
+
+    def close(self) -> None:
+        pass
+
+
+class SocketSink:
+    """Streams JSON lines to ``host:port`` over TCP, reconnecting after errors."""
+
+    name = "socket"
+
+    def __init__(self, host: str, port: int, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+
+    def send(self, batch: List[Dict[str, Any]]) -> None:
+        payload = "".join(json.dumps(event) + "\n" for event in batch).encode()
+        try:
+            if self._sock is None:
+                self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._sock.sendall(payload)
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+
+class TelemetryExporter:
+    """Bounded queue drained by a background thread that sends batches to a sink."""
+
+    def __init__(
+        self,
+        sink,
+        max_queue: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.sent = 0
+        self.batches = 0
+        self.retries = 0
+        self.dropped_overflow = 0
+        self.dropped_failed = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-exporter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush what is queued (bounded by ``timeout``) and stop the thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Telemetry exporter did not drain within %.1fs", timeout)
+        self._thread = None
+        self.sink.close()
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Queue one event without blocking. Returns False if it was dropped."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped_overflow += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self._stop.is_set() and self._queue.empty()):
+                break
+            try:
+                # Short polls keep shutdown responsive while the queue is idle
+                batch.append(self._queue.get(timeout=min(remaining, 0.2)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.sink.send(batch)
+            except Exception as e:
+                with self._lock:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                if attempt == self.max_retries:
+                    break
+                with self._lock:
+                    self.retries += 1
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                time.sleep(random.uniform(0, delay))  # full jitter
+                continue
+            with self._lock:
+                self.sent += len(batch)
+                self.batches += 1
+            return
+
+        logger.error("Dropping %d telemetry events after failed sends: %s", len(batch), self.last_error)
+        with self._lock:
+            self.dropped_failed += len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sink": self.sink.name,
+                "running": self._thread is not None and self._thread.is_alive(),
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "sent": self.sent,
+                "batches": self.batches,
+                "retries": self.retries,
+                "dropped_overflow": self.dropped_overflow,
+                "dropped_failed": self.dropped_failed,
+                "last_error": self.last_error,
+            }
@@ -1,26 +1,185 @@
+import threading
+from typing import Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolStats, describe_pool
 
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Verify connections before using
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
-)
+def to_async_url(url: str) -> str:
+    """
+    Map a sync DATABASE_URL onto the matching async driver.
+
+    postgresql:// (psycopg2) becomes postgresql+asyncpg:// and sqlite://
+    becomes sqlite+aiosqlite://. asyncpg does not understand libpq's
+    ``sslmode`` so it is passed on as ``ssl`` instead.
+    """
+    db_url = make_url(url)
+    backend = db_url.get_backend_name()
+
+    if backend == "postgresql":
+        db_url = db_url.set(drivername="postgresql+asyncpg")
+        if "sslmode" in db_url.query:
+            sslmode = db_url.query["sslmode"]
+            db_url = db_url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    elif backend == "sqlite":
+        db_url = db_url.set(drivername="sqlite+aiosqlite")
+
+    return db_url.render_as_string(hide_password=False)
+
+
+class EngineRegistry:
+    """
+    Process-wide holder for the sync and async engines.
+
+    Engines are built on first use, so importing the app never loads a
+    database driver or creates a pool. Every session factory below resolves
+    its bind through this registry.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._engine: Optional[Engine] = None
+        self._async_engine: Optional[AsyncEngine] = None
+        self._lock = threading.Lock()
+        self.pool_stats = {"sync": PoolStats(), "async": PoolStats()}
+
+    def _engine_options(self, asynchronous: bool) -> dict:
+        options = {
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "echo": settings.DEBUG,  # Log SQL queries in debug mode
+        }
+        # SQLite keeps SQLAlchemy's per-dialect default pool
+        if make_url(self.url).get_backend_name() != "sqlite":
+            options.update({
+                "poolclass": InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT,
+                "pool_recycle": settings.DB_POOL_RECYCLE,
+            })
+        return options
+
+    @property
+    def engine(self) -> Engine:
+        """Sync engine - used by scripts and migrations."""
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine = create_engine(self.url, **self._engine_options(asynchronous=False))
+                    self.pool_stats["sync"].attach(engine)
+                    self._engine = engine
+        return self._engine
+
+    @property
+    def async_engine(self) -> AsyncEngine:
+        """Async engine - used by every API route."""
+        if self._async_engine is None:
+            with self._lock:
+                if self._async_engine is None:
+                    async_engine = create_async_engine(
+                        to_async_url(self.url), **self._engine_options(asynchronous=True)
+                    )
+                    self.pool_stats["async"].attach(async_engine.sync_engine)
+                    self._async_engine = async_engine
+        return self._async_engine
+
+    def pool_status(self) -> list:
+        """Live statistics for every engine that has been created so far."""
+        status = []
+        if self._async_engine is not None:
+            status.append({"engine": "async", **describe_pool(self._async_engine.sync_engine, self.pool_stats["async"])})
+        if self._engine is not None:
+            status.append({"engine": "sync", **describe_pool(self._engine, self.pool_stats["sync"])})
+        return status
+
+    def dispose(self) -> None:
+        """Close the sync pool (if it was ever created)."""
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+
+    async def dispose_async(self) -> None:
+        """Close both pools; called from the app lifespan on shutdown."""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+        self.dispose()
+
+
+registry = EngineRegistry(settings.DATABASE_URL)
+
+
+def get_engine() -> Engine:
+    return registry.engine
+
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def get_async_engine() -> AsyncEngine:
+    return registry.async_engine
+
+
+class _SyncRegistrySession(Session):
+    """Session that binds to the registry's sync engine on first query."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.bind is not None:
+            return self.bind
+        return registry.engine
+
+
+class _AsyncRegistrySession(Session):
+    """Sync half of an AsyncSession; binds to the registry's async engine."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.bind is not None:
+            return self.bind
+        return registry.async_engine.sync_engine
+
+
+# Create SessionLocal class (sync - used by scripts)
+SessionLocal = sessionmaker(class_=_SyncRegistrySession, autocommit=False, autoflush=False)
+
+# Attributes stay loaded after commit so responses can be built without
+# an implicit (and, under asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=_AsyncRegistrySession,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 # Create Base class for models
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session."""
+def create_schema() -> None:
+    """Create any missing tables (sync). Used by scripts."""
+    import app.db.models  # noqa: F401  (registers every table on Base)
+
+    Base.metadata.create_all(bind=registry.engine)
+
+
+async def create_schema_async() -> None:
+    """Create any missing tables. Run from the app lifespan when DB_AUTO_CREATE_SCHEMA is on."""
+    import app.db.models  # noqa: F401  (registers every table on Base)
+
+    async with registry.async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def get_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_sync_db():
+    """Sync session generator for scripts and the sync benchmark baseline."""
     db = SessionLocal()
     try:
         yield db
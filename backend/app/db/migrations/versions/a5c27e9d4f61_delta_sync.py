@@ -0,0 +1,71 @@
+"""delta sync: updated_at and tombstones
+
+Adds updated_at to incidents, sos, alerts and messages (backfilled from
+created_at), the indexes the ?since= feeds read, and the tombstones table
+for deleted messages and resolved alerts. The app creates the columns and
+table itself on a fresh database, hence the existence checks.
+
+Revision ID: a5c27e9d4f61
+Revises: f3a81c6d5b27
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c27e9d4f61'
+down_revision = 'f3a81c6d5b27'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ["incidents", "sos", "alerts", "messages"]
+
+INDEXES = [
+    ("ix_incidents_updated_at_id", "incidents", ["updated_at", "id"]),
+    ("ix_sos_updated_at_id", "sos", ["updated_at", "id"]),
+    ("ix_sos_user_updated_at", "sos", ["user_id", "updated_at", "id"]),
+    ("ix_alerts_updated_at_id", "alerts", ["updated_at", "id"]),
+    ("ix_messages_updated_at_id", "messages", ["updated_at", "id"]),
+    ("ix_messages_user_updated_at", "messages", ["user_id", "updated_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(op.get_bind())
+
+    for table in TABLES:
+        if offline or "updated_at" not in {c["name"] for c in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column("updated_at", sa.DateTime(), nullable=True))
+            op.execute(f"UPDATE {table} SET updated_at = created_at")
+            with op.batch_alter_table(table) as batch:
+                batch.alter_column("updated_at", existing_type=sa.DateTime(), nullable=False)
+
+    if offline or not inspector.has_table("tombstones"):
+        op.create_table(
+            "tombstones",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("collection", sa.String(50), nullable=False),
+            sa.Column("row_id", sa.Uuid(), nullable=False),
+            sa.Column("owner_id", sa.Uuid(), nullable=True),
+            sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_tombstones_collection_deleted_at", "tombstones", ["collection", "deleted_at"])
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    op.drop_index("ix_tombstones_collection_deleted_at", table_name="tombstones")
+    op.drop_table("tombstones")
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("updated_at")
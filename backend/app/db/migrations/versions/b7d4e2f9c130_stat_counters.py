@@ -0,0 +1,37 @@
+"""stat counters
+
+Adds stat_counters, the per-bucket row counts behind the message, SOS and
+incident stats (app.utils.counters). The rows are filled by the
+reconciliation job, which runs when the app starts. The app creates the
+table itself on a fresh database, hence the existence check.
+
+Revision ID: b7d4e2f9c130
+Revises: a5c27e9d4f61
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d4e2f9c130'
+down_revision = 'a5c27e9d4f61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    if not offline and sa.inspect(op.get_bind()).has_table("stat_counters"):
+        return
+
+    op.create_table(
+        "stat_counters",
+        sa.Column("name", sa.String(100), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stat_counters")
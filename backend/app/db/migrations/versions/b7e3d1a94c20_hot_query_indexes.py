@@ -0,0 +1,64 @@
+"""hot query indexes
+
+Composite and partial indexes for the access paths the API hits most:
+newest-first pagination, per-user history, the active SOS / open incident
+sets behind map-data and stats/sos, unread messages and audit log filters.
+
+The tables themselves are created by the app (DB_AUTO_CREATE_SCHEMA), which
+also creates these indexes on a fresh database, hence ``if_not_exists``. On
+PostgreSQL the indexes are built CONCURRENTLY so writes are not blocked.
+
+Revision ID: b7e3d1a94c20
+Revises:
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3d1a94c20'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    ("ix_users_created_at_id", "users", ["created_at", "id"], None),
+    ("ix_incidents_created_at_id", "incidents", ["created_at", "id"], None),
+    ("ix_sos_created_at_id", "sos", ["created_at", "id"], None),
+    ("ix_alerts_created_at_id", "alerts", ["created_at", "id"], None),
+    ("ix_messages_created_at_id", "messages", ["created_at", "id"], None),
+    ("ix_audit_logs_created_at_id", "audit_logs", ["created_at", "id"], None),
+    ("ix_incidents_user_created_at", "incidents", ["user_id", "created_at", "id"], None),
+    ("ix_sos_user_created_at", "sos", ["user_id", "created_at", "id"], None),
+    ("ix_messages_user_created_at", "messages", ["user_id", "created_at", "id"], None),
+    ("ix_audit_logs_admin_created_at", "audit_logs", ["admin_id", "created_at", "id"], None),
+    ("ix_audit_logs_action_created_at", "audit_logs", ["action", "created_at", "id"], None),
+    # Same predicates as SOS_ACTIVE, INCIDENT_OPEN and MESSAGE_UNREAD in app/db/models.py
+    ("ix_sos_active", "sos", ["created_at", "id"], "status != 'SAFE'"),
+    ("ix_incidents_open", "incidents", ["created_at", "id"], "status != 'RESOLVED'"),
+    ("ix_messages_unread", "messages", ["created_at", "id"], "is_read = 0"),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            kwargs = {}
+            if where is not None:
+                kwargs = {"postgresql_where": sa.text(where), "sqlite_where": sa.text(where)}
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                **kwargs,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,69 @@
+"""audit rollups
+
+Adds audit_rollup_hourly and audit_rollup_daily, the pre-aggregated audit
+counts behind /api/admin/audit-logs/stats (app.admin.rollups), and fills
+them from audit_logs. The app creates the tables itself on a fresh
+database, hence the existence checks; scripts/audit_rollups.py rebuild
+fills them in that case.
+
+Revision ID: c9e5a7b3d214
+Revises: b7d4e2f9c130
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e5a7b3d214'
+down_revision = 'b7d4e2f9c130'
+branch_labels = None
+depends_on = None
+
+
+ROLLUPS = [("audit_rollup_hourly", "hour"), ("audit_rollup_daily", "day")]
+
+# Same buckets as app.admin.rollups.bucket_expression
+BUCKET_SQL = {
+    "postgresql": {
+        "hour": "date_trunc('hour', created_at)",
+        "day": "date_trunc('day', created_at)",
+    },
+    "sqlite": {
+        "hour": "strftime('%Y-%m-%d %H:00:00.000000', created_at)",
+        "day": "strftime('%Y-%m-%d 00:00:00.000000', created_at)",
+    },
+}
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(op.get_bind())
+    dialect = op.get_context().dialect.name
+
+    for table, grain in ROLLUPS:
+        if not offline and inspector.has_table(table):
+            continue
+        op.create_table(
+            table,
+            sa.Column("bucket", sa.DateTime(), primary_key=True),
+            sa.Column("action", postgresql.ENUM(name="auditaction", create_type=False), primary_key=True),
+            sa.Column("admin_id", sa.Uuid(), primary_key=True),
+            sa.Column("success", sa.Integer(), primary_key=True),
+            sa.Column("admin_email", sa.String(255), nullable=False),
+            sa.Column("count", sa.BigInteger(), nullable=False),
+        )
+        if dialect in BUCKET_SQL:
+            bucket = BUCKET_SQL[dialect][grain]
+            op.execute(
+                f"INSERT INTO {table} (bucket, action, admin_id, success, admin_email, count) "
+                f"SELECT {bucket}, action, admin_id, success, max(admin_email), count(*) "
+                f"FROM audit_logs GROUP BY {bucket}, action, admin_id, success"
+            )
+
+
+def downgrade() -> None:
+    for table, _ in reversed(ROLLUPS):
+        op.drop_table(table)
@@ -0,0 +1,106 @@
+"""audit log partitions and archive
+
+Adds audit_archive_segments, the catalog of archived audit log files
+(app.admin.audit_archive). On PostgreSQL, audit_logs is rebuilt as a table
+range partitioned by created_at, with the primary key (id, created_at) and
+a default partition holding the existing rows; the app carves the monthly
+partitions out of it at startup. SQLite keeps its single audit_logs table.
+
+Downgrading turns audit_logs back into a plain table. Entries already
+archived stay in their segment files and are no longer read.
+
+Revision ID: d1f6b8c4e325
+Revises: c9e5a7b3d214
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1f6b8c4e325'
+down_revision = 'c9e5a7b3d214'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = {
+    "ix_audit_logs_created_at_id": "created_at, id",
+    "ix_audit_logs_admin_created_at": "admin_id, created_at, id",
+    "ix_audit_logs_action_created_at": "action, created_at, id",
+}
+
+
+def _partitioned() -> bool:
+    if op.get_context().as_sql:
+        return False
+    return bool(op.get_bind().scalar(sa.text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('audit_logs')"
+    )))
+
+
+def _rename_old_table(suffix: str) -> None:
+    op.execute(f"ALTER TABLE audit_logs RENAME TO audit_logs_{suffix}")
+    op.execute(f"ALTER TABLE audit_logs_{suffix} RENAME CONSTRAINT audit_logs_pkey TO audit_logs_{suffix}_pkey")
+    op.execute(
+        f"ALTER TABLE audit_logs_{suffix} RENAME CONSTRAINT audit_logs_admin_id_fkey TO audit_logs_{suffix}_admin_id_fkey"
+    )
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_{suffix}")
+
+
+def _add_keys(primary_key: str) -> None:
+    op.execute(f"ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_pkey PRIMARY KEY ({primary_key})")
+    op.execute(
+        "ALTER TABLE audit_logs ADD CONSTRAINT audit_logs_admin_id_fkey "
+        "FOREIGN KEY (admin_id) REFERENCES users (id)"
+    )
+    for name, columns in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON audit_logs ({columns})")
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    dialect = op.get_context().dialect.name
+
+    if offline or not sa.inspect(op.get_bind()).has_table("audit_archive_segments"):
+        op.create_table(
+            "audit_archive_segments",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("path", sa.String(500), nullable=False),
+            sa.Column("min_created_at", sa.DateTime(), nullable=False),
+            sa.Column("max_created_at", sa.DateTime(), nullable=False),
+            sa.Column("rows", sa.Integer(), nullable=False),
+            sa.Column("archived_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "ix_audit_archive_segments_range", "audit_archive_segments", ["max_created_at", "min_created_at"]
+        )
+
+    if dialect != "postgresql" or _partitioned():
+        return
+
+    _rename_old_table("legacy")
+    op.execute(
+        "CREATE TABLE audit_logs (LIKE audit_logs_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    )
+    _add_keys("id, created_at")
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+    op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_legacy")
+    op.execute("DROP TABLE audit_logs_legacy")
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+
+    if dialect == "postgresql" and (op.get_context().as_sql or _partitioned()):
+        _rename_old_table("partitioned")
+        op.execute("CREATE TABLE audit_logs (LIKE audit_logs_partitioned INCLUDING DEFAULTS)")
+        _add_keys("id")
+        op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned")
+        op.execute("DROP TABLE audit_logs_partitioned CASCADE")
+
+    op.drop_index("ix_audit_archive_segments_range", table_name="audit_archive_segments")
+    op.drop_table("audit_archive_segments")
@@ -0,0 +1,64 @@
+"""incident groups
+
+Adds the incident_groups table and incidents.group_id. Reports are grouped
+as they are created (app.incidents.grouping); existing incidents keep a NULL
+group_id. The app creates the table and column itself on a fresh database,
+hence the existence checks.
+
+Revision ID: d82a5c7e1f03
+Revises: c41f8e2a7b19
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd82a5c7e1f03'
+down_revision = 'c41f8e2a7b19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    inspector = None if offline else sa.inspect(op.get_bind())
+
+    if offline or not inspector.has_table("incident_groups"):
+        op.create_table(
+            "incident_groups",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("type", sa.String(100), nullable=False),
+            sa.Column("lat", sa.Float(), nullable=False),
+            sa.Column("lng", sa.Float(), nullable=False),
+            sa.Column("report_count", sa.Integer(), nullable=False),
+            sa.Column("last_report_at", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_incident_groups_created_at_id", "incident_groups", ["created_at", "id"])
+        op.create_index("ix_incident_groups_type_last_report", "incident_groups", ["type", "last_report_at"])
+
+    if offline or "group_id" not in {c["name"] for c in inspector.get_columns("incidents")}:
+        with op.batch_alter_table("incidents") as batch:
+            batch.add_column(sa.Column("group_id", sa.Uuid(), nullable=True))
+            batch.create_foreign_key("fk_incidents_group_id", "incident_groups", ["group_id"], ["id"])
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_incidents_group_created_at", "incidents", ["group_id", "created_at", "id"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_incidents_group_created_at", table_name="incidents", if_exists=True,
+                      postgresql_concurrently=True)
+    with op.batch_alter_table("incidents") as batch:
+        batch.drop_constraint("fk_incidents_group_id", type_="foreignkey")
+        batch.drop_column("group_id")
+    op.drop_index("ix_incident_groups_type_last_report", table_name="incident_groups")
+    op.drop_index("ix_incident_groups_created_at_id", table_name="incident_groups")
+    op.drop_table("incident_groups")
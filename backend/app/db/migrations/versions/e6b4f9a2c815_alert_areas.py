@@ -0,0 +1,52 @@
+"""alert areas and expiry
+
+Adds the target area (circle or polygon) and expires_at to alerts. Existing
+alerts keep a NULL area and expiry, so they stay visible everywhere until
+resolved. The app creates the columns itself on a fresh database, hence the
+existence checks.
+
+Revision ID: e6b4f9a2c815
+Revises: d82a5c7e1f03
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6b4f9a2c815'
+down_revision = 'd82a5c7e1f03'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = [
+    ("center_lat", sa.Float()),
+    ("center_lng", sa.Float()),
+    ("radius_m", sa.Float()),
+    ("polygon", sa.Text()),
+    ("expires_at", sa.DateTime()),
+]
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    existing = set() if offline else {c["name"] for c in sa.inspect(op.get_bind()).get_columns("alerts")}
+    for name, type_ in COLUMNS:
+        if name not in existing:
+            op.add_column("alerts", sa.Column(name, type_, nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_alerts_expires_at", "alerts", ["expires_at"],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_alerts_expires_at", table_name="alerts", if_exists=True, postgresql_concurrently=True)
+    for name, _ in reversed(COLUMNS):
+        op.drop_column("alerts", name)
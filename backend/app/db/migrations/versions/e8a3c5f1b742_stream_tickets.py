@@ -0,0 +1,38 @@
+"""stream tickets
+
+Adds stream_tickets, the single-use tickets that authorise opening the
+admin event stream (app.admin.stream_tickets).
+
+Revision ID: e8a3c5f1b742
+Revises: d1f6b8c4e325
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a3c5f1b742'
+down_revision = 'd1f6b8c4e325'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    if not offline and sa.inspect(op.get_bind()).has_table("stream_tickets"):
+        return
+
+    op.create_table(
+        "stream_tickets",
+        sa.Column("id", sa.String(64), primary_key=True),
+        sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_stream_tickets_expires_at", "stream_tickets", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stream_tickets_expires_at", table_name="stream_tickets")
+    op.drop_table("stream_tickets")
@@ -0,0 +1,40 @@
+"""collection versions
+
+Adds collection_versions, the per-table write counters behind list ETags
+(app.utils.etag), with one row per versioned table. The app creates the
+table and any missing rows itself on start-up, hence the existence check.
+
+Revision ID: f3a81c6d5b27
+Revises: e6b4f9a2c815
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a81c6d5b27'
+down_revision = 'e6b4f9a2c815'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ["alerts", "audit_logs", "incident_groups", "incidents", "messages", "sos", "users"]
+
+
+def upgrade() -> None:
+    offline = op.get_context().as_sql
+    if not offline and sa.inspect(op.get_bind()).has_table("collection_versions"):
+        return
+
+    versions = op.create_table(
+        "collection_versions",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+    )
+    op.bulk_insert(versions, [{"name": name, "version": 0} for name in TABLES])
+
+
+def downgrade() -> None:
+    op.drop_table("collection_versions")
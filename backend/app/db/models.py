@@ -1,45 +1,16 @@
-# -------------------------------
-# DATABASE SETUP
-# -------------------------------
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-from app.core.config import settings
-
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,   # Verify connections before using
-    echo=settings.DEBUG,  # Log SQL queries in debug mode
-)
-
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Base class
-Base = declarative_base()
-
-
-def get_db():
-    """Dependency to get database session."""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # -------------------------------
 # MODELS
 # -------------------------------
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Float, Integer, Enum, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, DDL, String, DateTime, ForeignKey, Float, Integer, Enum, Text, Index, event, literal, or_
+from sqlalchemy import Uuid  # native UUID on Postgres, CHAR(32) on SQLite
 from sqlalchemy.orm import relationship
 
+from app.db.database import Base
+from app.utils.geo import geohash_encode
+
 
 # Enums
 class UserRole(str, enum.Enum):
@@ -87,10 +58,23 @@ class AlertType(str, enum.Enum):
     EMERGENCY = "EMERGENCY"
 
 
+def _geohash_default(context):
+    """Column default: geohash of the row's lat/lng, for inserts of any kind."""
+    params = context.get_current_parameters()
+    lat, lng = params.get("lat"), params.get("lng")
+    if lat is None or lng is None:
+        return None
+    return geohash_encode(lat, lng)
+
+
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Newest-first keyset pagination; every list table has one (app.utils.pagination)
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
@@ -104,46 +88,115 @@ class User(Base):
 
 class Incident(Base):
     __tablename__ = "incidents"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    __table_args__ = (
+        Index("ix_incidents_created_at_id", "created_at", "id"),
+        # Per-user history, newest first
+        Index("ix_incidents_user_created_at", "user_id", "created_at", "id"),
+        # Cell / neighbour-cell range lookups (app.utils.geo.geohash_filter)
+        Index("ix_incidents_geohash", "geohash", "created_at"),
+        # Reports of one group, newest first
+        Index("ix_incidents_group_created_at", "group_id", "created_at", "id"),
+        # Delta sync (app.utils.sync)
+        Index("ix_incidents_updated_at_id", "updated_at", "id"),
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=True)
     type = Column(String(100), nullable=False)
     description = Column(Text, nullable=False)
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
+    geohash = Column(String(12), nullable=True, default=_geohash_default)  # set on insert from lat/lng
     status = Column(Enum(IncidentStatus), default=IncidentStatus.PENDING, nullable=False)
     image_url = Column(String(500), nullable=True)
     risk_score = Column(Float, nullable=True)
     risk_level = Column(String(50), nullable=True)
+    group_id = Column(Uuid(as_uuid=True), ForeignKey("incident_groups.id", name="fk_incidents_group_id"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     user = relationship("User", back_populates="incidents")
 
 
+class IncidentGroup(Base):
+    """
+    Reports of the same event: same normalised type, close in space and time.
+
+    Maintained on the write path by app.incidents.grouping; lat/lng is the
+    mean of every report attached so far.
+    """
+    __tablename__ = "incident_groups"
+    __table_args__ = (
+        Index("ix_incident_groups_created_at_id", "created_at", "id"),
+        # Recent groups of a type, for matching a report no worker has in memory
+        Index("ix_incident_groups_type_last_report", "type", "last_report_at"),
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    type = Column(String(100), nullable=False)  # normalised, see grouping.normalize_type
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    report_count = Column(Integer, default=1, nullable=False)
+    last_report_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class SOS(Base):
     __tablename__ = "sos"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    __table_args__ = (
+        Index("ix_sos_created_at_id", "created_at", "id"),
+        Index("ix_sos_user_created_at", "user_id", "created_at", "id"),
+        Index("ix_sos_geohash", "geohash", "created_at"),
+        Index("ix_sos_updated_at_id", "updated_at", "id"),
+        Index("ix_sos_user_updated_at", "user_id", "updated_at", "id"),
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=True)
     ability = Column(Enum(UserAbility), nullable=False)
     lat = Column(Float, nullable=False)
     lng = Column(Float, nullable=False)
+    geohash = Column(String(12), nullable=True, default=_geohash_default)
     battery = Column(Integer, nullable=False)
     status = Column(Enum(SOSStatus), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     user = relationship("User", back_populates="sos_alerts")
 
 
 class Alert(Base):
+    """
+    Disaster alert, optionally limited to an area and a lifetime.
+
+    The area is a circle (center_lat/center_lng/radius_m) or a polygon
+    (JSON list of [lat, lng] vertices); an alert with neither applies
+    everywhere. An alert is active until expires_at (NULL: never).
+    """
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_created_at_id", "created_at", "id"),
+        Index("ix_alerts_expires_at", "expires_at"),
+        Index("ix_alerts_updated_at_id", "updated_at", "id"),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
     severity = Column(Enum(AlertSeverity), nullable=False)
     alert_type = Column(Enum(AlertType), default=AlertType.GENERAL, nullable=False)
+    center_lat = Column(Float, nullable=True)
+    center_lng = Column(Float, nullable=True)
+    radius_m = Column(Float, nullable=True)
+    polygon = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+def alert_active(now: datetime):
+    """Alerts that have not expired at ``now``."""
+    return or_(Alert.expires_at.is_(None), Alert.expires_at > now)
 
 
 class MessageType(str, enum.Enum):
@@ -154,20 +207,29 @@ class MessageType(str, enum.Enum):
 
 class Message(Base):
     __tablename__ = "messages"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)  # Nullable for anonymous SOS
+    __table_args__ = (
+        Index("ix_messages_created_at_id", "created_at", "id"),
+        Index("ix_messages_user_created_at", "user_id", "created_at", "id"),
+        Index("ix_messages_geohash", "geohash", "created_at"),
+        Index("ix_messages_updated_at_id", "updated_at", "id"),
+        Index("ix_messages_user_updated_at", "user_id", "updated_at", "id"),
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=True)  # Nullable for anonymous SOS
     message_type = Column(Enum(MessageType), nullable=False)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     lat = Column(Float, nullable=True)
     lng = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True, default=_geohash_default)  # NULL without a location
     category = Column(String(100), nullable=True)
     severity = Column(String(50), nullable=True)
     ability = Column(Enum(UserAbility), nullable=True)
     battery = Column(Integer, nullable=True)
     is_read = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     user = relationship("User", back_populates="messages")
 
@@ -175,6 +237,79 @@ class Message(Base):
 User.messages = relationship("Message", back_populates="user", cascade="all, delete-orphan")
 
 
+class CollectionVersion(Base):
+    """
+    Write counter per table, bumped in the same transaction as the write.
+
+    List endpoints derive their ETags from it (app.utils.etag).
+    """
+    __tablename__ = "collection_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, default=0, nullable=False)
+
+
+class StreamTicket(Base):
+    """
+    Single-use ticket that authorises opening the admin event stream.
+
+    Stored hashed; redeemed and deleted by GET /api/admin/stream (app.admin.stream_tickets).
+    """
+    __tablename__ = "stream_tickets"
+
+    id = Column(String(64), primary_key=True)  # sha256 hex of the ticket
+    user_id = Column(Uuid(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class StatCounter(Base):
+    """
+    Row count of one (table, key) bucket, e.g. ``messages:SOS:0``.
+
+    Maintained by the writing transaction and reconciled periodically
+    (app.utils.counters), so stats endpoints read a few rows instead of
+    counting tables.
+    """
+    __tablename__ = "stat_counters"
+
+    name = Column(String(100), primary_key=True)
+    value = Column(BigInteger, default=0, nullable=False)
+
+
+class Tombstone(Base):
+    """
+    A deleted (or, for alerts, resolved) row, kept for delta sync clients.
+
+    Pruned after SYNC_TOMBSTONE_DAYS; older sync tokens are refused (app.utils.sync).
+    """
+    __tablename__ = "tombstones"
+    __table_args__ = (
+        Index("ix_tombstones_collection_deleted_at", "collection", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    collection = Column(String(50), nullable=False)
+    row_id = Column(Uuid(as_uuid=True), nullable=False)
+    owner_id = Column(Uuid(as_uuid=True), nullable=True)  # user the row belonged to, for per-user feeds
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# -------------------------------
+# ACTIVE-SET PARTIAL INDEXES
+# -------------------------------
+# Each predicate is shared by a partial index and the queries it serves. The
+# constant is rendered inline (literal_execute) because neither SQLite nor a
+# PostgreSQL generic plan can match a partial index against a bound parameter.
+
+SOS_ACTIVE = SOS.status != literal(SOSStatus.SAFE, SOS.status.type, literal_execute=True)
+INCIDENT_OPEN = Incident.status != literal(IncidentStatus.RESOLVED, Incident.status.type, literal_execute=True)
+MESSAGE_UNREAD = Message.is_read == literal(0, Integer, literal_execute=True)
+
+Index("ix_sos_active", SOS.created_at, SOS.id, postgresql_where=SOS_ACTIVE, sqlite_where=SOS_ACTIVE)
+Index("ix_incidents_open", Incident.created_at, Incident.id, postgresql_where=INCIDENT_OPEN, sqlite_where=INCIDENT_OPEN)
+Index("ix_messages_unread", Message.created_at, Message.id, postgresql_where=MESSAGE_UNREAD, sqlite_where=MESSAGE_UNREAD)
+
+
 # -------------------------------
 # AUDIT LOGGING
 # -------------------------------
@@ -198,26 +333,86 @@ class AuditLog(Base):
     Audit log for tracking all admin actions.
     
     This provides a complete audit trail of who did what and when.
+    On PostgreSQL the table is partitioned by month of created_at (hence
+    created_at in the primary key); months past the retention period are
+    moved to archive segments (app.admin.audit_archive).
     """
     __tablename__ = "audit_logs"
-
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    admin_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    __table_args__ = (
+        Index("ix_audit_logs_created_at_id", "created_at", "id"),
+        Index("ix_audit_logs_admin_created_at", "admin_id", "created_at", "id"),
+        Index("ix_audit_logs_action_created_at", "action", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = Column(Uuid(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    admin_id = Column(Uuid(as_uuid=True), ForeignKey("users.id"), nullable=False)
     admin_email = Column(String(255), nullable=False)
     action = Column(Enum(AuditAction), nullable=False)
     resource_type = Column(String(100), nullable=False)
-    resource_id = Column(UUID(as_uuid=True), nullable=True)
+    resource_id = Column(Uuid(as_uuid=True), nullable=True)
     details = Column(Text, nullable=True)  # JSON string for additional details
     ip_address = Column(String(50), nullable=True)
     user_agent = Column(String(500), nullable=True)
     success = Column(Integer, default=1, nullable=False)  # 1 = success, 0 = failed
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, primary_key=True)
 
     admin = relationship("User", backref="audit_logs")
 
 
-# -------------------------------
-# CREATE TABLES (FIRST RUN ONLY)
-# -------------------------------
-Base.metadata.create_all(bind=engine)
+# Rows outside every monthly partition land here until a partition is carved out for them
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT").execute_if(dialect="postgresql"),
+)
+
+
+
+class AuditRollupHourly(Base):
+    """
+    Audit log entries per hour, action, admin and outcome.
+
+    Kept in step with audit_logs by the code that inserts the entries
+    (app.admin.rollups); audit statistics sum these instead of scanning.
+    """
+    __tablename__ = "audit_rollup_hourly"
+
+    bucket = Column(DateTime, primary_key=True)  # start of the hour (UTC)
+    action = Column(Enum(AuditAction), primary_key=True)
+    admin_id = Column(Uuid(as_uuid=True), primary_key=True)
+    success = Column(Integer, primary_key=True)
+    admin_email = Column(String(255), nullable=False)
+    count = Column(BigInteger, default=0, nullable=False)
+
+
+class AuditRollupDaily(Base):
+    """Audit log entries per day, action, admin and outcome; see AuditRollupHourly."""
+    __tablename__ = "audit_rollup_daily"
+
+    bucket = Column(DateTime, primary_key=True)  # start of the day (UTC)
+    action = Column(Enum(AuditAction), primary_key=True)
+    admin_id = Column(Uuid(as_uuid=True), primary_key=True)
+    success = Column(Integer, primary_key=True)
+    admin_email = Column(String(255), nullable=False)
+    count = Column(BigInteger, default=0, nullable=False)
+
+
+class AuditArchiveSegment(Base):
+    """
+    One archived file of audit log entries (gzipped JSONL, oldest first).
+
+    Written once and never changed; readers prune by the created_at range.
+    """
+    __tablename__ = "audit_archive_segments"
+    __table_args__ = (
+        Index("ix_audit_archive_segments_range", "max_created_at", "min_created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    path = Column(String(500), nullable=False)  # relative to AUDIT_ARCHIVE_DIR
+    min_created_at = Column(DateTime, nullable=False)
+    max_created_at = Column(DateTime, nullable=False)
+    rows = Column(Integer, nullable=False)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
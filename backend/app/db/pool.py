@@ -0,0 +1,131 @@
+"""
+Connection pool instrumentation.
+
+Counts checkouts, time spent waiting for a connection and checkout
+timeouts so pool sizing can be driven by data from /api/admin/db/pool.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Thread-safe counters for one engine's pool."""
+
+    # Recent checkout waits kept for percentiles
+    WAIT_SAMPLES = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits = deque(maxlen=self.WAIT_SAMPLES)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+
+    def record_timeout(self, seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_max = max(self.wait_max, seconds)
+
+    def on_checkout(self, *args) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+
+    def on_checkin(self, *args) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def on_connect(self, *args) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def attach(self, engine: Engine) -> None:
+        """Listen to pool events on ``engine`` (a sync Engine or AsyncEngine.sync_engine)."""
+        event.listen(engine, "checkout", self.on_checkout)
+        event.listen(engine, "checkin", self.on_checkin)
+        event.listen(engine, "connect", self.on_connect)
+        if isinstance(engine.pool, _InstrumentedMixin):
+            engine.pool.stats = self
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            timed = len(waits)
+            return {
+                "total_checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": (sum(waits) / timed * 1000) if timed else 0.0,
+                "wait_p95_ms": (waits[min(timed - 1, int(timed * 0.95))] * 1000) if timed else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+class _InstrumentedMixin:
+    """Times every ``_do_get`` (the blocking part of a checkout)."""
+
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.record_timeout(time.perf_counter() - started)
+            raise
+        if self.stats is not None:
+            self.stats.record_wait(time.perf_counter() - started)
+        return conn
+
+    def recreate(self):
+        # dispose()/invalidation builds a fresh pool; keep the same counters
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def describe_pool(engine: Engine, stats: PoolStats) -> Dict[str, Any]:
+    """Live pool gauges plus the accumulated ``stats`` for one engine."""
+    pool = engine.pool
+    info: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "size": None,
+        "max_overflow": None,
+        "idle": None,
+        "overflow_in_use": None,
+    }
+    if isinstance(pool, QueuePool):
+        info.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "idle": pool.checkedin(),
+            "overflow_in_use": max(0, pool.overflow()),
+        })
+    info.update(stats.snapshot())
+    return info
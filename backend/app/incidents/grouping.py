@@ -0,0 +1,194 @@
+"""
+Write-path deduplication of incident reports into incident groups.
+
+A report joins the group of the same normalised type whose centroid is
+within ``INCIDENT_GROUP_RADIUS_M`` and that last received a report less
+than ``INCIDENT_GROUP_WINDOW_MINUTES`` ago; otherwise it opens a new group.
+
+Each worker keeps recent groups in a hash grid keyed by (geohash cell, time
+bucket, type). Cells are at least the radius wide and buckets the window
+long, so a match is always in the report's cell or one of its eight
+neighbours, in the current or previous bucket: at most 18 dict lookups,
+however many groups exist. Buckets older than that are dropped whole.
+
+The database stays the source of truth. Joining a group is a single
+``UPDATE ... RETURNING`` that bumps the count and moves the centroid
+atomically, so workers never overwrite each other. A grid miss falls back
+to an indexed query for recent groups of the type, which catches groups
+opened by another worker or before a restart. Two simultaneous first
+reports of an event can still open two groups.
+"""
+
+import re
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import IncidentGroup
+from app.utils.geo import (
+    bbox_filter,
+    circle_bbox,
+    distance_m,
+    geohash_cell_meters,
+    geohash_encode,
+    geohash_neighbors,
+)
+
+# Cells must be at least the radius wide up to this latitude; further
+# poleward a match just outside the neighbour ring can be missed.
+_MAX_COVERED_LAT = 70.0
+
+
+def normalize_type(value: str) -> str:
+    """Lower-case ``value`` and collapse punctuation and whitespace: " Fire!! " -> "fire"."""
+    return " ".join(re.sub(r"[\W_]+", " ", value.lower()).split())
+
+
+class _Group:
+    __slots__ = ("id", "lat", "lng", "report_count", "last_report_at")
+
+    def __init__(self, id: uuid.UUID, lat: float, lng: float, report_count: int, last_report_at: datetime):
+        self.id = id
+        self.lat = lat
+        self.lng = lng
+        self.report_count = report_count
+        self.last_report_at = last_report_at
+
+
+class IncidentGrid:
+    """Recent incident groups of this worker, hashed by cell, time bucket and type."""
+
+    def __init__(self, radius_m: float, window: timedelta):
+        self.radius_m = radius_m
+        self.window = window
+        self.precision = next(
+            (p for p in range(12, 0, -1) if geohash_cell_meters(p, _MAX_COVERED_LAT) >= radius_m), 1
+        )
+        self._buckets: Dict[int, Dict[Tuple[str, str], List[_Group]]] = {}
+
+    def _bucket(self, at: datetime) -> int:
+        return int(at.timestamp() // self.window.total_seconds())
+
+    def _prune(self, current: int) -> None:
+        for bucket in [b for b in self._buckets if b < current - 1]:
+            del self._buckets[bucket]
+
+    def find(self, kind: str, lat: float, lng: float, at: datetime) -> Optional[_Group]:
+        """Nearest group of ``kind`` within the radius that is still open at ``at``."""
+        current = self._bucket(at)
+        self._prune(current)
+        center = geohash_encode(lat, lng, self.precision)
+        cells = [center, *geohash_neighbors(center)]
+        best, best_distance = None, self.radius_m
+        for bucket in (current, current - 1):
+            groups_by_key = self._buckets.get(bucket)
+            if not groups_by_key:
+                continue
+            for cell in cells:
+                for group in groups_by_key.get((cell, kind), ()):
+                    if at - group.last_report_at > self.window:
+                        continue
+                    distance = distance_m(lat, lng, group.lat, group.lng)
+                    if distance <= best_distance:
+                        best, best_distance = group, distance
+        return best
+
+    def remember(self, kind: str, group: _Group) -> None:
+        """Index ``group`` under its current centroid cell and last-report bucket."""
+        key = (geohash_encode(group.lat, group.lng, self.precision), kind)
+        groups = self._buckets.setdefault(self._bucket(group.last_report_at), {}).setdefault(key, [])
+        if group not in groups:
+            groups.append(group)
+
+    def forget(self, group_id: uuid.UUID) -> None:
+        for groups_by_key in self._buckets.values():
+            for groups in groups_by_key.values():
+                groups[:] = [g for g in groups if g.id != group_id]
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+incident_grid = IncidentGrid(
+    radius_m=settings.INCIDENT_GROUP_RADIUS_M,
+    window=timedelta(minutes=settings.INCIDENT_GROUP_WINDOW_MINUTES),
+)
+
+
+async def _join(db: AsyncSession, group: _Group, lat: float, lng: float, at: datetime) -> bool:
+    # Right-hand sides see the pre-update row, so this is the running mean
+    result = await db.execute(
+        update(IncidentGroup)
+        .where(IncidentGroup.id == group.id)
+        .values(
+            report_count=IncidentGroup.report_count + 1,
+            lat=IncidentGroup.lat + (lat - IncidentGroup.lat) / (IncidentGroup.report_count + 1),
+            lng=IncidentGroup.lng + (lng - IncidentGroup.lng) / (IncidentGroup.report_count + 1),
+            last_report_at=at,
+        )
+        .returning(IncidentGroup.lat, IncidentGroup.lng, IncidentGroup.report_count)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return False
+    group.lat, group.lng, group.report_count, group.last_report_at = row.lat, row.lng, row.report_count, at
+    return True
+
+
+async def _find_stored(db: AsyncSession, kind: str, lat: float, lng: float, at: datetime) -> Optional[_Group]:
+    radius_m = incident_grid.radius_m
+    rows = (await db.execute(
+        select(IncidentGroup.id, IncidentGroup.lat, IncidentGroup.lng, IncidentGroup.report_count,
+               IncidentGroup.last_report_at)
+        .where(
+            IncidentGroup.type == kind,
+            IncidentGroup.last_report_at >= at - incident_grid.window,
+            bbox_filter(IncidentGroup.lat, IncidentGroup.lng, circle_bbox(lat, lng, radius_m)),
+        )
+    )).all()
+    nearest = min(rows, key=lambda row: distance_m(lat, lng, row.lat, row.lng), default=None)
+    if nearest is None or distance_m(lat, lng, nearest.lat, nearest.lng) > radius_m:
+        return None
+    return _Group(nearest.id, nearest.lat, nearest.lng, nearest.report_count, nearest.last_report_at)
+
+
+async def assign_group(db: AsyncSession, incident_type: str, lat: float, lng: float) -> uuid.UUID:
+    """
+    Attach a new report to its incident group, opening one if needed.
+
+    Runs in the caller's transaction; the caller commits.
+
+    Args:
+        db: Database session
+        incident_type: Type as reported (normalised here)
+        lat, lng: Report location
+
+    Returns:
+        Id of the group the report belongs to
+    """
+    kind = normalize_type(incident_type)
+    now = datetime.utcnow()
+
+    cached = incident_grid.find(kind, lat, lng, now)
+    if cached is not None:
+        if await _join(db, cached, lat, lng, now):
+            incident_grid.remember(kind, cached)
+            return cached.id
+        incident_grid.forget(cached.id)  # deleted since we cached it
+
+    stored = await _find_stored(db, kind, lat, lng, now)
+    if stored is not None and await _join(db, stored, lat, lng, now):
+        incident_grid.remember(kind, stored)
+        return stored.id
+
+    group = _Group(uuid.uuid4(), lat, lng, 1, now)
+    await db.execute(insert(IncidentGroup).values(
+        id=group.id, type=kind, lat=lat, lng=lng, report_count=1, last_report_at=now, created_at=now
+    ))
+    incident_grid.remember(kind, group)
+    return group.id
@@ -1,18 +1,27 @@
+from datetime import datetime, timezone
+from typing import Optional
 from fastapi import APIRouter, Depends, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
+from app.core.config import settings
 from app.db.database import get_db
 # from app.core.security import require_user   <-- removed for now
 from app.db.models import User
 from app.incidents.schemas import (
     IncidentCreate,
     IncidentResponse,
-    IncidentListResponse
+    IncidentListResponse,
+    IncidentChangesResponse,
+    NearbyIncidentListResponse
 )
+from app.utils.serialization import respond
+from app.utils.etag import conditional_get
 from app.incidents.service import (
     create_incident,
     get_user_incidents,
+    get_incident_changes,
+    get_nearby_incidents,
     get_incident_by_id
 )
 
@@ -20,9 +29,9 @@ router = APIRouter(prefix="/api/incidents", tags=["Incidents"])
 
 
 @router.post("", response_model=IncidentResponse, status_code=status.HTTP_201_CREATED)
-def report_incident(
+async def report_incident(
     incident_data: IncidentCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Report a new incident.
@@ -30,27 +39,77 @@ def report_incident(
     Returns the created incident with PENDING status.
     """
     # For testing, we pass None as user since auth is disabled
-    return create_incident(db, incident_data, None)
+    return await create_incident(db, incident_data, None)
 
 
-@router.get("/user", response_model=IncidentListResponse)
-def get_my_incidents(
+@router.get(
+    "/user",
+    response_model=IncidentListResponse,
+    dependencies=[Depends(conditional_get("incidents", auth=False))],
+)
+async def get_my_incidents(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get incidents (testing mode: NOT filtered by user)
     """
-    return get_user_incidents(db, None, page, page_size)
+    return respond(await get_user_incidents(db, None, page, page_size, cursor))
+
+
+@router.get(
+    "/changes",
+    response_model=IncidentChangesResponse,
+    dependencies=[Depends(conditional_get("incidents", auth=False))],
+)
+async def get_incidents_changes(
+    since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+    limit: int = Query(200, ge=1, le=settings.SYNC_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Incidents created or changed since the sync token (testing mode: NOT filtered by user)
+    """
+    return respond(await get_incident_changes(db, None, since, limit))
+
+
+@router.get(
+    "/nearby",
+    response_model=NearbyIncidentListResponse,
+    dependencies=[Depends(conditional_get("incidents", auth=False))],
+)
+async def get_incidents_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_m: float = Query(2000, gt=0, le=settings.NEARBY_MAX_RADIUS_M),
+    since: Optional[datetime] = Query(None, description="Only incidents reported at or after this time"),
+    include_resolved: bool = Query(False),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get incidents within radius_m meters of a point, closest first.
+
+    Each incident carries its distance_m. Resolved incidents are left out
+    unless include_resolved is set.
+    """
+    # Timestamps are stored as naive UTC
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return respond(await get_nearby_incidents(
+        db, lat, lng, radius_m, since, include_resolved, page, page_size
+    ))
 
 
 @router.get("/{incident_id}", response_model=IncidentResponse)
-def get_incident(
+async def get_incident(
     incident_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get incident by ID (testing mode, no auth check)
     """
-    return get_incident_by_id(db, incident_id, None)
+    return await get_incident_by_id(db, incident_id, None)
@@ -29,6 +29,7 @@ class IncidentResponse(BaseModel):
     image_url: Optional[str]
     risk_score: Optional[float]
     risk_level: Optional[str]
+    group_id: Optional[UUID] = None
     created_at: datetime
     
     class Config:
@@ -39,8 +40,58 @@ class IncidentListResponse(BaseModel):
     """Schema for paginated incident list."""
     incidents: list[IncidentResponse]
     total: int
+    total_exact: bool = True  # False when total is a planner estimate or lower bound
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class IncidentChangesResponse(BaseModel):
+    """Incidents created or changed since a sync token."""
+    incidents: list[IncidentResponse]
+    deleted: list[UUID] = []  # ids removed since the token
+    sync_token: str  # send back as since= on the next poll
+    has_more: bool = False  # more changes are waiting; poll again right away
+
+
+class NearbyIncidentResponse(IncidentResponse):
+    """Incident with its distance from the requested point."""
+    distance_m: float
+
+
+class NearbyIncidentListResponse(BaseModel):
+    """Schema for incidents near a point, closest first."""
+    incidents: list[NearbyIncidentResponse]
+    total: int
+    page: int
+    page_size: int
+    radius_m: float
+
+
+class IncidentGroupResponse(BaseModel):
+    """Schema for a group of reports of the same event."""
+    id: UUID
+    type: str
+    lat: float
+    lng: float
+    report_count: int
+    last_report_at: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class IncidentGroupListResponse(BaseModel):
+    """Schema for paginated incident group list."""
+    groups: list[IncidentGroupResponse]
+    total: int
+    total_exact: bool = True
+    page: int
+    page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class IncidentUpdate(BaseModel):
@@ -1,12 +1,30 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
-from app.db.models import Incident, User, IncidentStatus
-from app.incidents.schemas import IncidentCreate, IncidentResponse, IncidentListResponse
+from app.db.models import Incident, User, IncidentStatus, INCIDENT_OPEN
+from app.incidents.schemas import (
+    IncidentCreate,
+    IncidentResponse,
+    IncidentListResponse,
+    IncidentChangesResponse,
+    NearbyIncidentResponse,
+    NearbyIncidentListResponse
+)
+from app.core.config import settings
+from app.core.events import INCIDENT_CREATED, publish
+from app.incidents.grouping import assign_group
+from app.utils.counting import count_total
+from app.utils.geo import bbox_filter, circle_bbox, covering_cells, geohash_filter, haversine_m
+from app.utils.pagination import paginate
+from app.utils.serialization import to_models
+from app.utils.sync import load_changes
 
 
-def create_incident(db: Session, incident_data: IncidentCreate, user: User) -> IncidentResponse:
+async def create_incident(db: AsyncSession, incident_data: IncidentCreate, user: User) -> IncidentResponse:
     """Create a new incident report."""
     
     # Create incident
@@ -26,45 +44,151 @@ def create_incident(db: Session, incident_data: IncidentCreate, user: User) -> I
     #     ml_result = await analyze_image(incident_data.image_url)
     #     new_incident.risk_score = ml_result.get('risk_score')
     #     new_incident.risk_level = ml_result.get('risk_level')
+
+    if settings.INCIDENT_GROUPING:
+        new_incident.group_id = await assign_group(db, incident_data.type, incident_data.lat, incident_data.lng)
     
     db.add(new_incident)
-    db.commit()
-    db.refresh(new_incident)
-    
-    return IncidentResponse.from_orm(new_incident)
+    await db.commit()
+    await db.refresh(new_incident)
+
+    response = IncidentResponse.from_orm(new_incident)
+    publish(INCIDENT_CREATED, response)
+    return response
 
 
-def get_user_incidents(db: Session, user: User, page: int = 1, page_size: int = 20) -> IncidentListResponse:
+async def get_user_incidents(
+    db: AsyncSession,
+    user: User,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None
+) -> IncidentListResponse:
     """Get all incidents reported by the current user."""
     
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
     # Query incidents
     # If no user provided (testing / admin mode) return ALL incidents
     if user is None:
-        query = db.query(Incident)
+        query = select(Incident)
     else:
-        query = db.query(Incident).filter(Incident.user_id == user.id)
+        query = select(Incident).where(Incident.user_id == user.id)
 
-    total = query.count()
-    incidents = query.order_by(Incident.created_at.desc()).offset(offset).limit(page_size).all()
+    total = await count_total(db, query)
+    result = await paginate(db, query, Incident, page, page_size, cursor)
     
     return IncidentListResponse(
-        incidents=[IncidentResponse.from_orm(inc) for inc in incidents],
-        total=total,
+        incidents=to_models(IncidentResponse, result.items),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
+    )
+
+
+async def get_incident_changes(
+    db: AsyncSession,
+    user: Optional[User],
+    since: Optional[str] = None,
+    limit: int = 200
+) -> IncidentChangesResponse:
+    """Incidents created or changed since a sync token (all incidents when user is None)."""
+    query = select(Incident)
+    if user is not None:
+        query = query.where(Incident.user_id == user.id)
+
+    changes = await load_changes(db, query, Incident, "incidents", since, limit)
+
+    return IncidentChangesResponse(
+        incidents=to_models(IncidentResponse, changes.items),
+        deleted=changes.deleted,
+        sync_token=changes.sync_token,
+        has_more=changes.has_more
     )
 
 
-def get_incident_by_id(db: Session, incident_id: UUID, user: User) -> IncidentResponse:
+async def get_nearby_incidents(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    radius_m: float,
+    since: Optional[datetime] = None,
+    include_resolved: bool = False,
+    page: int = 1,
+    page_size: int = 20
+) -> NearbyIncidentListResponse:
+    """
+    Get incidents within ``radius_m`` of a point, closest first.
+
+    The geohash index narrows the search to the cells around the point and
+    the circle's bounding box. Only id/lat/lng of those candidates are
+    loaded; exact distances are computed in one vectorised pass and full
+    rows are fetched for the requested page only.
+
+    Args:
+        db: Database session
+        lat, lng: Point to search around
+        radius_m: Search radius in meters
+        since: Only incidents created at or after this time
+        include_resolved: Also return RESOLVED incidents
+        page, page_size: Offset paging over the distance-sorted results
+
+    Returns:
+        Incidents with their distance in meters
+    """
+    query = select(Incident.id, Incident.lat, Incident.lng).where(
+        bbox_filter(Incident.lat, Incident.lng, circle_bbox(lat, lng, radius_m))
+    )
+    cells = covering_cells(lat, lng, radius_m)
+    if cells is not None:
+        query = query.where(geohash_filter(Incident.geohash, cells))
+    if since is not None:
+        query = query.where(Incident.created_at >= since)
+    if not include_resolved:
+        query = query.where(INCIDENT_OPEN)
+
+    candidates = (await db.execute(query)).all()
+    ids = [row.id for row in candidates]
+    distances = haversine_m(lat, lng, [row.lat for row in candidates], [row.lng for row in candidates])
+
+    inside = (distances <= radius_m).nonzero()[0]
+    ranked = inside[distances[inside].argsort(kind="stable")]
+    start = (page - 1) * page_size
+    page_rows = ranked[start:start + page_size]
+
+    rows = {}
+    if len(page_rows):
+        page_ids = [ids[i] for i in page_rows]
+        rows = {row.id: row for row in await db.scalars(select(Incident).where(Incident.id.in_(page_ids)))}
+
+    items = []
+    for i in page_rows:
+        row = rows.get(ids[i])
+        if row is None:
+            continue  # deleted between the two queries
+        data = {name: getattr(row, name) for name in IncidentResponse.model_fields}
+        data["distance_m"] = float(distances[i])
+        items.append(data)
+
+    return NearbyIncidentListResponse(
+        incidents=to_models(NearbyIncidentResponse, items),
+        total=len(ranked),
+        page=page,
+        page_size=page_size,
+        radius_m=radius_m
+    )
+
+
+async def get_incident_by_id(db: AsyncSession, incident_id: UUID, user: User) -> IncidentResponse:
     """Get a specific incident by ID."""
     
-    incident = db.query(Incident).filter(
-        Incident.id == incident_id,
-        Incident.user_id == user.id
-    ).first()
+    query = select(Incident).where(Incident.id == incident_id)
+    # Same testing-mode rule as get_user_incidents: no user means no owner filter
+    if user is not None:
+        query = query.where(Incident.user_id == user.id)
+
+    incident = await db.scalar(query)
     
     if not incident:
         raise HTTPException(
@@ -1,8 +1,22 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import select
 
 from app.core.config import settings
+from app.core.logger import configure_logging, shutdown_logging
+from app.core.azure_logging import init_azure_logging, shutdown_azure_logging
+from app.core.hashing import password_hasher
+from app.admin.audit_archive import audit_archiver, ensure_audit_partitions
+from app.admin.audit_writer import audit_writer
+from app.admin.dashboard import dashboard_snapshot
+from app.db.database import AsyncSessionLocal, create_schema_async, registry
+from app.db.models import User, UserRole, UserAbility
+from app.utils.counters import counter_reconciler
+from app.utils.etag import ETagMiddleware, ensure_collection_versions
 from app.auth.routes import router as auth_router
 from app.incidents.routes import router as incidents_router
 from app.sos.routes import router as sos_router
@@ -11,42 +25,15 @@ from app.admin.routes import router as admin_router
 from app.messages.routes import router as messages_router
 
 
-# Create FastAPI application
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    description="""
-    SenseSafe Emergency Application Backend
-    
-    A comprehensive emergency response system with:
-    - 🔐 JWT Authentication
-    - 👥 Role-based Access Control (USER, ADMIN)
-    - 🚨 Incident Reporting
-    - 🆘 SOS Emergency Alerts
-    - 🔔 Disaster Alerts
-    - 🖥️ Admin Dashboard Support
-    - 🤖 ML Integration Ready (Azure Computer Vision)
-    
-    Built for Microsoft Imagine Cup with FastAPI, PostgreSQL, and Azure services.
-    """,
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
-
-# Startup event to create default admin
-from app.db.database import SessionLocal
-from app.db.models import User, UserRole, UserAbility
-from app.core.security import hash_password
-
-@app.on_event("startup")
+# Startup: create default admin
 async def create_default_admin():
-    db = SessionLocal()
+    db = AsyncSessionLocal()
     try:
         # Check if admin user exists
-        admin = db.query(User).filter(User.role == UserRole.ADMIN).first()
+        admin = await db.scalar(select(User).where(User.role == UserRole.ADMIN).limit(1))
         if not admin:
             print("Creating default admin user...")
-            hashed_pw = hash_password("admin123")
+            hashed_pw = await password_hasher.hash("admin123")
             new_admin = User(
                 name="System Admin",
                 email="admin@sensesafe.com",
@@ -55,15 +42,78 @@ async def create_default_admin():
                 ability=UserAbility.NONE
             )
             db.add(new_admin)
-            db.commit()
+            await db.commit()
             print("Default admin created: admin@sensesafe.com / admin123")
         else:
             print(f"Admin user exists: {admin.email}")
     except Exception as e:
         print(f"Error checking/creating admin: {e}")
     finally:
-        db.close()
+        await db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup / shutdown hooks.
+
+    Everything with side effects (log files, telemetry, schema bootstrap,
+    DB connections) happens here rather than at import time, so a worker
+    imports fast and only pays for what it actually uses.
+    """
+    configure_logging()
+    init_azure_logging()
+    if settings.DB_AUTO_CREATE_SCHEMA:
+        await create_schema_async()
+    await ensure_collection_versions()
+    await ensure_audit_partitions()
+    await password_hasher.start()
+    if settings.PASSWORD_HASH_TARGET_MS > 0:
+        await password_hasher.calibrate(
+            settings.PASSWORD_HASH_TARGET_MS, settings.PASSWORD_HASH_MIN_ROUNDS, settings.PASSWORD_HASH_MAX_ROUNDS
+        )
+    await create_default_admin()
+    await counter_reconciler.start()
+    if settings.AUDIT_WRITE_BEHIND:
+        await audit_writer.start()
+    await audit_archiver.start()
+
+    yield
+
+    # Drain queued audit entries while the pool is still open
+    await audit_writer.stop()
+    await audit_archiver.stop()
+    await dashboard_snapshot.stop()
+    await password_hasher.stop()
+    await counter_reconciler.stop()
+    await run_in_threadpool(shutdown_azure_logging)
+    await registry.dispose_async()
+    shutdown_logging()
+
 
+# Create FastAPI application
+app = FastAPI(
+    title=settings.APP_NAME,
+    version=settings.APP_VERSION,
+    description="""
+    SenseSafe Emergency Application Backend
+    
+    A comprehensive emergency response system with:
+    - 🔐 JWT Authentication
+    - 👥 Role-based Access Control (USER, ADMIN)
+    - 🚨 Incident Reporting
+    - 🆘 SOS Emergency Alerts
+    - 🔔 Disaster Alerts
+    - 🖥️ Admin Dashboard Support
+    - 🤖 ML Integration Ready (Azure Computer Vision)
+    
+    Built for Microsoft Imagine Cup with FastAPI, PostgreSQL, and Azure services.
+    """,
+    docs_url="/docs",
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
 # Configure CORS
 app.add_middleware(
@@ -72,7 +122,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.add_middleware(ETagMiddleware)
 
 
 # Include routers
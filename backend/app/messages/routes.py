@@ -1,7 +1,10 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
+from app.core.config import settings
 from app.db.database import get_db
 from app.core.security import require_user, require_admin
 from app.db.models import User, Message
@@ -9,6 +12,7 @@ from app.messages.schemas import (
     MessageCreate,
     MessageResponse,
     MessageListResponse,
+    MessageChangesResponse,
     MessageCreateResponse,
     SOSMessageCreate,
     IncidentMessageCreate
@@ -19,60 +23,82 @@ from app.messages.service import (
     create_incident_message,
     get_user_messages,
     get_all_messages,
+    get_message_changes,
     mark_message_read,
-    get_message_stats
+    get_message_stats,
+    to_message_response
 )
+from app.utils.serialization import respond
+from app.utils.counters import load_counts
+from app.utils.etag import conditional_get
+from app.utils.sync import record_deletion
 
 router = APIRouter(prefix="/api/messages", tags=["Messages"])
 
 
 @router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-def send_message(
+async def send_message(
     message_data: MessageCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user)
 ):
-    return create_message(db, message_data, current_user)
+    return await create_message(db, message_data, current_user)
 
 
 @router.post("/sos", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-def send_sos_alert(
+async def send_sos_alert(
     sos_data: SOSMessageCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user)
 ):
-    return create_sos_message(db, sos_data, current_user)
+    return await create_sos_message(db, sos_data, current_user)
 
 
 @router.post("/incident", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-def report_incident_message(
+async def report_incident_message(
     incident_data: IncidentMessageCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user)
 ):
-    return create_incident_message(db, incident_data, current_user)
+    return await create_incident_message(db, incident_data, current_user)
 
 
-@router.get("", response_model=MessageListResponse)
-def get_my_messages(
+@router.get("", response_model=MessageListResponse, dependencies=[Depends(conditional_get("messages"))])
+async def get_my_messages(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user)
 ):
-    return get_user_messages(db, current_user, page, page_size)
+    return respond(await get_user_messages(db, current_user, page, page_size, cursor))
+
+
+@router.get("/changes", response_model=MessageChangesResponse, dependencies=[Depends(conditional_get("messages"))])
+async def get_my_message_changes(
+    since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+    limit: int = Query(200, ge=1, le=settings.SYNC_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_user)
+):
+    """
+    Own messages created or changed since the sync token, plus ids of deleted ones.
+    """
+    return respond(await get_message_changes(db, current_user, since, limit))
 
 
 @router.get("/{message_id}", response_model=MessageResponse)
-def get_message(
+async def get_message(
     message_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user)
 ):
-    message = db.query(Message).filter(
-        Message.id == message_id,
-        Message.user_id == current_user.id
-    ).first()
+    message = await db.scalar(
+        select(Message).where(
+            Message.id == message_id,
+            Message.user_id == current_user.id
+        )
+    )
 
     if not message:
         raise HTTPException(
@@ -80,70 +106,92 @@ def get_message(
             detail="Message not found"
         )
 
-    return MessageResponse.from_orm(message)
+    return to_message_response(message, current_user.name)
 
 
 @router.post("/{message_id}/read", response_model=MessageResponse)
-def mark_as_read(
+async def mark_as_read(
     message_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user)
 ):
-    return mark_message_read(db, message_id, current_user, is_admin=False)
+    return await mark_message_read(db, message_id, current_user, is_admin=False)
 
 
 # ---------------- ADMIN -----------------
 
 
-@router.get("/admin/all", response_model=MessageListResponse)
-def get_all_messages_admin(
+@router.get(
+    "/admin/all",
+    response_model=MessageListResponse,
+    dependencies=[Depends(conditional_get("messages"))],
+)
+async def get_all_messages_admin(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     message_type: str = Query(None),
     is_read: str = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
-    return get_all_messages(db, page, page_size, message_type, is_read)
+    return respond(await get_all_messages(db, page, page_size, message_type, is_read, cursor))
+
+
+@router.get(
+    "/admin/changes",
+    response_model=MessageChangesResponse,
+    dependencies=[Depends(conditional_get("messages"))],
+)
+async def get_message_changes_admin(
+    since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+    limit: int = Query(200, ge=1, le=settings.SYNC_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    All messages created or changed since the sync token, plus ids of deleted ones.
+    """
+    return respond(await get_message_changes(db, None, since, limit))
 
 
-@router.get("/admin/stats")
-def get_message_stats_admin(
-    db: Session = Depends(get_db),
+@router.get("/admin/stats", dependencies=[Depends(conditional_get("messages"))])
+async def get_message_stats_admin(
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
-    return get_message_stats(db)
+    return await get_message_stats(db)
 
 
 @router.post("/admin/{message_id}/read", response_model=MessageResponse)
-def admin_mark_read(
+async def admin_mark_read(
     message_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
-    return mark_message_read(db, message_id, admin_user, is_admin=True)
+    return await mark_message_read(db, message_id, admin_user, is_admin=True)
 
 
-@router.get("/admin/unread/count")
-def get_unread_count_admin(
-    db: Session = Depends(get_db),
+@router.get("/admin/unread/count", dependencies=[Depends(conditional_get("messages"))])
+async def get_unread_count_admin(
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
-    count = db.query(Message).filter(Message.is_read == 0).count()
-    return {"unread_count": count}
+    counts = await load_counts(db, Message)
+    return {"unread_count": sum(n for (_, is_read), n in counts.items() if is_read == "0")}
 
 
 @router.delete("/admin/{message_id}")
-def admin_delete_message(
+async def admin_delete_message(
     message_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(require_admin)
 ):
     """
     Completely delete SOS/Incident/General message
     """
 
-    message = db.query(Message).filter(Message.id == message_id).first()
+    message = await db.get(Message, message_id)
 
     if not message:
         raise HTTPException(
@@ -151,7 +199,8 @@ def admin_delete_message(
             detail="Message not found"
         )
 
-    db.delete(message)
-    db.commit()
+    await db.delete(message)
+    await record_deletion(db, "messages", message.id, message.user_id)
+    await db.commit()
 
     return {"message": "Deleted successfully"}
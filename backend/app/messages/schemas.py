@@ -67,8 +67,19 @@ class MessageListResponse(BaseModel):
     """Schema for paginated message list."""
     messages: list[MessageResponse]
     total: int
+    total_exact: bool = True
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class MessageChangesResponse(BaseModel):
+    """Messages created or changed since a sync token."""
+    messages: list[MessageResponse]
+    deleted: list[UUID] = []  # ids removed since the token
+    sync_token: str  # send back as since= on the next poll
+    has_more: bool = False  # more changes are waiting; poll again right away
 
 
 class MessageCreateResponse(BaseModel):
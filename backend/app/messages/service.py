@@ -1,18 +1,42 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, joinedload
 from fastapi import HTTPException, status
+from typing import Optional
 from uuid import UUID
 
-from app.db.models import User, Message, MessageType, IncidentStatus, SOSStatus
+from app.core.events import MESSAGE_CREATED, publish
+from app.db.models import User, Message, MessageType, IncidentStatus, SOSStatus, MESSAGE_UNREAD
 from app.messages.schemas import (
     MessageCreate, 
     MessageResponse, 
     MessageListResponse,
+    MessageChangesResponse,
     SOSMessageCreate,
     IncidentMessageCreate
 )
+from app.utils.counters import load_counts
+from app.utils.counting import count_total
+from app.utils.pagination import paginate
+from app.utils.serialization import to_models
+from app.utils.sync import load_changes
 
 
-def create_message(db: Session, message_data: MessageCreate, user: User) -> MessageResponse:
+_MESSAGE_FIELDS = [name for name in MessageResponse.model_fields if name != "user_name"]
+
+
+def _message_data(message: Message, user_name: Optional[str]) -> dict:
+    data = {name: getattr(message, name) for name in _MESSAGE_FIELDS}
+    data["user_name"] = user_name
+    return data
+
+
+def to_message_response(message: Message, user_name: Optional[str]) -> MessageResponse:
+    """Build the response for one message row."""
+    return MessageResponse.model_validate(_message_data(message, user_name))
+
+
+async def create_message(db: AsyncSession, message_data: MessageCreate, user: User) -> MessageResponse:
     """Create a new message (SOS or Incident report)."""
     
     # Determine message type and create appropriate title
@@ -39,28 +63,15 @@ def create_message(db: Session, message_data: MessageCreate, user: User) -> Mess
     )
     
     db.add(new_message)
-    db.commit()
-    db.refresh(new_message)
-    
-    return MessageResponse(
-        id=new_message.id,
-        user_id=new_message.user_id,
-        user_name=user.name,
-        message_type=new_message.message_type,
-        title=new_message.title,
-        content=new_message.content,
-        lat=new_message.lat,
-        lng=new_message.lng,
-        category=new_message.category,
-        severity=new_message.severity,
-        ability=new_message.ability,
-        battery=new_message.battery,
-        is_read=bool(new_message.is_read),
-        created_at=new_message.created_at
-    )
+    await db.commit()
+    await db.refresh(new_message)
 
+    response = to_message_response(new_message, user.name)
+    publish(MESSAGE_CREATED, response)
+    return response
 
-def create_sos_message(db: Session, sos_data: SOSMessageCreate, user: User) -> MessageResponse:
+
+async def create_sos_message(db: AsyncSession, sos_data: SOSMessageCreate, user: User) -> MessageResponse:
     """Create an SOS alert message and also save to SOS table."""
     
     # Create message
@@ -77,28 +88,15 @@ def create_sos_message(db: Session, sos_data: SOSMessageCreate, user: User) -> M
     )
     
     db.add(message)
-    db.commit()
-    db.refresh(message)
-    
-    return MessageResponse(
-        id=message.id,
-        user_id=message.user_id,
-        user_name=user.name,
-        message_type=message.message_type,
-        title=message.title,
-        content=message.content,
-        lat=message.lat,
-        lng=message.lng,
-        category=None,
-        severity=None,
-        ability=message.ability,
-        battery=message.battery,
-        is_read=bool(message.is_read),
-        created_at=message.created_at
-    )
+    await db.commit()
+    await db.refresh(message)
+
+    response = to_message_response(message, user.name)
+    publish(MESSAGE_CREATED, response)
+    return response
 
 
-def create_incident_message(db: Session, incident_data: IncidentMessageCreate, user: User) -> MessageResponse:
+async def create_incident_message(db: AsyncSession, incident_data: IncidentMessageCreate, user: User) -> MessageResponse:
     """Create an incident report message and also save to Incident table."""
     
     # Create message
@@ -115,79 +113,54 @@ def create_incident_message(db: Session, incident_data: IncidentMessageCreate, u
     )
     
     db.add(message)
-    db.commit()
-    db.refresh(message)
-    
-    return MessageResponse(
-        id=message.id,
-        user_id=message.user_id,
-        user_name=user.name,
-        message_type=message.message_type,
-        title=message.title,
-        content=message.content,
-        lat=message.lat,
-        lng=message.lng,
-        category=message.category,
-        severity=message.severity,
-        ability=None,
-        battery=None,
-        is_read=bool(message.is_read),
-        created_at=message.created_at
-    )
+    await db.commit()
+    await db.refresh(message)
+
+    response = to_message_response(message, user.name)
+    publish(MESSAGE_CREATED, response)
+    return response
 
 
-def get_user_messages(db: Session, user: User, page: int = 1, page_size: int = 20) -> MessageListResponse:
+async def get_user_messages(
+    db: AsyncSession,
+    user: User,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None
+) -> MessageListResponse:
     """Get all messages sent by the current user."""
     
-    offset = (page - 1) * page_size
-    
-    query = db.query(Message).filter(Message.user_id == user.id)
-    total = query.count()
-    messages = query.order_by(Message.created_at.desc()).offset(offset).limit(page_size).all()
+    query = select(Message).where(Message.user_id == user.id)
+    total = await count_total(db, query)
+    result = await paginate(db, query, Message, page, page_size, cursor)
     
     return MessageListResponse(
-        messages=[
-            MessageResponse(
-                id=msg.id,
-                user_id=msg.user_id,
-                user_name=user.name,
-                message_type=msg.message_type,
-                title=msg.title,
-                content=msg.content,
-                lat=msg.lat,
-                lng=msg.lng,
-                category=msg.category,
-                severity=msg.severity,
-                ability=msg.ability,
-                battery=msg.battery,
-                is_read=bool(msg.is_read),
-                created_at=msg.created_at
-            )
-            for msg in messages
-        ],
-        total=total,
+        messages=to_models(MessageResponse, [_message_data(msg, user.name) for msg in result.items]),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
     )
 
 
-def get_all_messages(
-    db: Session, 
+async def get_all_messages(
+    db: AsyncSession, 
     page: int = 1, 
     page_size: int = 20,
     message_type: str = None,
-    is_read: str = None
+    is_read: str = None,
+    cursor: Optional[str] = None
 ) -> MessageListResponse:
     """Get all messages (admin only)."""
     
-    offset = (page - 1) * page_size
-    
-    query = db.query(Message).join(User)
+    query = select(Message).join(Message.user).options(contains_eager(Message.user))
     
     # Apply filters
     if message_type:
         try:
-            query = query.filter(Message.message_type == MessageType[message_type])
+            query = query.where(Message.message_type == MessageType[message_type])
         except KeyError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -195,42 +168,59 @@ def get_all_messages(
             )
     
     if is_read is not None:
-        read_value = 1 if is_read.lower() == "true" else 0
-        query = query.filter(Message.is_read == read_value)
+        if is_read.lower() == "true":
+            query = query.where(Message.is_read == 1)
+        else:
+            query = query.where(MESSAGE_UNREAD)
     
-    total = query.count()
-    messages = query.order_by(Message.created_at.desc()).offset(offset).limit(page_size).all()
+    total = await count_total(db, query)
+    result = await paginate(db, query, Message, page, page_size, cursor)
     
     return MessageListResponse(
-        messages=[
-            MessageResponse(
-                id=msg.id,
-                user_id=msg.user_id,
-                user_name=msg.user.name if msg.user else None,
-                message_type=msg.message_type,
-                title=msg.title,
-                content=msg.content,
-                lat=msg.lat,
-                lng=msg.lng,
-                category=msg.category,
-                severity=msg.severity,
-                ability=msg.ability,
-                battery=msg.battery,
-                is_read=bool(msg.is_read),
-                created_at=msg.created_at
-            )
-            for msg in messages
-        ],
-        total=total,
+        messages=to_models(
+            MessageResponse,
+            [_message_data(msg, msg.user.name if msg.user else None) for msg in result.items]
+        ),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor
     )
 
 
-def mark_message_read(db: Session, message_id: UUID, user: User, is_admin: bool = False) -> MessageResponse:
+async def get_message_changes(
+    db: AsyncSession,
+    user: Optional[User],
+    since: Optional[str] = None,
+    limit: int = 200
+) -> MessageChangesResponse:
+    """Get messages created or changed since a sync token (all messages when user is None)."""
+
+    query = select(Message).options(joinedload(Message.user))
+    if user is not None:
+        query = query.where(Message.user_id == user.id)
+
+    changes = await load_changes(db, query, Message, "messages", since, limit, user.id if user else None)
+
+    return MessageChangesResponse(
+        messages=to_models(
+            MessageResponse,
+            [_message_data(msg, msg.user.name if msg.user else None) for msg in changes.items]
+        ),
+        deleted=changes.deleted,
+        sync_token=changes.sync_token,
+        has_more=changes.has_more
+    )
+
+
+async def mark_message_read(db: AsyncSession, message_id: UUID, user: User, is_admin: bool = False) -> MessageResponse:
     """Mark a message as read."""
     
-    message = db.query(Message).filter(Message.id == message_id).first()
+    message = await db.scalar(
+        select(Message).where(Message.id == message_id).options(joinedload(Message.user))
+    )
     
     if not message:
         raise HTTPException(
@@ -246,44 +236,26 @@ def mark_message_read(db: Session, message_id: UUID, user: User, is_admin: bool
         )
     
     message.is_read = 1
-    db.commit()
-    db.refresh(message)
+    await db.commit()
     
-    return MessageResponse(
-        id=message.id,
-        user_id=message.user_id,
-        user_name=message.user.name if message.user else None,
-        message_type=message.message_type,
-        title=message.title,
-        content=message.content,
-        lat=message.lat,
-        lng=message.lng,
-        category=message.category,
-        severity=message.severity,
-        ability=message.ability,
-        battery=message.battery,
-        is_read=bool(message.is_read),
-        created_at=message.created_at
-    )
+    return to_message_response(message, message.user.name if message.user else None)
 
 
-def get_message_stats(db: Session) -> dict:
-    """Get message statistics for admin dashboard."""
+async def get_message_stats(db: AsyncSession) -> dict:
+    """Get message statistics for admin dashboard, from the stats counters."""
     
-    total = db.query(Message).count()
-    unread = db.query(Message).filter(Message.is_read == 0).count()
-    sos_count = db.query(Message).filter(Message.message_type == MessageType.SOS).count()
-    incident_count = db.query(Message).filter(Message.message_type == MessageType.INCIDENT).count()
-    general_count = db.query(Message).filter(Message.message_type == MessageType.GENERAL).count()
+    counts = await load_counts(db, Message)
+
+    total = sum(counts.values())
+    unread = sum(n for (_, is_read), n in counts.items() if is_read == "0")
+    by_type = {message_type.value: 0 for message_type in MessageType}
+    for (message_type, _), n in counts.items():
+        by_type[message_type] = by_type.get(message_type, 0) + n
     
     return {
         "total": total,
         "unread": unread,
         "read": total - unread,
-        "by_type": {
-            "SOS": sos_count,
-            "INCIDENT": incident_count,
-            "GENERAL": general_count
-        }
+        "by_type": by_type
     }
 
@@ -1,12 +1,15 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.db.database import get_db
 from app.core.security import optional_user   # <-- NEW
 from app.db.models import User
-from app.sos.schemas import SOSCreate, SOSResponse, SOSListResponse
-from app.sos.service import create_sos_alert, get_user_sos_alerts
+from app.sos.schemas import SOSCreate, SOSResponse, SOSListResponse, SOSChangesResponse
+from app.sos.service import create_sos_alert, get_sos_changes, get_user_sos_alerts
+from app.utils.serialization import respond
+from app.utils.etag import conditional_get
 from app.core.security import require_user
 
 router = APIRouter(prefix="/api/sos", tags=["SOS"])
@@ -17,9 +20,9 @@ router = APIRouter(prefix="/api/sos", tags=["SOS"])
     response_model=SOSResponse,
     status_code=status.HTTP_201_CREATED,
 )
-def send_sos(
+async def send_sos(
     sos_data: SOSCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(optional_user),
 ):
     """
@@ -28,20 +31,39 @@ def send_sos(
     If a user is logged in → SOS is linked to their account.
     If not logged in → SOS is stored as anonymous (user_id=None).
     """
-    return create_sos_alert(db, sos_data, current_user)
+    return await create_sos_alert(db, sos_data, current_user)
 
 
 @router.get(
     "/user",
     response_model=SOSListResponse,
+    dependencies=[Depends(conditional_get("sos"))],
 )
-def get_my_sos_alerts(
+async def get_my_sos_alerts(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor/prev_cursor from a previous page"),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user),
 ):
     """
     Get paginated SOS alerts created by the current logged-in user.
     """
-    return get_user_sos_alerts(db, current_user, page, page_size)
+    return respond(await get_user_sos_alerts(db, current_user, page, page_size, cursor))
+
+
+@router.get(
+    "/changes",
+    response_model=SOSChangesResponse,
+    dependencies=[Depends(conditional_get("sos"))],
+)
+async def get_my_sos_changes(
+    since: Optional[str] = Query(None, description="sync_token from the previous response; omit for a full sync"),
+    limit: int = Query(200, ge=1, le=settings.SYNC_MAX_LIMIT),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    """
+    SOS alerts of the current user created or changed since the sync token.
+    """
+    return respond(await get_sos_changes(db, current_user, since, limit))
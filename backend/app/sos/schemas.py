@@ -32,5 +32,16 @@ class SOSListResponse(BaseModel):
     """Schema for paginated SOS list."""
     sos_alerts: list[SOSResponse]
     total: int
+    total_exact: bool = True
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class SOSChangesResponse(BaseModel):
+    """SOS alerts created or changed since a sync token."""
+    sos_alerts: list[SOSResponse]
+    deleted: list[UUID] = []  # ids removed since the token
+    sync_token: str  # send back as since= on the next poll
+    has_more: bool = False  # more changes are waiting; poll again right away
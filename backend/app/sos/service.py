@@ -1,10 +1,18 @@
-from sqlalchemy.orm import Session
+from typing import Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.events import SOS_CREATED, publish
 from app.db.models import SOS, User, Message, MessageType
-from app.sos.schemas import SOSCreate, SOSResponse, SOSListResponse
+from app.sos.schemas import SOSCreate, SOSResponse, SOSListResponse, SOSChangesResponse
+from app.utils.counting import count_total
+from app.utils.pagination import paginate
+from app.utils.serialization import to_models
+from app.utils.sync import load_changes
 
 
-def create_sos_alert(db: Session, sos_data: SOSCreate, user: User) -> SOSResponse:
+async def create_sos_alert(db: AsyncSession, sos_data: SOSCreate, user: User) -> SOSResponse:
     """Create a new SOS emergency alert for the authenticated user or anonymous user."""
 
     new_sos = SOS(
@@ -17,8 +25,8 @@ def create_sos_alert(db: Session, sos_data: SOSCreate, user: User) -> SOSRespons
     )
 
     db.add(new_sos)
-    db.commit()
-    db.refresh(new_sos)
+    await db.commit()
+    await db.refresh(new_sos)
 
     # Create a corresponding Message record for admin dashboard visibility
     try:
@@ -34,41 +42,62 @@ def create_sos_alert(db: Session, sos_data: SOSCreate, user: User) -> SOSRespons
             is_read=0,
         )
         db.add(sos_message)
-        db.commit()
+        await db.commit()
     except Exception as e:
         # Log the error but don't fail the SOS creation
         # The SOS alert is the critical operation
-        db.rollback()
+        await db.rollback()
         # In production, you would want to log this error
         print(f"Warning: Failed to create SOS message record: {e}")
 
-    return SOSResponse.from_orm(new_sos)
+    response = SOSResponse.from_orm(new_sos)
+    publish(SOS_CREATED, response)
+    return response
 
 
-def get_user_sos_alerts(
-    db: Session,
+async def get_user_sos_alerts(
+    db: AsyncSession,
     user: User,
     page: int = 1,
     page_size: int = 20,
+    cursor: Optional[str] = None,
 ) -> SOSListResponse:
     """Return paginated SOS alerts that belong to the user."""
 
-    offset = (page - 1) * page_size
-
-    query = db.query(SOS).filter(SOS.user_id == user.id)
+    query = select(SOS).where(SOS.user_id == user.id)
 
-    total = query.count()
+    total = await count_total(db, query)
 
-    sos_alerts = (
-        query.order_by(SOS.created_at.desc())
-        .offset(offset)
-        .limit(page_size)
-        .all()
-    )
+    result = await paginate(db, query, SOS, page, page_size, cursor)
 
     return SOSListResponse(
-        sos_alerts=[SOSResponse.from_orm(sos) for sos in sos_alerts],
-        total=total,
+        sos_alerts=to_models(SOSResponse, result.items),
+        total=total.value,
+        total_exact=total.exact,
         page=page,
         page_size=page_size,
+        next_cursor=result.next_cursor,
+        prev_cursor=result.prev_cursor,
+    )
+
+
+async def get_sos_changes(
+    db: AsyncSession,
+    user: Optional[User],
+    since: Optional[str] = None,
+    limit: int = 200,
+) -> SOSChangesResponse:
+    """Return SOS alerts created or changed since a sync token (all of them when user is None)."""
+
+    query = select(SOS)
+    if user is not None:
+        query = query.where(SOS.user_id == user.id)
+
+    changes = await load_changes(db, query, SOS, "sos", since, limit)
+
+    return SOSChangesResponse(
+        sos_alerts=to_models(SOSResponse, changes.items),
+        deleted=changes.deleted,
+        sync_token=changes.sync_token,
+        has_more=changes.has_more,
     )
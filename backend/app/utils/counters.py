@@ -0,0 +1,245 @@
+"""
+Row counts for stats endpoints, maintained on write instead of counted on read.
+
+Every row of a counted table falls in exactly one bucket, named after the
+table and the values of its key columns (``messages:SOS:0`` is unread SOS
+messages, ``sos:TRAPPED`` trapped SOS alerts). ``stat_counters`` holds one
+row per bucket. A session records what each flush inserts, deletes or moves
+between buckets, and its ``before_commit`` hook applies the net change with
+``value = value + n`` updates in the same transaction, so a counter changes
+exactly when the rows it counts do. Stats are sums over a handful of
+buckets, independent of table size.
+
+Writes that bypass the ORM unit of work (raw SQL, Core bulk statements,
+rolled-back savepoints) are not seen. ``counter_reconciler`` recounts every
+bucket with one GROUP BY per table every ``STAT_COUNTERS_RECONCILE_SECONDS``
+(and on start-up) and logs any drift it corrects. It locks the counter rows
+before counting, so increments committed meanwhile are neither lost nor
+counted twice.
+"""
+
+import asyncio
+import enum
+import logging
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, event, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Incident, IncidentStatus, Message, MessageType, SOS, SOSStatus, StatCounter
+from app.utils.counting import mark_written
+
+logger = logging.getLogger("sensesafe.counters")
+
+# Counted model -> the columns that pick a row's bucket, and each column's possible values
+COUNTED = {
+    Message: ((Message.message_type, list(MessageType)), (Message.is_read, [0, 1])),
+    SOS: ((SOS.status, list(SOSStatus)),),
+    Incident: ((Incident.status, list(IncidentStatus)),),
+}
+
+_counters = StatCounter.__table__
+
+
+def _part(value) -> str:
+    return value.value if isinstance(value, enum.Enum) else str(value)
+
+
+def counter_name(table: str, key: Iterable) -> str:
+    """Name of the bucket of ``table`` for the key column values ``key``."""
+    return ":".join([table, *(_part(value) for value in key)])
+
+
+def bucket_names(model) -> list:
+    """Every possible bucket of ``model``, one of the models in ``COUNTED``."""
+    keys = [()]
+    for _, values in COUNTED[model]:
+        keys = [key + (value,) for key in keys for value in values]
+    return [counter_name(model.__tablename__, key) for key in keys]
+
+
+# ---- write tracking -------------------------------------------------------
+
+_DELTAS = "stat_counter_deltas"
+
+
+def _key(obj, columns, old: bool) -> Optional[tuple]:
+    """The bucket key of ``obj`` after (``old=False``) or before this flush."""
+    state = inspect(obj)
+    key = []
+    for column, _ in columns:
+        attr = state.attrs[column.key]
+        if not old:
+            value = attr.value
+            if value is None and column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+        else:
+            history = attr.history
+            if not history.has_changes():
+                value = attr.value
+            elif history.deleted:
+                value = history.deleted[0]
+            else:
+                return None  # old value was never loaded; reconciliation will catch up
+        key.append(value)
+    return tuple(key)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_counts(session, flush_context):
+    deltas = None
+    for objects, sign in ((session.new, 1), (session.deleted, -1), (session.dirty, 0)):
+        for obj in objects:
+            columns = COUNTED.get(type(obj))
+            if columns is None:
+                continue
+            if deltas is None:
+                deltas = session.info.setdefault(_DELTAS, Counter())
+            table = obj.__tablename__
+            if sign == 1:
+                deltas[counter_name(table, _key(obj, columns, old=False))] += 1
+            elif sign == -1:
+                old = _key(obj, columns, old=True)
+                if old is not None:
+                    deltas[counter_name(table, old)] -= 1
+            else:
+                old, new = _key(obj, columns, old=True), _key(obj, columns, old=False)
+                if old is not None and old != new:
+                    deltas[counter_name(table, old)] -= 1
+                    deltas[counter_name(table, new)] += 1
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_counts(session):
+    session.flush()  # so writes still pending are counted
+    deltas = session.info.pop(_DELTAS, None)
+    if not deltas:
+        return
+    params = [{"bucket": name, "delta": delta} for name, delta in sorted(deltas.items()) if delta]
+    if params:
+        session.execute(
+            update(_counters)
+            .where(_counters.c.name == bindparam("bucket"))
+            .values(value=_counters.c.value + bindparam("delta")),
+            params,
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_counts(session):
+    session.info.pop(_DELTAS, None)
+
+
+# ---- reading --------------------------------------------------------------
+
+async def load_counts(db: AsyncSession, model) -> Dict[Tuple[str, ...], int]:
+    """
+    Current row counts of ``model`` per bucket.
+
+    Args:
+        db: Database session
+        model: One of the models in ``COUNTED``
+
+    Returns:
+        Count per bucket key, as a tuple of string column values
+        (e.g. ``("SOS", "0")`` for unread SOS messages)
+    """
+    rows = await db.execute(
+        select(StatCounter.name, StatCounter.value).where(StatCounter.name.in_(bucket_names(model)))
+    )
+    return {tuple(name.split(":")[1:]): value for name, value in rows.all()}
+
+
+# ---- reconciliation -------------------------------------------------------
+
+async def reconcile_counters() -> Dict[str, int]:
+    """
+    Recount every bucket and correct the counters that drifted.
+
+    Returns:
+        Correction applied per counter name (actual minus stored)
+    """
+    from app.db.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        # Lock the counters first: writers now wait for this transaction at
+        # their increment, and every write committed before is in the counts.
+        # Rows are locked in name order, as _apply_counts does, so a writer
+        # moving a row between two buckets cannot deadlock with this pass.
+        locked = select(StatCounter.name, StatCounter.value).order_by(StatCounter.name)
+        if db.get_bind().dialect.name == "sqlite":
+            # No FOR UPDATE; a no-op write takes the database write lock instead
+            await db.execute(update(_counters).values(value=_counters.c.value))
+        else:
+            locked = locked.with_for_update()
+        stored = dict((await db.execute(locked)).all())
+
+        actual = {name: 0 for model in COUNTED for name in bucket_names(model)}
+        for model, columns in COUNTED.items():
+            key_columns = [column for column, _ in columns]
+            rows = await db.execute(select(*key_columns, func.count()).group_by(*key_columns))
+            for *key, count in rows.all():
+                actual[counter_name(model.__tablename__, key)] = count
+
+        drift = {name: count - stored.get(name, 0) for name, count in actual.items() if stored.get(name) != count}
+        missing = [{"name": name, "value": actual[name]} for name in sorted(drift) if name not in stored]
+        changed = sorted(name for name in drift if name in stored)
+        if missing:
+            await db.execute(insert(_counters), missing)
+        for name in changed:
+            await db.execute(update(_counters).where(_counters.c.name == name).values(value=actual[name]))
+        if drift:
+            # Stats endpoints cache on these versions; make them re-read
+            mark_written(db.sync_session, {name.split(":", 1)[0] for name in drift})
+        try:
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()  # another worker inserted the missing rows first
+            return {}
+
+    corrected = {name: delta for name, delta in drift.items() if delta}
+    if corrected:
+        logger.warning("Corrected stat counter drift: %s", corrected)
+    return corrected
+
+
+class CounterReconciler:
+    """Background task running ``reconcile_counters`` on start and then periodically."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="stat-counter-reconciler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await reconcile_counters()
+            except Exception:
+                logger.exception("Stat counter reconciliation failed")
+            await asyncio.sleep(self.interval)
+
+
+counter_reconciler = CounterReconciler(settings.STAT_COUNTERS_RECONCILE_SECONDS)
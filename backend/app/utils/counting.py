@@ -0,0 +1,206 @@
+"""
+Totals for paginated list endpoints without a COUNT(*) per request.
+
+``count_total`` answers "how many rows match this query" in three tiers:
+
+1. A per-filter cache. Entries are keyed by the compiled SQL plus its
+   parameters and tagged with a generation number for every table the
+   query reads. Committing a session that inserted, updated or deleted
+   rows of a table bumps that table's generation, which invalidates every
+   cached total over it. ``COUNT_CACHE_TTL`` bounds staleness for writes
+   made by other workers.
+2. A capped count: at most ``COUNT_EXACT_LIMIT + 1`` rows are counted, so
+   small results are exact and large ones never scan the whole table.
+3. Past the cap, the planner's row estimate on PostgreSQL (``reltuples``
+   for an unfiltered table, ``EXPLAIN`` otherwise). Other backends report
+   the cap itself as a lower bound.
+
+Responses carry ``total_exact`` so clients can render "about N" or "N+".
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import Select, Table, event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
+
+from app.core.config import settings
+
+
+class Total(NamedTuple):
+    value: int
+    exact: bool
+
+
+class CountCache:
+    """LRU of totals, invalidated per table by write generations."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Tuple[Total, Dict[str, int], float]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def generations(self, tables) -> Dict[str, int]:
+        with self._lock:
+            return {name: self._generations.get(name, 0) for name in tables}
+
+    def get(self, key: tuple) -> Optional[Total]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                total, generations, stored_at = entry
+                fresh = time.monotonic() - stored_at < self.ttl
+                current = all(self._generations.get(name, 0) == gen for name, gen in generations.items())
+                if fresh and current:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return total
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, total: Total, generations: Dict[str, int]) -> None:
+        """Store ``total``, computed while the tables were at ``generations``."""
+        with self._lock:
+            self._entries[key] = (total, generations, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tables) -> None:
+        with self._lock:
+            for name in tables:
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+count_cache = CountCache(settings.COUNT_CACHE_MAX_ENTRIES, settings.COUNT_CACHE_TTL)
+
+
+# ---- write tracking -------------------------------------------------------
+# Listening on the base Session class covers sync sessions and the sync half
+# of every AsyncSession.
+
+_DIRTY_TABLES = "count_cache_dirty_tables"
+
+
+def _mark(session: Session, tables) -> None:
+    session.info.setdefault(_DIRTY_TABLES, set()).update(tables)
+
+
+def mark_written(session: Session, tables) -> None:
+    """Treat ``tables`` as written by ``session``, e.g. after a raw SQL write."""
+    _mark(session, tables)
+
+
+def dirty_tables(session: Session) -> set:
+    """Tables ``session`` has written to since its last commit or rollback."""
+    return set(session.info.get(_DIRTY_TABLES, ()))
+
+
+@event.listens_for(Session, "before_flush")
+def _track_flush(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            _mark(session, [table.name])
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table
+        _mark(orm_execute_state.session, [table.name])
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    tables = session.info.pop(_DIRTY_TABLES, None)
+    if tables:
+        count_cache.invalidate(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_on_rollback(session):
+    session.info.pop(_DIRTY_TABLES, None)
+
+
+# ---- counting -------------------------------------------------------------
+
+def _cache_key(query: Select) -> tuple:
+    compiled = query.compile()
+    params = json.dumps(compiled.params, sort_keys=True, default=str)
+    return (str(compiled), params)
+
+
+def _tables(query: Select) -> list:
+    return sorted({t.name for t in find_tables(query, check_columns=True) if isinstance(t, Table)})
+
+
+async def _planner_estimate(db: AsyncSession, query: Select, tables: list) -> Optional[int]:
+    """PostgreSQL's row estimate for ``query``; None on other backends."""
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+
+    if query.whereclause is None and len(tables) == 1:
+        estimate = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": tables[0]},
+        )
+        # -1 means the table was never analyzed
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+
+    compiled = query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    plan = await db.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(db: AsyncSession, query: Select) -> Total:
+    """
+    Number of rows ``query`` returns, exact when cheap and estimated otherwise.
+
+    Args:
+        db: Database session
+        query: The (unordered, unpaginated) select the page is cut from
+
+    Returns:
+        Total: The row count and whether it is exact
+    """
+    key = _cache_key(query)
+    cached = count_cache.get(key)
+    if cached is not None:
+        return cached
+
+    tables = _tables(query)
+    # Snapshot before counting so a write that commits meanwhile invalidates the entry
+    generations = count_cache.generations(tables)
+
+    cap = settings.COUNT_EXACT_LIMIT
+    capped = await db.scalar(select(func.count()).select_from(query.limit(cap + 1).subquery()))
+    if capped <= cap:
+        total = Total(capped, True)
+    else:
+        estimate = await _planner_estimate(db, query, tables)
+        total = Total(max(estimate or 0, cap), False)
+
+    count_cache.put(key, total, generations)
+    return total
@@ -0,0 +1,234 @@
+"""
+Conditional GET for list and stats endpoints: weak ETags and 304s.
+
+Every table in ``VERSIONED_TABLES`` has a row in ``collection_versions``
+whose counter is bumped by the same transaction that writes the table (a
+``before_commit`` hook reads the tables the count cache already tracks as
+written). A response's ETag is a keyed hash of the route, its query
+parameters, the versions of the collections it reads and, for authenticated
+routes, the bearer token. When ``If-None-Match`` still matches, the
+``conditional_get`` dependency answers 304 before the route's other
+dependencies run: no database session is opened and nothing is serialised.
+
+Each worker caches the version table for ``ETAG_VERSION_TTL`` seconds and
+drops its copy when it commits a versioned write itself, so a client can
+see a stale 304 for at most that long after a write made by another worker.
+Routes whose result also depends on the clock (expiry, "last N days") pass
+``window`` so their ETag changes at least that often.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from jose import JWTError, jwt
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.db.models import CollectionVersion
+from app.utils.counting import dirty_tables
+
+VERSIONED_TABLES = frozenset({
+    "incidents", "incident_groups", "sos", "alerts", "messages", "users", "audit_logs",
+})
+
+_KEY = hashlib.blake2b(settings.JWT_SECRET.encode(), digest_size=32).digest()
+
+
+# ---- versions ---------------------------------------------------------------
+
+class VersionCache:
+    """This worker's copy of ``collection_versions``, re-read when stale."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._versions: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._expirations = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    def expire(self) -> None:
+        self._loaded_at = None
+        self._expirations += 1
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl
+
+    async def get(self, names) -> Dict[str, int]:
+        if self._stale():
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._stale():
+                    await self._load()
+        return {name: self._versions.get(name, 0) for name in names}
+
+    async def _load(self) -> None:
+        from app.db.database import AsyncSessionLocal
+
+        expirations, loaded_at = self._expirations, time.monotonic()
+        async with AsyncSessionLocal() as db:
+            rows = await db.execute(select(CollectionVersion.name, CollectionVersion.version))
+            self._versions = dict(rows.all())
+        if expirations == self._expirations:  # else a local commit landed meanwhile; stay stale
+            self._loaded_at = loaded_at
+
+
+collection_versions = VersionCache(settings.ETAG_VERSION_TTL)
+
+_BUMPED = "collection_versions_bumped"
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    session.flush()  # so writes still pending are counted
+    tables = sorted(dirty_tables(session) & VERSIONED_TABLES)
+    if tables:
+        session.execute(
+            update(CollectionVersion)
+            .where(CollectionVersion.name.in_(tables))
+            .values(version=CollectionVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        session.info[_BUMPED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _expire_versions(session):
+    if session.info.pop(_BUMPED, False):
+        collection_versions.expire()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_bump(session):
+    session.info.pop(_BUMPED, None)
+
+
+async def ensure_collection_versions() -> None:
+    """Insert the missing ``collection_versions`` rows. Run at startup."""
+    from app.db.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        existing = set(await db.scalars(select(CollectionVersion.name)))
+        missing = sorted(VERSIONED_TABLES - existing)
+        if not missing:
+            return
+        try:
+            await db.execute(insert(CollectionVersion), [{"name": name, "version": 0} for name in missing])
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()  # another worker inserted them first
+
+
+# ---- ETags ----------------------------------------------------------------
+
+def _bearer_token(request: Request) -> Optional[str]:
+    """The request's bearer token if it is a valid, unexpired JWT."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        return None
+    return token
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an If-None-Match header value."""
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def conditional_get(
+    *collections: str,
+    auth: bool = True,
+    window: Optional[float] = None,
+    cache_control: Optional[str] = None,
+):
+    """
+    Route dependency adding a weak ETag and answering 304 when it matches.
+
+    Use in the route's ``dependencies=[...]`` so it runs before ``get_db``
+    and the auth dependencies.
+
+    Args:
+        collections: Tables the response is built from
+        auth: The route needs a bearer token; the token is part of the ETag,
+            the users version is included and no 304 is sent without a valid
+            token (the route then answers 401 as usual)
+        window: Seconds after which the ETag changes even without writes,
+            for results that depend on the current time
+        cache_control: Cache-Control for 200 and 304 responses; defaults to
+            ``private, no-cache`` with auth and ``no-cache`` without
+
+    Returns:
+        The dependency callable
+    """
+    names = sorted(set(collections) | ({"users"} if auth else set()))
+    unknown = set(names) - VERSIONED_TABLES
+    if unknown:
+        raise ValueError(f"not versioned: {sorted(unknown)}")
+    if cache_control is None:
+        cache_control = "private, no-cache" if auth else "no-cache"
+
+    async def dependency(request: Request) -> None:
+        token = None
+        if auth:
+            token = _bearer_token(request)
+            if token is None:
+                return
+
+        versions = await collection_versions.get(names)
+        digest = hashlib.blake2b(key=_KEY, digest_size=16)
+        digest.update(request.url.path.encode())
+        for key, value in sorted(request.query_params.multi_items()):
+            digest.update(b"\0%s=%s" % (key.encode(), value.encode()))
+        for name in names:
+            digest.update(b"\0%s:%d" % (name.encode(), versions[name]))
+        if window:
+            digest.update(b"\0t%d" % (time.time() // window))
+        if token:
+            digest.update(b"\0" + token.encode())
+        etag = f'W/"{digest.hexdigest()}"'
+
+        request.state.etag = etag
+        request.state.cache_control = cache_control
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=304)
+
+    return dependency
+
+
+class ETagMiddleware:
+    """Adds the ETag and Cache-Control chosen by ``conditional_get`` to 200 and 304 responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_etag(message):
+            if message["type"] == "http.response.start" and message["status"] in (200, 304):
+                state = scope.get("state") or {}
+                etag = state.get("etag")
+                if etag is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers.setdefault("etag", etag)
+                    headers.setdefault("cache-control", state["cache_control"])
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
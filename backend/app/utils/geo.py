@@ -0,0 +1,299 @@
+"""
+Geographic helpers: bounding boxes, geohashes and grid cells that work in
+plain SQL.
+
+Everything here runs on both PostgreSQL and SQLite without PostGIS.
+Coordinates are WGS84 degrees; grid cells are counted from (-90, -180) so
+cell numbers are never negative.
+
+Incidents, SOS alerts and messages store a ``GEOHASH_PRECISION``-character
+geohash next to lat/lng. Every shorter prefix of it is a larger cell, so
+"everything in cell X" is one B-tree range scan at any resolution, and a
+circle is covered by a cell and its eight neighbours (``covering_cells``).
+"""
+
+import math
+from typing import List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import ColumnElement, Integer, and_, literal, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.utils.exceptions import bad_request
+
+
+class BBox(NamedTuple):
+    west: float
+    south: float
+    east: float
+    north: float
+
+    @property
+    def crosses_antimeridian(self) -> bool:
+        return self.west > self.east
+
+
+def parse_bbox(value: Optional[str]) -> Optional[BBox]:
+    """
+    Parse a ``west,south,east,north`` query parameter.
+
+    ``west`` may be greater than ``east`` for a viewport that crosses the
+    antimeridian.
+
+    Args:
+        value: Raw query string value, or None
+
+    Returns:
+        BBox, or None when no bbox was given
+    """
+    if value is None:
+        return None
+    try:
+        west, south, east, north = (float(part) for part in value.split(","))
+    except ValueError:
+        raise bad_request("bbox must be 'west,south,east,north' in degrees")
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        raise bad_request("bbox is out of range")
+    return BBox(west, south, east, north)
+
+
+def bbox_filter(lat: ColumnElement, lng: ColumnElement, bbox: BBox) -> ColumnElement:
+    """WHERE clause selecting points of ``lat``/``lng`` columns inside ``bbox``."""
+    if bbox.crosses_antimeridian:
+        lng_clause = or_(lng >= bbox.west, lng <= bbox.east)
+    else:
+        lng_clause = lng.between(bbox.west, bbox.east)
+    return and_(lat.between(bbox.south, bbox.north), lng_clause)
+
+
+# ---- geohash ---------------------------------------------------------------
+
+GEOHASH_PRECISION = 9  # stored length; a 9-character cell is about 4.8 m x 4.8 m
+EARTH_RADIUS_M = 6_371_008.8  # mean radius
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS_M / 180
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_BASE32_INDEX = {char: i for i, char in enumerate(_BASE32)}
+
+
+def geohash_encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Geohash of a point, ``precision`` characters long."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    chars = []
+    value = bits = 0
+    even = True  # bits alternate longitude, latitude, starting with longitude
+    while len(chars) < precision:
+        if even:
+            mid = (lng_lo + lng_hi) / 2
+            if lng >= mid:
+                value, lng_lo = value * 2 + 1, mid
+            else:
+                value, lng_hi = value * 2, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value, lat_lo = value * 2 + 1, mid
+            else:
+                value, lat_hi = value * 2, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            value = bits = 0
+    return "".join(chars)
+
+
+def geohash_bounds(geohash: str) -> BBox:
+    """The cell a geohash stands for."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lng_lo, lng_hi = -180.0, 180.0
+    even = True
+    for char in geohash:
+        value = _BASE32_INDEX[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lng_lo + lng_hi) / 2
+                lng_lo, lng_hi = (mid, lng_hi) if bit else (lng_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return BBox(lng_lo, lat_lo, lng_hi, lat_hi)
+
+
+def geohash_neighbors(geohash: str) -> List[str]:
+    """The (up to) eight cells of the same size around ``geohash``."""
+    west, south, east, north = geohash_bounds(geohash)
+    width, height = east - west, north - south
+    lat, lng = (south + north) / 2, (west + east) / 2
+    neighbors = []
+    for d_lat in (-1, 0, 1):
+        for d_lng in (-1, 0, 1):
+            n_lat = lat + d_lat * height
+            if (d_lat, d_lng) == (0, 0) or not -90 < n_lat < 90:
+                continue
+            n_lng = (lng + d_lng * width + 180) % 360 - 180
+            neighbors.append(geohash_encode(n_lat, n_lng, len(geohash)))
+    return neighbors
+
+
+def geohash_cell_meters(precision: int, lat: float) -> float:
+    """Smaller side, in meters, of a ``precision``-character cell at latitude ``lat``."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    height = 180.0 / 2 ** lat_bits * METERS_PER_DEGREE
+    width = 360.0 / 2 ** lng_bits * METERS_PER_DEGREE * math.cos(math.radians(lat))
+    return min(width, height)
+
+
+def covering_cells(lat: float, lng: float, radius_m: float) -> Optional[List[str]]:
+    """
+    Geohash prefixes whose cells together contain the circle around a point.
+
+    Picks the longest prefix whose cell is at least ``radius_m`` on each
+    side, measured at the circle's edge nearest the pole, and returns that
+    cell and its neighbours.
+
+    Returns:
+        Sorted prefixes, or None when the circle is too large for any cell
+        (the caller should not filter by cell at all)
+    """
+    edge_lat = min(89.9, abs(lat) + radius_m / METERS_PER_DEGREE)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        if geohash_cell_meters(precision, edge_lat) >= radius_m:
+            center = geohash_encode(lat, lng, precision)
+            return sorted({center, *geohash_neighbors(center)})
+    return None
+
+
+def geohash_filter(column: ColumnElement, prefixes: Sequence[str]) -> ColumnElement:
+    """
+    WHERE clause matching rows whose stored geohash starts with any prefix.
+
+    Each prefix becomes a range on the column, which the geohash index
+    answers without a scan. ``LIKE 'prefix%'`` would not be indexable on
+    PostgreSQL without a special operator class.
+    """
+    return or_(*(
+        column.between(prefix, prefix + "z" * (GEOHASH_PRECISION - len(prefix)))
+        for prefix in prefixes
+    ))
+
+
+# ---- distances ---------------------------------------------------------------
+
+def circle_bbox(lat: float, lng: float, radius_m: float) -> BBox:
+    """Smallest lat/lng box around a circle (west > east if it crosses the antimeridian)."""
+    d_lat = radius_m / METERS_PER_DEGREE
+    south, north = max(-90.0, lat - d_lat), min(90.0, lat + d_lat)
+    cos_lat = math.cos(math.radians(max(abs(south), abs(north))))
+    d_lng = radius_m / (METERS_PER_DEGREE * cos_lat) if cos_lat > 1e-9 else 360.0
+    if d_lng >= 180:
+        return BBox(-180.0, south, 180.0, north)
+    west = (lng - d_lng + 180) % 360 - 180
+    east = (lng + d_lng + 180) % 360 - 180
+    return BBox(west, south, east, north)
+
+
+def distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in meters between two points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    h = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(h, 1.0)))
+
+
+def point_in_polygon(lat: float, lng: float, polygon: Sequence[Sequence[float]]) -> bool:
+    """
+    Whether a point lies inside a polygon of ``(lat, lng)`` vertices (ray casting).
+
+    The polygon is treated as flat in degrees and must not cross the
+    antimeridian. Points exactly on an edge may fall either way.
+    """
+    inside = False
+    prev_lat, prev_lng = polygon[-1]
+    for vert_lat, vert_lng in polygon:
+        if (vert_lat > lat) != (prev_lat > lat):
+            cross_lng = vert_lng + (lat - vert_lat) * (prev_lng - vert_lng) / (prev_lat - vert_lat)
+            if lng < cross_lng:
+                inside = not inside
+        prev_lat, prev_lng = vert_lat, vert_lng
+    return inside
+
+
+def haversine_m(lat: float, lng: float, lats, lngs):
+    """
+    Great-circle distances in meters from one point to many, vectorised.
+
+    Args:
+        lat, lng: Origin in degrees
+        lats, lngs: Sequences (or NumPy arrays) of degrees
+
+    Returns:
+        NumPy array of distances
+    """
+    import numpy as np  # deferred: keeps numpy out of app start-up
+
+    lat1 = math.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    d_lat = lat2 - lat1
+    d_lng = np.radians(np.asarray(lngs, dtype=np.float64) - lng)
+    h = np.sin(d_lat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(d_lng / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+# ---- zoom grid ---------------------------------------------------------------
+
+def cell_size_for_zoom(zoom: int, cells_per_tile: int) -> float:
+    """
+    Grid cell size in degrees for a web-map zoom level.
+
+    A 256px tile spans ``360 / 2**zoom`` degrees of longitude. Splitting it
+    into ``cells_per_tile`` cells per side gives clusters of roughly
+    ``256 / cells_per_tile`` pixels on screen.
+    """
+    return 360.0 / (2 ** zoom) / cells_per_tile
+
+
+class grid_index(FunctionElement):
+    """
+    ``floor((value + offset) / size)`` as an integer, for ``value + offset >= 0``.
+
+    Compiles to ``floor()`` where available; on SQLite, which only has it
+    when built with the math extension, it compiles to an integer cast. The
+    cast truncates, which is the same thing for non-negative values.
+    """
+
+    type = Integer()
+    name = "grid_index"
+    inherit_cache = True
+
+
+@compiles(grid_index)
+def _grid_index_default(element, compiler, **kw):
+    value, offset, size = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"CAST(floor(({value} + {offset}) / {size}) AS INTEGER)"
+
+
+@compiles(grid_index, "sqlite")
+def _grid_index_sqlite(element, compiler, **kw):
+    value, offset, size = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"CAST(({value} + {offset}) / {size} AS INTEGER)"
+
+
+def _inline(value: float):
+    # Rendered into the SQL text so the same expression in SELECT and GROUP BY
+    # compares equal on PostgreSQL (separate bind parameters would not)
+    return literal(value, literal_execute=True)
+
+
+def lat_cell(lat: ColumnElement, size: float) -> grid_index:
+    """Grid row of a latitude column for cells of ``size`` degrees."""
+    return grid_index(lat, _inline(90.0), _inline(size))
+
+
+def lng_cell(lng: ColumnElement, size: float) -> grid_index:
+    """Grid column of a longitude column for cells of ``size`` degrees."""
+    return grid_index(lng, _inline(180.0), _inline(size))
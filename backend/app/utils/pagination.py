@@ -0,0 +1,134 @@
+"""
+Keyset (cursor) pagination shared by every list endpoint.
+
+Lists are ordered newest first by ``(created_at, id)``. A cursor is an
+opaque token holding the sort key of the row it was cut at plus a
+direction, so fetching any page is an index range scan instead of an
+OFFSET that reads and discards every earlier row.
+
+``page``/``page_size`` offset paging is still accepted for existing
+clients; those responses carry cursors too so clients can switch over.
+"""
+
+import base64
+import binascii
+import heapq
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.utils.exceptions import bad_request
+
+NEXT = "n"
+PREV = "p"
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: UUID
+    direction: str
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+
+
+def encode_cursor(created_at: datetime, row_id: UUID, direction: str = NEXT) -> str:
+    """Build an opaque cursor token for the row ``(created_at, row_id)``."""
+    raw = json.dumps(
+        {"t": created_at.isoformat(), "i": row_id.hex, "d": direction},
+        separators=(",", ":"),
+    ).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Parse a cursor token; raises 400 if it was not issued by us."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        cursor = Cursor(
+            created_at=datetime.fromisoformat(data["t"]),
+            id=UUID(hex=data["i"]),
+            direction=data["d"],
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise bad_request("Invalid cursor")
+    if cursor.direction not in (NEXT, PREV):
+        raise bad_request("Invalid cursor")
+    return cursor
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    page: int = 1,
+    page_size: int = 20,
+    cursor: Optional[str] = None,
+    merge_with: Optional[Callable[[Optional[Cursor], str, int], Awaitable[List[Any]]]] = None,
+) -> Page:
+    """
+    Fetch one page of ``query`` (a select of ``model``) newest first.
+
+    With ``cursor`` the page is located by keyset; otherwise ``page`` is
+    used as a classic offset. One extra row is fetched to know whether
+    another page exists in the direction of travel.
+
+    ``merge_with`` adds rows stored outside the table (archived audit
+    entries). It is called with the cursor position (None without a
+    cursor), the direction and a row count, and returns at most that many
+    rows past the position in the same order as the page query; they are
+    merged into the page by ``(created_at, id)``.
+    """
+    sort_key = tuple_(model.created_at, model.id)
+    newest_first = (model.created_at.desc(), model.id.desc())
+
+    if cursor is None:
+        stmt = query.order_by(*newest_first)
+        position, direction, has_before = None, NEXT, page > 1
+        offset = (page - 1) * page_size
+    else:
+        position = decode_cursor(cursor)
+        key = (position.created_at, position.id)
+        if position.direction == NEXT:
+            stmt = query.where(sort_key < key).order_by(*newest_first)
+        else:
+            stmt = query.where(sort_key > key).order_by(model.created_at.asc(), model.id.asc())
+        direction, has_before = position.direction, True
+        offset = 0
+
+    extra = await merge_with(position, direction, offset + page_size + 1) if merge_with else None
+    if not extra:
+        rows = list((await db.scalars(stmt.offset(offset).limit(page_size + 1))).all())
+    else:
+        # The offset applies to the merged order, so both sides start at the top
+        rows = list((await db.scalars(stmt.limit(offset + page_size + 1))).all())
+        merged = heapq.merge(rows, extra, key=lambda row: (row.created_at, row.id), reverse=direction == NEXT)
+        rows = list(merged)[offset:offset + page_size + 1]
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if direction == PREV:
+        # Walked backwards in ascending order; flip back to newest first.
+        # The page we came from is always "next"; "more" means more before.
+        rows.reverse()
+        has_after, has_before = True, has_more
+    else:
+        has_after = has_more
+
+    if not rows:
+        return Page(items=[], next_cursor=None, prev_cursor=None)
+
+    first, last = rows[0], rows[-1]
+    return Page(
+        items=rows,
+        next_cursor=encode_cursor(last.created_at, last.id, NEXT) if has_after else None,
+        prev_cursor=encode_cursor(first.created_at, first.id, PREV) if has_before else None,
+    )
@@ -0,0 +1,62 @@
+"""
+Response serialization helpers shared by the list endpoints.
+
+``to_models`` converts a page of ORM rows (or dicts, for schemas with
+computed fields) with one ``TypeAdapter`` call instead of one ``from_orm``
+per row. ``respond`` returns the body as pre-rendered JSON so FastAPI does
+not validate the response model a second time. Set ``VALIDATE_RESPONSES``
+to true to turn that validation back on, e.g. in development to catch
+schema drift.
+
+``model_construct`` was measured as an alternative for trusted rows; on
+pydantic 2.5 it is slower than one bulk validation pass, so it is not used.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Type, TypeVar, Union
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+
+M = TypeVar("M", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
+def to_models(model: Type[M], rows: Iterable[Any]) -> List[M]:
+    """
+    Validate a page of rows into response models in a single pass.
+
+    Args:
+        model: Response schema with ``from_attributes`` enabled
+        rows: ORM instances (e.g. ``Page.items``) or dicts of field values
+
+    Returns:
+        List of ``model`` instances
+    """
+    return _list_adapter(model).validate_python(list(rows), from_attributes=True)
+
+
+def respond(body: BaseModel) -> Union[BaseModel, ORJSONResponse]:
+    """
+    Return a response body, skipping FastAPI's response-model validation.
+
+    The route's ``response_model`` still documents the schema in OpenAPI.
+    Use only on routes with the default 200 status code, since a returned
+    response object bypasses the route's ``status_code``.
+
+    Args:
+        body: The fully built response model
+
+    Returns:
+        Pre-rendered JSON response, or ``body`` itself when
+        ``VALIDATE_RESPONSES`` is enabled
+    """
+    if settings.VALIDATE_RESPONSES:
+        return body
+    return ORJSONResponse(body.model_dump())
@@ -0,0 +1,148 @@
+"""
+Delta sync: the rows that changed since a client's last poll.
+
+Incidents, SOS alerts, alerts and messages carry an ``updated_at`` that is
+set on insert and on every update. A client starts without a token and
+gets every row (paged by ``limit``); each response carries a ``sync_token``
+to send back as ``since`` on the next poll, which then returns only rows
+whose ``updated_at`` is later, plus the ids of rows deleted since then
+(``tombstones``).
+
+``updated_at`` is stamped when the row is flushed, not when its transaction
+commits, so a row can become visible with a timestamp slightly in the past.
+The token handed out at the end of a feed therefore points
+``SYNC_LAG_SECONDS`` before the time of the read: rows changed within that
+window are sent again on the next poll, and clients apply changes as
+upserts by id. Mid-feed tokens (``has_more``) are exact keyset positions.
+
+Tombstones are kept for ``SYNC_TOMBSTONE_DAYS``; an older token gets 410
+and the client starts over without one.
+"""
+
+import base64
+import binascii
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, List, NamedTuple, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import Tombstone
+from app.utils.exceptions import bad_request
+
+
+class SyncToken(NamedTuple):
+    updated_at: datetime
+    id: Optional[UUID]  # None: everything after updated_at
+
+
+class Changes(NamedTuple):
+    items: List[Any]
+    deleted: List[UUID]
+    sync_token: str
+    has_more: bool
+
+
+def encode_sync_token(updated_at: datetime, row_id: Optional[UUID] = None) -> str:
+    """Build an opaque sync token for the position ``(updated_at, row_id)``."""
+    data = {"u": updated_at.isoformat()}
+    if row_id is not None:
+        data["i"] = row_id.hex
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_sync_token(token: str) -> SyncToken:
+    """Parse a sync token; 400 if it was not issued by us, 410 if tombstones have expired."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        position = SyncToken(
+            updated_at=datetime.fromisoformat(data["u"]),
+            id=UUID(hex=data["i"]) if "i" in data else None,
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise bad_request("Invalid sync token")
+    if position.updated_at < datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired; sync again without since",
+        )
+    return position
+
+
+async def load_changes(
+    db: AsyncSession,
+    query: Select,
+    model,
+    collection: str,
+    since: Optional[str],
+    limit: int,
+    owner_id: Optional[UUID] = None,
+) -> Changes:
+    """
+    Rows of ``query`` (a select of ``model``) changed after ``since``, oldest change first.
+
+    Args:
+        db: Database session
+        query: The rows the client may see
+        model: Mapped class with ``updated_at`` and ``id``
+        collection: Table name the tombstones are recorded under
+        since: Token from the previous response, or None for a full sync
+        limit: Most rows to return; ``has_more`` tells the client to poll again at once
+        owner_id: Only report tombstones of this user's rows
+
+    Returns:
+        Changes: Rows, deleted ids and the token for the next poll
+    """
+    read_at = datetime.utcnow()
+    position = decode_sync_token(since) if since else None
+
+    stmt = query
+    if position is not None:
+        if position.id is None:
+            stmt = stmt.where(model.updated_at > position.updated_at)
+        else:
+            stmt = stmt.where(tuple_(model.updated_at, model.id) > (position.updated_at, position.id))
+    rows = list((await db.scalars(stmt.order_by(model.updated_at, model.id).limit(limit + 1))).all())
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    deleted = []
+    if position is not None:
+        tombstones = select(Tombstone.row_id).where(
+            Tombstone.collection == collection,
+            Tombstone.deleted_at > position.updated_at,
+        )
+        if owner_id is not None:
+            tombstones = tombstones.where(Tombstone.owner_id == owner_id)
+        deleted = list((await db.scalars(tombstones)).all())
+
+    if has_more:
+        token = encode_sync_token(rows[-1].updated_at, rows[-1].id)
+    else:
+        token = encode_sync_token(read_at - timedelta(seconds=settings.SYNC_LAG_SECONDS))
+    return Changes(items=rows, deleted=deleted, sync_token=token, has_more=has_more)
+
+
+_PRUNE_INTERVAL = 3600.0
+_last_prune: Optional[float] = None
+
+
+async def record_deletion(db: AsyncSession, collection: str, row_id: UUID, owner_id: Optional[UUID] = None) -> None:
+    """
+    Add a tombstone for ``row_id`` to the session; it commits with the deletion.
+
+    Also drops expired tombstones, at most once an hour per worker.
+    """
+    global _last_prune
+    db.add(Tombstone(collection=collection, row_id=row_id, owner_id=owner_id))
+    if _last_prune is None or time.monotonic() - _last_prune >= _PRUNE_INTERVAL:
+        _last_prune = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+        await db.execute(delete(Tombstone).where(Tombstone.deleted_at < cutoff))
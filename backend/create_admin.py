@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 """Script to create admin user"""
 
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, create_schema
 from app.db.models import User, UserRole, UserAbility
 from app.core.security import hash_password
 
 def create_admin():
+    create_schema()
     db = SessionLocal()
     try:
         # Check if admin exists
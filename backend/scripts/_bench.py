@@ -0,0 +1,139 @@
+"""
+Shared helpers for the benchmark scripts in this folder.
+
+Each benchmark starts the app under uvicorn in a subprocess and drives it
+with plain keep-alive HTTP connections, so results include the real
+event loop / threadpool behaviour and need nothing beyond the stdlib.
+"""
+
+import contextlib
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples`` (pct in 0-100)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(label: str, latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """Print and return requests/sec and latency percentiles (ms)."""
+    stats = {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+    print(
+        f"{label:<24} {stats['rps']:>9.1f} req/s   "
+        f"p50 {stats['p50_ms']:>8.2f} ms   p99 {stats['p99_ms']:>8.2f} ms   "
+        f"errors {errors}"
+    )
+    return stats
+
+
+def _wait_for_port(port: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError):
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start within {timeout}s")
+
+
+@contextlib.contextmanager
+def serve(app_path: str, port: int, env: Optional[Dict[str, str]] = None, timeout: float = 30.0):
+    """Run ``app_path`` (module:attr) under uvicorn for the duration of the block."""
+    proc_env = dict(os.environ)
+    proc_env.update(env or {})
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", app_path,
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env=proc_env,
+    )
+    try:
+        _wait_for_port(port, timeout)
+        yield proc
+    finally:
+        proc.terminate()
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            proc.wait(timeout=10)
+        if proc.poll() is None:
+            proc.kill()
+
+
+def http_load(
+    port: int,
+    method: str,
+    path: str,
+    body: Optional[dict] = None,
+    concurrency: int = 32,
+    total: int = 1000,
+    headers: Optional[Dict[str, str]] = None,
+) -> Tuple[List[float], int, float]:
+    """
+    Fire ``total`` requests from ``concurrency`` keep-alive connections.
+
+    Returns (latencies in seconds, error count, wall-clock seconds).
+    """
+    payload = json.dumps(body).encode() if body is not None else None
+    request_headers = {"Content-Type": "application/json", **(headers or {})}
+    latencies: List[float] = []
+    errors = 0
+    remaining = [total]
+    lock = threading.Lock()
+
+    def worker() -> None:
+        nonlocal errors
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        local: List[float] = []
+        local_errors = 0
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            started = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers=request_headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                continue
+            local.append(time.perf_counter() - started)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
@@ -0,0 +1,188 @@
+"""
+Rebuild the audit rollups, or check them against the raw audit log.
+
+    # Recompute audit_rollup_hourly and audit_rollup_daily from audit_logs
+    python scripts/audit_rollups.py rebuild
+
+    # Compare every rollup bucket with a GROUP BY over audit_logs, and the
+    # statistics of several windows with the same statistics computed from
+    # audit_logs alone; exits 1 on any difference
+    python scripts/audit_rollups.py check
+
+    # Same, on a scratch database seeded through the audit writer's insert path
+    DATABASE_URL=sqlite:///./rollups.db python scripts/audit_rollups.py check --seed 100000
+
+    # Archive the months past AUDIT_RETENTION_DAYS first; archived entries
+    # are part of "the raw audit log" for both commands
+    AUDIT_RETENTION_DAYS=90 python scripts/audit_rollups.py check --archive
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+
+from app.admin.audit_archive import archive_audit_logs, iter_archived_rows
+from app.admin.rollups import GRAINS, add_to_rollups, bucket_expression, floor_bucket, rebuild_rollups, rollup_stats
+from app.db.database import AsyncSessionLocal, create_schema, registry
+from app.db.models import AuditAction, AuditLog, User, UserAbility, UserRole
+
+BATCH = 1_000
+
+
+async def seed(rows: int, admins: int) -> None:
+    """Insert ``rows`` audit entries over the last 400 days, as the audit writer does."""
+    async with AsyncSessionLocal() as db:
+        admin_users = [
+            User(
+                name=f"Rollup Admin {i}",
+                email=f"rollup-admin-{uuid.uuid4().hex[:8]}@example.com",
+                password_hash="!",
+                role=UserRole.ADMIN,
+                ability=UserAbility.NONE,
+            )
+            for i in range(admins)
+        ]
+        db.add_all(admin_users)
+        await db.commit()
+        people = [(user.id, user.email) for user in admin_users]
+
+    print(f"Seeding {rows} audit entries...")
+    now = datetime.utcnow()
+    for start in range(0, rows, BATCH):
+        batch = []
+        for _ in range(min(BATCH, rows - start)):
+            admin_id, email = random.choice(people)
+            batch.append({
+                "id": uuid.uuid4(),
+                "admin_id": admin_id,
+                "admin_email": email,
+                "action": random.choice(list(AuditAction)),
+                "resource_type": "ROLLUP_CHECK",
+                "success": 1 if random.random() < 0.9 else 0,
+                "created_at": now - timedelta(seconds=random.uniform(0, 400 * 86400)),
+            })
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(AuditLog), batch)
+            await add_to_rollups(db, batch)
+            await db.commit()
+    await registry.dispose_async()
+
+
+async def archive() -> None:
+    print(f"Archived {await archive_audit_logs()} audit entries")
+    await registry.dispose_async()
+
+
+async def raw_stats(db, start: datetime, end: datetime) -> dict:
+    """What rollup_stats should return, from one GROUP BY over audit_logs plus the archive."""
+    rows = (await db.execute(
+        select(AuditLog.action, AuditLog.admin_id, AuditLog.admin_email, AuditLog.success, func.count())
+        .where(AuditLog.created_at.between(start, end))
+        .group_by(AuditLog.action, AuditLog.admin_id, AuditLog.admin_email, AuditLog.success)
+    )).all()
+    async for row in iter_archived_rows(db, start, end):
+        rows.append((row["action"], row["admin_id"], row["admin_email"], row["success"], 1))
+    by_action, by_admin = defaultdict(int), defaultdict(int)
+    successful = failed = 0
+    for action, _, email, success, n in rows:
+        by_action[action.value] += n
+        by_admin[email] += n
+        if success:
+            successful += n
+        else:
+            failed += n
+    return {
+        "total": successful + failed,
+        "successful": successful,
+        "failed": failed,
+        "by_action": dict(by_action),
+        "by_admin": dict(by_admin),
+    }
+
+
+async def check() -> int:
+    problems = 0
+    async with AsyncSessionLocal() as db:
+        dialect = db.get_bind().dialect.name
+
+        for model, grain in GRAINS:
+            bucket = bucket_expression(AuditLog.created_at, grain, dialect)
+            keys = (bucket, AuditLog.action, AuditLog.admin_id, AuditLog.success)
+            raw = defaultdict(int, {tuple(row[:-1]): row[-1] for row in (await db.execute(
+                select(*keys, func.count()).group_by(*keys)
+            )).all()})
+            async for row in iter_archived_rows(db):
+                raw[(floor_bucket(row["created_at"], grain), row["action"], row["admin_id"], row["success"])] += 1
+            rolled = {tuple(row[:-1]): row[-1] for row in (await db.execute(
+                select(model.bucket, model.action, model.admin_id, model.success, model.count)
+            )).all()}
+            wrong = sorted(key for key in raw.keys() | rolled.keys() if raw.get(key, 0) != rolled.get(key, 0))
+            status = "ok" if not wrong else f"{len(wrong)} buckets differ"
+            print(f"{model.__tablename__:<22} {len(rolled):>8} buckets  {status}")
+            for key in wrong[:10]:
+                print(f"    {key}: raw={raw.get(key, 0)} rollup={rolled.get(key, 0)}")
+            problems += len(wrong)
+
+        now = datetime.utcnow()
+        windows = [(now - timedelta(days=days), now) for days in (1, 7, 30, 365)]
+        for _ in range(20):
+            start = now - timedelta(seconds=random.uniform(0, 400 * 86400))
+            windows.append((start, start + timedelta(seconds=random.uniform(0, 60 * 86400))))
+        for start, end in windows:
+            expected, actual = await raw_stats(db, start, end), await rollup_stats(db, start, end)
+            status = "ok" if expected == actual else "DIFFERS"
+            print(f"{start:%Y-%m-%d %H:%M} .. {end:%Y-%m-%d %H:%M}  total={actual['total']:>8}  {status}")
+            if expected != actual:
+                print(f"    raw:    {expected}\n    rollup: {actual}")
+                problems += 1
+
+    await registry.dispose_async()
+    return problems
+
+
+async def rebuild() -> None:
+    async with AsyncSessionLocal() as db:
+        await rebuild_rollups(db)
+        await db.commit()
+        for model, _ in GRAINS:
+            print(f"{model.__tablename__}: {await db.scalar(select(func.count()).select_from(model))} buckets")
+    await registry.dispose_async()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or check the audit log rollups")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--seed", type=int, default=0, help="insert this many audit entries first (scratch databases only)")
+    parser.add_argument("--admins", type=int, default=5, help="admins the seeded entries are spread over")
+    parser.add_argument("--archive", action="store_true", help="archive the months past AUDIT_RETENTION_DAYS first")
+    args = parser.parse_args()
+
+    create_schema()
+    if args.seed:
+        asyncio.run(seed(args.seed, args.admins))
+    if args.archive:
+        asyncio.run(archive())
+
+    if args.command == "rebuild":
+        asyncio.run(rebuild())
+        return
+
+    problems = asyncio.run(check())
+    if problems:
+        print(f"\n❌ {problems} differences between the rollups and the audit log")
+        sys.exit(1)
+    print("\n✅ Rollups match the audit log")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark SOS latency during a login storm, with bcrypt on the threadpool vs the hashing pool.
+
+For each mode the app runs under uvicorn; one set of connections hammers
+POST /api/auth/login while another sends POST /api/sos, and both are
+reported. "threadpool" is PASSWORD_HASH_WORKERS=0 (bcrypt on the request
+threadpool, as before); "process pool" uses the configured pool.
+
+Usage:
+    python scripts/bench_auth.py --logins 400 --login-concurrency 32 --sos 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import create_schema
+from scripts._bench import http_load, serve, summarize
+
+SOS_BODY = {"ability": "BLIND", "lat": 40.71, "lng": -74.0, "battery": 42, "status": "TRAPPED"}
+PASSWORD = "bench-password"
+
+
+def run(label: str, port: int, env: dict, args) -> None:
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    with serve("app.main:app", port, env=env):
+        import http.client
+
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        conn.request(
+            "POST", "/api/auth/register",
+            body=json.dumps({"name": "Bench", "email": email, "password": PASSWORD}),
+            headers={"Content-Type": "application/json"},
+        )
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        if response.status != 201:
+            raise RuntimeError(f"register failed: {response.status}")
+
+        http_load(port, "POST", "/api/sos", SOS_BODY, concurrency=4, total=50)
+        alone = http_load(port, "POST", "/api/sos", SOS_BODY, concurrency=args.sos_concurrency, total=args.sos)
+
+        logins = {}
+        storm = threading.Thread(target=lambda: logins.update(result=http_load(
+            port, "POST", "/api/auth/login", {"email": email, "password": PASSWORD},
+            concurrency=args.login_concurrency, total=args.logins,
+        )))
+        storm.start()
+        during = http_load(port, "POST", "/api/sos", SOS_BODY, concurrency=args.sos_concurrency, total=args.sos)
+        storm.join()
+
+    print(f"\n{label}")
+    summarize("  sos alone", *alone)
+    summarize("  sos during logins", *during)
+    summarize("  login", *logins["result"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--login-concurrency", type=int, default=32)
+    parser.add_argument("--sos", type=int, default=2000)
+    parser.add_argument("--sos-concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=None, help="hashing pool size (default: PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    create_schema()
+
+    pool_env = {"DEBUG": "false"}
+    if args.workers is not None:
+        pool_env["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    print(
+        f"POST /api/sos x{args.sos} (concurrency {args.sos_concurrency}) "
+        f"while POST /api/auth/login x{args.logins} (concurrency {args.login_concurrency})"
+    )
+    run("threadpool", args.port, {"DEBUG": "false", "PASSWORD_HASH_WORKERS": "0"}, args)
+    run("process pool", args.port, pool_env, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+bcrypt throughput per cost on this machine, to choose PASSWORD_HASH_TARGET_MS deliberately.
+
+For every cost from --min-rounds to --max-rounds, reports the time of one
+hash (a verify costs the same), hashes/sec on one core and hashes/sec with
+one process per core, and marks the cost the startup calibration would
+pick for --target-ms. Login throughput per instance is roughly the
+all-cores figure times the share of CPU given to PASSWORD_HASH_WORKERS.
+
+Usage:
+    python scripts/bench_bcrypt.py --min-rounds 10 --max-rounds 14 --target-ms 250
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.hashing import bcrypt_hash
+
+
+def hash_for(rounds: int, seconds: float) -> int:
+    """Hash at ``rounds`` for about ``seconds`` (at least twice); returns how many were done."""
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while done < 2 or time.perf_counter() < deadline:
+        bcrypt_hash("benchmark-password", rounds)
+        done += 1
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-rounds", type=int, default=settings.PASSWORD_HASH_MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=settings.PASSWORD_HASH_MAX_ROUNDS)
+    parser.add_argument("--target-ms", type=float, default=settings.PASSWORD_HASH_TARGET_MS)
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent per cost and mode")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print(f"bcrypt on {args.cores} cores, target {args.target_ms:.0f} ms per hash\n")
+    print(f"{'cost':>4}  {'ms/hash':>9}  {'hashes/s/core':>13}  {'hashes/s (all cores)':>20}")
+
+    chosen = None
+    with ProcessPoolExecutor(max_workers=args.cores, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(hash_for, [args.min_rounds] * args.cores, [0.0] * args.cores))  # start the workers
+        for rounds in range(args.min_rounds, args.max_rounds + 1):
+            started = time.perf_counter()
+            single = hash_for(rounds, args.seconds)
+            ms = (time.perf_counter() - started) / single * 1000
+
+            started = time.perf_counter()
+            total = sum(pool.map(hash_for, [rounds] * args.cores, [args.seconds] * args.cores))
+            parallel = total / (time.perf_counter() - started)
+
+            if ms <= args.target_ms or rounds == args.min_rounds:
+                chosen = rounds
+            print(f"{rounds:>4}  {ms:>9.1f}  {1000 / ms:>13.1f}  {parallel:>20.1f}")
+            if ms > 4 * args.target_ms:
+                print(f"      (stopping: cost {rounds} is already far past the target)")
+                break
+
+    print(f"\nCalibration would pick cost {chosen} for a {args.target_ms:.0f} ms target")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Micro-benchmark: structured log records per second on the calling thread.
+
+Compares the previous setup (``datetime.utcnow().isoformat()`` +
+``json.dumps`` formatter, FileHandler and StreamHandler called inline)
+with the current JSONFormatter, the QueueHandler/QueueListener mode and
+queue mode with 10% INFO sampling. For queue modes, "drained" includes the
+time for the listener to write everything out.
+
+Usage:
+    python scripts/bench_logging.py --records 100000
+"""
+
+import argparse
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.logger import (
+    JSONFormatter,
+    SamplingFilter,
+    SizeAndTimeRotatingFileHandler,
+    _RecordQueueHandler,
+    orjson,
+)
+
+
+class LegacyJSONFormatter(logging.Formatter):
+    """The formatter as it was before the queue-based logging change."""
+
+    def format(self, record):
+        log_data = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno
+        }
+        if record.exc_info:
+            log_data["exception"] = self.formatException(record.exc_info)
+        if hasattr(record, 'extra_data'):
+            log_data.update(record.extra_data)
+        return json.dumps(log_data)
+
+
+def _handlers(tmp, name, formatter, rotating):
+    devnull = open(os.devnull, "w")
+    console = logging.StreamHandler(devnull)
+    path = os.path.join(tmp, f"{name}.log")
+    if rotating:
+        file_handler = SizeAndTimeRotatingFileHandler(path, max_bytes=50 * 1024 * 1024, when="midnight", backup_count=3)
+    else:
+        file_handler = logging.FileHandler(path)
+    for handler in (console, file_handler):
+        handler.setFormatter(formatter)
+    return [console, file_handler]
+
+
+def _fresh_logger(name):
+    logger = logging.getLogger(f"bench.{name}")
+    logger.handlers.clear()
+    logger.filters.clear()
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def run(label, logger, records, listener=None):
+    extra = {"extra_data": {
+        "admin_id": "6f1c2b1e-0000-4000-8000-000000000000",
+        "admin_email": "admin@sensesafe.com",
+        "action": "VIEW_INCIDENTS",
+        "resource_type": "INCIDENT",
+        "details": {"page": 1, "page_size": 20},
+        "success": True,
+    }}
+    started = time.perf_counter()
+    for i in range(records):
+        logger.info("Admin action: %s on %s", "VIEW_INCIDENTS", "INCIDENT", extra=extra)
+    caller = time.perf_counter() - started
+    if listener is not None:
+        listener.stop()
+    drained = time.perf_counter() - started
+    line = f"{label:<28} {records / caller:>12,.0f} rec/s on caller"
+    if listener is not None:
+        line += f"   {records / drained:>10,.0f} rec/s drained"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Structured logging throughput")
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"JSON encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = _fresh_logger("legacy")
+        for handler in _handlers(tmp, "legacy", LegacyJSONFormatter(), rotating=False):
+            logger.addHandler(handler)
+        run("before: inline, json.dumps", logger, args.records)
+
+        logger = _fresh_logger("inline")
+        for handler in _handlers(tmp, "inline", JSONFormatter(), rotating=True):
+            logger.addHandler(handler)
+        run("inline, fast formatter", logger, args.records)
+
+        for label, rate in (("queue listener", None), ("queue listener, 10% sample", 0.1)):
+            logger = _fresh_logger(label)
+            listener = logging.handlers.QueueListener(
+                queue.SimpleQueue(), *_handlers(tmp, label.replace(" ", "_"), JSONFormatter(), rotating=True),
+                respect_handler_level=True
+            )
+            listener.start()
+            logger.addHandler(_RecordQueueHandler(listener.queue))
+            if rate is not None:
+                logger.addFilter(SamplingFilter(rate))
+            run(label, logger, args.records, listener)
+
+
+if __name__ == "__main__":
+    main()
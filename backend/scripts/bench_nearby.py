@@ -0,0 +1,116 @@
+"""
+Benchmark GET /api/incidents/nearby at a million rows.
+
+Seeds ``--rows`` open incidents (only if the table has fewer) spread over a
+``--spread-deg`` square around a city, then times ``get_nearby_incidents``
+for random points against a naive scan that loads every row's lat/lng and
+computes all the distances. Both must return the same ids. Run it against a
+scratch database:
+
+    DATABASE_URL=sqlite:///./nearby.db python scripts/bench_nearby.py --rows 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+
+from app.db.database import AsyncSessionLocal, create_schema, get_engine, registry
+from app.db.models import Incident, IncidentStatus, INCIDENT_OPEN
+from app.incidents.service import get_nearby_incidents
+from app.utils.geo import haversine_m
+from scripts._bench import percentile
+
+CENTER = (12.9716, 77.5946)
+
+
+def seed(rows: int, spread: float) -> None:
+    engine = get_engine()
+    with engine.begin() as conn:
+        existing = conn.scalar(select(func.count()).select_from(Incident))
+        missing = rows - existing
+        if missing <= 0:
+            return
+        print(f"Seeding {missing} incidents...")
+        start = datetime.utcnow() - timedelta(days=30)
+        batch = []
+        for i in range(missing):
+            batch.append({
+                "id": uuid.uuid4(),
+                "type": random.choice(["Fire", "Flood", "Accident"]),
+                "description": "Benchmark incident for nearby search",
+                "lat": CENTER[0] + random.uniform(-spread, spread) / 2,
+                "lng": CENTER[1] + random.uniform(-spread, spread) / 2,
+                "status": IncidentStatus.PENDING,
+                "created_at": start + timedelta(seconds=i * 2),
+            })
+            if len(batch) == 10_000:
+                conn.execute(insert(Incident), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Incident), batch)
+
+
+async def naive(db, lat: float, lng: float, radius_m: float, page_size: int):
+    """Every open incident's distance, computed in one vectorised pass."""
+    rows = (await db.execute(select(Incident.id, Incident.lat, Incident.lng).where(INCIDENT_OPEN))).all()
+    distances = haversine_m(lat, lng, [r.lat for r in rows], [r.lng for r in rows])
+    inside = (distances <= radius_m).nonzero()[0]
+    ranked = inside[distances[inside].argsort(kind="stable")]
+    return [rows[i].id for i in ranked[:page_size]], len(ranked)
+
+
+async def run(args) -> None:
+    points = [
+        (CENTER[0] + random.uniform(-args.spread_deg, args.spread_deg) / 2,
+         CENTER[1] + random.uniform(-args.spread_deg, args.spread_deg) / 2)
+        for _ in range(args.queries)
+    ]
+    indexed, scanned = [], []
+    async with AsyncSessionLocal() as db:
+        for i, (lat, lng) in enumerate(points):
+            started = time.perf_counter()
+            result = await get_nearby_incidents(db, lat, lng, args.radius_m, page_size=args.page_size)
+            indexed.append(time.perf_counter() - started)
+            db.expunge_all()
+
+            if i < args.naive_queries:
+                started = time.perf_counter()
+                ids, total = await naive(db, lat, lng, args.radius_m, args.page_size)
+                scanned.append(time.perf_counter() - started)
+                if total != result.total or ids != [inc.id for inc in result.incidents]:
+                    sys.exit(f"results differ at ({lat:.5f}, {lng:.5f})")
+
+    print(f"\n{args.radius_m:.0f} m radius, {args.queries} queries ({len(scanned)} naive)\n")
+    print(f"{'mode':<12}{'p50 ms':>10}{'p99 ms':>10}")
+    for label, samples in (("indexed", indexed), ("naive scan", scanned)):
+        print(f"{label:<12}{percentile(samples, 50) * 1000:>10.2f}{percentile(samples, 99) * 1000:>10.2f}")
+    await registry.dispose_async()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nearby incidents: geohash prefilter vs full scan")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--spread-deg", type=float, default=10.0)
+    parser.add_argument("--radius-m", type=float, default=2000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--naive-queries", type=int, default=5)
+    args = parser.parse_args()
+
+    create_schema()
+    seed(args.rows, args.spread_deg)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark OFFSET vs keyset (cursor) pagination from page 1 to page 10,000.
+
+Seeds ``--rows`` incidents (only if the table has fewer) and times the page
+query alone - the COUNT is the same for both modes and left out. Run it
+against a scratch database:
+
+    DATABASE_URL=sqlite:///./bench.db python scripts/bench_pagination.py
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+
+from app.db.database import AsyncSessionLocal, create_schema, get_engine, registry
+from app.db.models import Incident, IncidentStatus
+from app.utils.pagination import NEXT, encode_cursor, paginate
+
+
+def seed(rows: int) -> None:
+    engine = get_engine()
+    with engine.begin() as conn:
+        existing = conn.scalar(select(func.count()).select_from(Incident))
+        missing = rows - existing
+        if missing <= 0:
+            return
+        print(f"Seeding {missing} incidents...")
+        start = datetime.utcnow() - timedelta(days=365)
+        batch = []
+        for i in range(missing):
+            batch.append({
+                "id": uuid.uuid4(),
+                "type": random.choice(["Fire", "Flood", "Accident"]),
+                "description": "Benchmark incident for pagination timing",
+                "lat": random.uniform(-60, 60),
+                "lng": random.uniform(-180, 180),
+                "status": IncidentStatus.PENDING,
+                "created_at": start + timedelta(seconds=i * 7),
+            })
+            if len(batch) == 10_000:
+                conn.execute(insert(Incident), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Incident), batch)
+
+
+async def time_page(page: int, page_size: int, use_cursor: bool, repeats: int) -> float:
+    """Median milliseconds to fetch ``page`` in the chosen mode."""
+    async with AsyncSessionLocal() as db:
+        cursor = None
+        if use_cursor and page > 1:
+            # Cursor a client would hold after reading page-1 pages
+            anchor = (await db.execute(
+                select(Incident.created_at, Incident.id)
+                .order_by(Incident.created_at.desc(), Incident.id.desc())
+                .offset((page - 1) * page_size - 1)
+                .limit(1)
+            )).one()
+            cursor = encode_cursor(anchor.created_at, anchor.id, NEXT)
+
+        samples = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            result = await paginate(db, select(Incident), Incident, page, page_size, cursor)
+            samples.append((time.perf_counter() - started) * 1000)
+            assert len(result.items) == page_size
+            db.expunge_all()
+    return statistics.median(samples)
+
+
+async def run(args) -> None:
+    print(f"\n{'page':>8} {'offset ms':>12} {'cursor ms':>12}")
+    for page in args.pages:
+        offset_ms = await time_page(page, args.page_size, False, args.repeats)
+        cursor_ms = await time_page(page, args.page_size, True, args.repeats)
+        print(f"{page:>8} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+    await registry.dispose_async()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OFFSET vs keyset pagination latency")
+    parser.add_argument("--rows", type=int, default=250_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1_000, 10_000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    needed = max(args.pages) * args.page_size
+    if args.rows < needed:
+        parser.error(f"--rows must be at least {needed} to reach page {max(args.pages)}")
+
+    create_schema()
+    seed(args.rows)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark response serialization time per 100-row page.
+
+Times everything between "the page of ORM rows is loaded" and "the JSON
+body is rendered", for the incidents and admin messages lists:
+
+  before      from_orm / hand-built model per row, FastAPI response-model
+              validation, stdlib JSONResponse
+  validated   to_models (one TypeAdapter pass), response-model validation,
+              ORJSON - what VALIDATE_RESPONSES=true does
+  fast        to_models, respond() without re-validation
+
+Also checks that every mode renders the same JSON. Needs no database:
+
+    python scripts/bench_serialization.py --rows 100 --repeat 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+import warnings
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.config import settings
+from app.db.models import Incident, IncidentStatus, Message, MessageType, User, UserAbility
+from app.incidents.schemas import IncidentListResponse, IncidentResponse
+from app.messages.schemas import MessageListResponse, MessageResponse
+from app.messages.service import _message_data
+from app.utils.serialization import respond, to_models
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)  # from_orm in the "before" path
+
+
+def make_rows(count: int):
+    now = datetime.utcnow()
+    user = User(id=uuid.uuid4(), name="Bench User", email="bench@example.com")
+    incidents = [
+        Incident(
+            id=uuid.uuid4(), user_id=user.id, type="Fire",
+            description="Smoke coming from the third floor of the building",
+            lat=12.9716 + i * 1e-4, lng=77.5946 - i * 1e-4, status=IncidentStatus.PENDING,
+            image_url=None, risk_score=0.42, risk_level="MEDIUM", created_at=now - timedelta(seconds=i)
+        )
+        for i in range(count)
+    ]
+    messages = [
+        Message(
+            id=uuid.uuid4(), user_id=user.id, user=user, message_type=MessageType.SOS,
+            title="SOS Alert: BLIND", content="Need help near the station exit",
+            lat=12.9716, lng=77.5946, category=None, severity=None,
+            ability=UserAbility.BLIND, battery=40, is_read=0, created_at=now - timedelta(seconds=i)
+        )
+        for i in range(count)
+    ]
+    return incidents, messages
+
+
+def page(list_model, key, items):
+    return list_model(**{key: items}, total=len(items), total_exact=True, page=1, page_size=len(items))
+
+
+def validate_and_render(loop, field, body, response_class):
+    content = loop.run_until_complete(serialize_response(field=field, response_content=body))
+    return response_class(content).body
+
+
+def incident_modes(loop, rows):
+    field = create_response_field(name="Response_incidents", type_=IncidentListResponse)
+    return {
+        "before": lambda: validate_and_render(
+            loop, field, page(IncidentListResponse, "incidents", [IncidentResponse.from_orm(r) for r in rows]),
+            JSONResponse),
+        "validated": lambda: validate_and_render(
+            loop, field, page(IncidentListResponse, "incidents", to_models(IncidentResponse, rows)),
+            ORJSONResponse),
+        "fast": lambda: respond(page(IncidentListResponse, "incidents", to_models(IncidentResponse, rows))).body,
+    }
+
+
+def _hand_built(msg):
+    """MessageResponse as messages/service.py used to build it."""
+    return MessageResponse(
+        id=msg.id,
+        user_id=msg.user_id,
+        user_name=msg.user.name if msg.user else None,
+        message_type=msg.message_type,
+        title=msg.title,
+        content=msg.content,
+        lat=msg.lat,
+        lng=msg.lng,
+        category=msg.category,
+        severity=msg.severity,
+        ability=msg.ability,
+        battery=msg.battery,
+        is_read=bool(msg.is_read),
+        created_at=msg.created_at
+    )
+
+
+def message_modes(loop, rows):
+    field = create_response_field(name="Response_messages", type_=MessageListResponse)
+
+    def built():
+        return to_models(MessageResponse, [_message_data(m, m.user.name if m.user else None) for m in rows])
+
+    return {
+        "before": lambda: validate_and_render(
+            loop, field, page(MessageListResponse, "messages", [_hand_built(m) for m in rows]), JSONResponse),
+        "validated": lambda: validate_and_render(
+            loop, field, page(MessageListResponse, "messages", built()), ORJSONResponse),
+        "fast": lambda: respond(page(MessageListResponse, "messages", built())).body,
+    }
+
+
+def time_mode(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialization time per list page")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    if settings.VALIDATE_RESPONSES:
+        sys.exit("Run with VALIDATE_RESPONSES=false")
+
+    loop = asyncio.new_event_loop()
+    incidents, messages = make_rows(args.rows)
+
+    print(f"Median ms per {args.rows}-row page ({args.repeat} runs)\n")
+    print(f"{'endpoint':<18}{'before':>10}{'validated':>12}{'fast':>10}{'speedup':>10}")
+    for label, modes in (("incidents", incident_modes(loop, incidents)),
+                         ("admin messages", message_modes(loop, messages))):
+        bodies = {name: json.loads(fn()) for name, fn in modes.items()}
+        if not all(body == bodies["before"] for body in bodies.values()):
+            sys.exit(f"{label}: rendered JSON differs between modes")
+        timings = {name: time_mode(fn, args.repeat) for name, fn in modes.items()}
+        print(f"{label:<18}{timings['before']:>10.3f}{timings['validated']:>12.3f}{timings['fast']:>10.3f}"
+              f"{timings['before'] / timings['fast']:>9.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
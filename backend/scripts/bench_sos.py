@@ -0,0 +1,93 @@
+"""
+Benchmark POST /api/sos: async data layer vs the previous sync path.
+
+The sync baseline is a minimal app whose handler is a plain ``def`` using
+the blocking SessionLocal, exactly as the route worked before the async
+conversion, so it competes for the same 40-slot threadpool.
+
+Usage:
+    python scripts/bench_sos.py --requests 5000 --concurrency 128
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Depends, FastAPI, status
+from sqlalchemy.orm import Session
+
+from app.db.database import create_schema, get_sync_db
+from app.db.models import SOS, Message, MessageType
+from app.sos.schemas import SOSCreate, SOSResponse
+from scripts._bench import http_load, serve, summarize
+
+
+sync_app = FastAPI()
+
+
+@sync_app.post("/api/sos", response_model=SOSResponse, status_code=status.HTTP_201_CREATED)
+def send_sos_sync(sos_data: SOSCreate, db: Session = Depends(get_sync_db)):
+    """Pre-async implementation of the SOS route, kept only as a baseline."""
+    new_sos = SOS(
+        user_id=None,
+        ability=sos_data.ability,
+        lat=sos_data.lat,
+        lng=sos_data.lng,
+        battery=sos_data.battery,
+        status=sos_data.status,
+    )
+    db.add(new_sos)
+    db.commit()
+    db.refresh(new_sos)
+
+    db.add(Message(
+        user_id=None,
+        message_type=MessageType.SOS,
+        title="🚨 SOS Emergency",
+        content=f"SOS sent. Status: {new_sos.status}",
+        lat=new_sos.lat,
+        lng=new_sos.lng,
+        ability=new_sos.ability,
+        battery=new_sos.battery,
+        is_read=0,
+    ))
+    db.commit()
+
+    return SOSResponse.from_orm(new_sos)
+
+
+SOS_BODY = {"ability": "BLIND", "lat": 40.71, "lng": -74.0, "battery": 42, "status": "TRAPPED"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    create_schema()
+
+    env = {"DEBUG": "false"}
+    targets = [
+        ("sync (threadpool)", "scripts.bench_sos:sync_app"),
+        ("async (AsyncSession)", "app.main:app"),
+    ]
+
+    print(f"POST /api/sos  requests={args.requests}  concurrency={args.concurrency}\n")
+    for label, app_path in targets:
+        with serve(app_path, args.port, env=env):
+            # Warm up connections and the pool before measuring
+            http_load(args.port, "POST", "/api/sos", SOS_BODY, concurrency=4, total=50)
+            latencies, errors, elapsed = http_load(
+                args.port, "POST", "/api/sos", SOS_BODY,
+                concurrency=args.concurrency, total=args.requests,
+            )
+        summarize(label, latencies, errors, elapsed)
+
+
+if __name__ == "__main__":
+    main()
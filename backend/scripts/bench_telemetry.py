@@ -0,0 +1,156 @@
+"""
+Load-test the telemetry exporter against a local TCP stand-in for Azure.
+
+Starts a line-counting TCP server, then has ``--threads`` producers emit
+``--events`` events two ways:
+
+  inline    the old path: send + flush per event on the caller's thread
+  exporter  TelemetryExporter.enqueue (batched by a background thread)
+
+``--sink-latency-ms`` adds a delay per send to mimic the Application
+Insights round-trip and ``--fail-rate`` makes sends fail at random to
+exercise retry/backoff. Reports caller-side latency, delivered events and
+drop counters.
+
+Usage:
+    python scripts/bench_telemetry.py --events 20000 --threads 16 --sink-latency-ms 20
+"""
+
+import argparse
+import os
+import random
+import socketserver
+import sys
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts._bench import summarize
+from app.core.telemetry import SocketSink, TelemetryExporter
+
+
+class _CountingHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for _ in self.rfile:
+            with self.server.lock:
+                self.server.received += 1
+
+
+class CountingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _CountingHandler)
+        self.lock = threading.Lock()
+        self.received = 0
+
+
+class SlowFlakySink(SocketSink):
+    """SocketSink with an artificial round-trip and random failures."""
+
+    def __init__(self, host, port, latency: float, fail_rate: float):
+        super().__init__(host, port)
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self._send_lock = threading.Lock()
+
+    def send(self, batch):
+        time.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            raise ConnectionError("injected failure")
+        with self._send_lock:  # inline mode shares one connection across threads
+            super().send(batch)
+
+
+def _event(i: int) -> dict:
+    return {"name": "AdminAction_VIEW_INCIDENTS", "properties": {"i": str(i), "admin_email": "bench@example.com"}}
+
+
+def drive(emit, events: int, threads: int):
+    """Call ``emit(i)`` ``events`` times from ``threads`` threads; return (latencies, errors, elapsed)."""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    per_thread = events // threads
+
+    def worker(offset):
+        nonlocal errors
+        local, failed = [], 0
+        for i in range(offset, offset + per_thread):
+            started = time.perf_counter()
+            try:
+                emit(i)
+            except Exception:
+                failed += 1
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+            errors += failed
+
+    pool = [threading.Thread(target=worker, args=(n * per_thread,)) for n in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def wait_for(server, expected, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while server.received < expected and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telemetry exporter load test")
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--sink-latency-ms", type=float, default=20.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--queue-size", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--inline-events", type=int, default=500, help="events for the (slow) inline baseline")
+    args = parser.parse_args()
+
+    server = CountingServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    latency = args.sink_latency_ms / 1000
+
+    print(f"Sink: tcp://{host}:{port}, {args.sink_latency_ms:.0f} ms per send, fail rate {args.fail_rate:.0%}")
+
+    # Inline baseline: every event pays the round-trip on the caller's thread
+    inline_sink = SlowFlakySink(host, port, latency, args.fail_rate)
+    results = drive(lambda i: inline_sink.send([_event(i)]), args.inline_events, args.threads)
+    summarize("inline send+flush", *results)
+    wait_for(server, args.inline_events - results[1], timeout=5)
+    inline_sink.close()
+
+    server.received = 0
+    exporter = TelemetryExporter(
+        SlowFlakySink(host, port, latency, args.fail_rate),
+        max_queue=args.queue_size,
+        batch_size=args.batch_size,
+        flush_interval=0.5,
+        backoff_base=0.05,
+        backoff_max=1.0
+    )
+    exporter.start()
+    results = drive(lambda i: exporter.enqueue(_event(i)), args.events, args.threads)
+    summarize("exporter enqueue", *results)
+    exporter.stop(timeout=60)
+
+    stats = exporter.stats()
+    wait_for(server, stats["sent"], timeout=5)
+    print(f"\nExporter: enqueued {stats['enqueued']}, sent {stats['sent']} in {stats['batches']} batches, "
+          f"retries {stats['retries']}")
+    print(f"Dropped: {stats['dropped_overflow']} on overflow, {stats['dropped_failed']} after retries")
+    print(f"Server received: {server.received}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Cold-start budget check for ``import app.main``.
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter
+(best of ``--runs``) and exits non-zero when the cumulative import time is
+over budget. It also fails if the import opened the database, since the
+engine registry is supposed to connect on first use only.
+
+Usage:
+    python scripts/check_import_time.py --budget-ms 2000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) rows from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(env: Dict[str, str]) -> List[Tuple[str, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit("import app.main failed")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if importing app.main exceeds a time budget.")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 2000)))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to print")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        probe_db = os.path.join(tmp, "import_probe.db")
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": f"sqlite:///{probe_db}",
+            "JWT_SECRET": env.get("JWT_SECRET", "import-time-check"),
+            "DEBUG": "false",
+        })
+
+        best = None
+        for _ in range(args.runs):
+            rows = measure(env)
+            total_us = next(cum for module, _, cum in rows if module == "app.main")
+            if best is None or total_us < best[0]:
+                best = (total_us, rows)
+
+        touched_db = os.path.exists(probe_db)
+
+    total_ms = best[0] / 1000
+    print(f"import app.main: {total_ms:.1f} ms (best of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    print("\nSlowest modules by self time:")
+    for module, self_us, cum_us in sorted(best[1], key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:>8.1f} ms  (cumulative {cum_us / 1000:>8.1f} ms)  {module}")
+
+    failed = False
+    if touched_db:
+        print("\nFAIL: importing app.main opened the database")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"\nFAIL: import time {total_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
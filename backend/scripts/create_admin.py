@@ -9,13 +9,14 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, create_schema
 from app.db.models import User, UserRole, UserAbility
 from app.core.security import hash_password
 
 
 def create_admin():
     """Create an admin user."""
+    create_schema()
     db = SessionLocal()
     
     try:
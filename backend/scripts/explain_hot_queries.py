@@ -0,0 +1,277 @@
+"""
+EXPLAIN every hot query and report sequential scans.
+
+Seeds a large dataset (only the rows that are missing), runs ANALYZE, then
+prints the plan of each query the API runs most and exits non-zero if any
+of them reads a whole table. Works on PostgreSQL (EXPLAIN FORMAT JSON) and
+SQLite (EXPLAIN QUERY PLAN). Run it against a scratch database:
+
+    DATABASE_URL=sqlite:///./explain.db python scripts/explain_hot_queries.py
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select, text
+
+from app.db.database import Base, create_schema, get_engine
+from app.db.models import (
+    User, Incident, IncidentGroup, SOS, Alert, Message, AuditLog, Tombstone, StatCounter,
+    AuditRollupHourly, AuditRollupDaily,
+    UserRole, UserAbility, IncidentStatus, SOSStatus, AlertSeverity, MessageType, AuditAction,
+    INCIDENT_OPEN, SOS_ACTIVE, MESSAGE_UNREAD, alert_active,
+)
+from app.utils.counters import bucket_names
+from app.utils.geo import bbox_filter, circle_bbox, covering_cells, geohash_filter
+
+BATCH = 10_000
+
+
+def _bulk_insert(conn, model, count, make_row):
+    existing = conn.scalar(select(func.count()).select_from(model))
+    missing = count - existing
+    if missing <= 0:
+        return
+    print(f"Seeding {missing} {model.__tablename__}...")
+    batch = []
+    for i in range(missing):
+        batch.append(make_row(i))
+        if len(batch) == BATCH:
+            conn.execute(insert(model), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(model), batch)
+
+
+def seed(rows: int, users: int) -> None:
+    """Mostly-closed data, like production: the active sets are small."""
+    start = datetime.utcnow() - timedelta(days=365)
+
+    def stamp(i):
+        return start + timedelta(seconds=i * 13)
+
+    with get_engine().begin() as conn:
+        _bulk_insert(conn, User, users, lambda i: {
+            "id": uuid.uuid4(),
+            "name": f"User {i}",
+            "email": f"explain{i}-{uuid.uuid4().hex[:8]}@example.com",
+            "password_hash": "x",
+            "role": UserRole.ADMIN if i < 10 else UserRole.USER,
+            "ability": UserAbility.NONE,
+            "created_at": stamp(i),
+        })
+        user_ids = conn.scalars(select(User.id)).all()
+        admin_ids = conn.scalars(select(User.id).where(User.role == UserRole.ADMIN)).all() or user_ids
+
+        _bulk_insert(conn, Incident, rows, lambda i: {
+            "id": uuid.uuid4(),
+            "user_id": random.choice(user_ids),
+            "type": "Fire",
+            "description": "Seeded incident",
+            "lat": random.uniform(-60, 60),
+            "lng": random.uniform(-180, 180),
+            "status": IncidentStatus.PENDING if random.random() < 0.03 else IncidentStatus.RESOLVED,
+            "created_at": stamp(i),
+            "updated_at": stamp(i),
+        })
+        _bulk_insert(conn, IncidentGroup, rows, lambda i: {
+            "id": uuid.uuid4(),
+            "type": random.choice(["fire", "flood", "accident"]),
+            "lat": random.uniform(-60, 60),
+            "lng": random.uniform(-180, 180),
+            "report_count": 1,
+            "last_report_at": stamp(i),
+            "created_at": stamp(i),
+        })
+        _bulk_insert(conn, SOS, rows, lambda i: {
+            "id": uuid.uuid4(),
+            "user_id": random.choice(user_ids),
+            "ability": UserAbility.NONE,
+            "lat": random.uniform(-60, 60),
+            "lng": random.uniform(-180, 180),
+            "battery": 50,
+            "status": SOSStatus.TRAPPED if random.random() < 0.03 else SOSStatus.SAFE,
+            "created_at": stamp(i),
+            "updated_at": stamp(i),
+        })
+        _bulk_insert(conn, Message, rows, lambda i: {
+            "id": uuid.uuid4(),
+            "user_id": random.choice(user_ids),
+            "message_type": MessageType.GENERAL,
+            "title": "Seeded message",
+            "content": "Seeded message",
+            "is_read": 0 if random.random() < 0.03 else 1,
+            "created_at": stamp(i),
+            "updated_at": stamp(i),
+        })
+        _bulk_insert(conn, AuditLog, rows, lambda i: {
+            "id": uuid.uuid4(),
+            "admin_id": random.choice(admin_ids),
+            "admin_email": "admin@example.com",
+            "action": random.choice(list(AuditAction)),
+            "resource_type": "INCIDENT",
+            "success": 1,
+            "created_at": stamp(i),
+        })
+        _bulk_insert(conn, Alert, 1_000, lambda i: {
+            "id": uuid.uuid4(),
+            "title": "Seeded alert",
+            "message": "Seeded alert",
+            "severity": AlertSeverity.LOW,
+            "created_at": stamp(i),
+            "updated_at": stamp(i),
+        })
+
+    with get_engine().connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+
+def newest_first(query, model, page_size=20):
+    """The statement app.utils.pagination.paginate runs for page 1."""
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(page_size + 1)
+
+
+def capped_count(query, cap=10_000):
+    """The statement app.utils.counting.count_total runs on a cache miss."""
+    return select(func.count()).select_from(query.limit(cap + 1).subquery())
+
+
+def changed_since(query, model, since, limit=200):
+    """The statement app.utils.sync.load_changes runs for a sync token."""
+    return query.where(model.updated_at > since).order_by(model.updated_at, model.id).limit(limit + 1)
+
+
+def hot_queries(conn):
+    user_id = conn.scalar(select(Incident.user_id).limit(1))
+    admin_id = conn.scalar(select(AuditLog.admin_id).limit(1))
+    user_incidents = select(Incident).where(Incident.user_id == user_id)
+    near = covering_cells(12.97, 77.59, 2_000)
+    recent = datetime.utcnow() - timedelta(minutes=5)
+    return [
+        ("map-data: open incidents", select(Incident).where(INCIDENT_OPEN)),
+        ("map-data: active SOS", select(SOS).where(SOS_ACTIVE)),
+        ("geohash: incidents in neighbour cells", select(Incident).where(geohash_filter(Incident.geohash, near))),
+        ("geohash: SOS in neighbour cells", select(SOS).where(geohash_filter(SOS.geohash, near))),
+        ("stats/sos: SOS counters", select(StatCounter.value).where(StatCounter.name.in_(bucket_names(SOS)))),
+        ("messages: message counters", select(StatCounter.value).where(StatCounter.name.in_(bucket_names(Message)))),
+        ("messages: admin unread page", newest_first(
+            select(Message).join(Message.user).where(MESSAGE_UNREAD), Message)),
+        ("incidents: user history page", newest_first(user_incidents, Incident)),
+        ("incidents: user history total", capped_count(user_incidents)),
+        ("sos: user history page", newest_first(select(SOS).where(SOS.user_id == user_id), SOS)),
+        ("messages: user history page", newest_first(select(Message).where(Message.user_id == user_id), Message)),
+        ("admin: incidents page", newest_first(select(Incident), Incident)),
+        ("grouping: recent groups of a type", select(IncidentGroup.id, IncidentGroup.lat, IncidentGroup.lng).where(
+            IncidentGroup.type == "fire",
+            IncidentGroup.last_report_at >= datetime.utcnow() - timedelta(minutes=30),
+            bbox_filter(IncidentGroup.lat, IncidentGroup.lng, circle_bbox(12.97, 77.59, 250)))),
+        ("admin: incident groups page", newest_first(select(IncidentGroup), IncidentGroup)),
+        ("admin: incident group reports page", newest_first(
+            select(Incident).where(Incident.group_id == uuid.uuid4()), Incident)),
+        ("alerts: page", newest_first(select(Alert), Alert)),
+        ("alerts: active page", newest_first(select(Alert).where(alert_active(datetime.utcnow())), Alert)),
+        ("audit: page", newest_first(select(AuditLog), AuditLog)),
+        ("audit: by admin page", newest_first(select(AuditLog).where(AuditLog.admin_id == admin_id), AuditLog)),
+        ("audit: by action page", newest_first(
+            select(AuditLog).where(AuditLog.action == AuditAction.LOGIN), AuditLog)),
+        ("audit: since date page", newest_first(
+            select(AuditLog).where(AuditLog.created_at >= datetime.utcnow() - timedelta(days=7)), AuditLog)),
+        ("audit stats: partial hours from the log", select(AuditLog.action, func.count())
+            .where(AuditLog.created_at >= datetime.utcnow() - timedelta(hours=1)).group_by(AuditLog.action)),
+        ("audit stats: hourly rollup", select(AuditRollupHourly.action, func.sum(AuditRollupHourly.count))
+            .where(AuditRollupHourly.bucket >= datetime.utcnow() - timedelta(hours=23))
+            .group_by(AuditRollupHourly.action)),
+        ("audit stats: daily rollup", select(AuditRollupDaily.action, func.sum(AuditRollupDaily.count))
+            .where(AuditRollupDaily.bucket >= datetime.utcnow() - timedelta(days=365))
+            .group_by(AuditRollupDaily.action)),
+        ("sync: incidents changed", changed_since(select(Incident), Incident, recent)),
+        ("sync: user SOS changed", changed_since(select(SOS).where(SOS.user_id == user_id), SOS, recent)),
+        ("sync: user messages changed", changed_since(
+            select(Message).where(Message.user_id == user_id), Message, recent)),
+        ("sync: active alerts changed", changed_since(
+            select(Alert).where(alert_active(datetime.utcnow())), Alert, recent)),
+        ("sync: tombstones", select(Tombstone.row_id).where(
+            Tombstone.collection == "messages", Tombstone.deleted_at > recent)),
+    ]
+
+
+def explain_sqlite(conn, sql):
+    """(plan lines, full-scan lines) from EXPLAIN QUERY PLAN."""
+    details = [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    scans = []
+    for detail in details:
+        # "SCAN t" (or "SCAN TABLE t" on older SQLite) without an index reads
+        # the whole table; scans of subqueries/co-routines are not table reads
+        words = detail.replace("SCAN TABLE ", "SCAN ").split()
+        if words[0] == "SCAN" and words[1] in Base.metadata.tables and "INDEX" not in detail:
+            scans.append(detail)
+    return details, scans
+
+
+def explain_postgres(conn, sql):
+    """(plan lines, seq-scan lines) from EXPLAIN (FORMAT JSON)."""
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    lines, scans = [], []
+
+    def walk(node, depth):
+        relation = f" on {node['Relation Name']}" if "Relation Name" in node else ""
+        index = f" using {node['Index Name']}" if "Index Name" in node else ""
+        line = f"{'  ' * depth}{node['Node Type']}{relation}{index} (rows={node['Plan Rows']})"
+        lines.append(line)
+        if node["Node Type"] == "Seq Scan":
+            scans.append(line.strip())
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(plan[0]["Plan"], 0)
+    return lines, scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report sequential scans in the hot query plans")
+    parser.add_argument("--rows", type=int, default=200_000, help="rows per large table")
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    create_schema()
+    if not args.skip_seed:
+        seed(args.rows, args.users)
+
+    engine = get_engine()
+    explain = explain_postgres if engine.dialect.name == "postgresql" else explain_sqlite
+
+    offenders = []
+    with engine.connect() as conn:
+        for label, stmt in hot_queries(conn):
+            sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+            lines, scans = explain(conn, sql)
+            print(f"\n{'SEQ SCAN' if scans else 'ok':>8}  {label}")
+            for line in lines:
+                print(f"          {line}")
+            if scans:
+                offenders.append((label, scans))
+
+    print()
+    if offenders:
+        print(f"{len(offenders)} hot queries read a whole table:")
+        for label, scans in offenders:
+            print(f"  {label}: {'; '.join(scans)}")
+        sys.exit(1)
+    print("No sequential scans in hot queries.")
+
+
+if __name__ == "__main__":
+    main()
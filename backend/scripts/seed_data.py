@@ -11,7 +11,7 @@ import random
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, create_schema
 from app.db.models import (
     User, Incident, SOS, Alert,
     UserRole, UserAbility, IncidentStatus, SOSStatus, AlertSeverity
@@ -21,6 +21,7 @@ from app.core.security import hash_password
 
 def create_test_data():
     """Create test data for development."""
+    create_schema()
     db = SessionLocal()
     
     try:
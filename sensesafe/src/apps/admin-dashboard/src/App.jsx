@@ -11,7 +11,7 @@ import Users from './pages/Users';
 import Analytics from './pages/Analytics';
 import Settings from './pages/Settings';
 import AuditLogs from './pages/AuditLogs';
-import { getAllAlertsForAdmin } from './services/api.js';
+import { getAllAlertsForAdmin, subscribeToAdminEvents } from './services/api.js';
 
 function App() {
   const [alerts, setAlerts] = useState([]);
@@ -92,14 +92,34 @@ function App() {
     }
   }, [isLoggedIn, fetchData]);
 
-  // Refresh data periodically
+  // Refresh when the server pushes an event; coalesce bursts into one fetch
+  useEffect(() => {
+    if (!isLoggedIn) return;
+
+    let pending = null;
+    const unsubscribe = subscribeToAdminEvents((type) => {
+      if (pending) return;
+      pending = setTimeout(() => {
+        pending = null;
+        console.log(`🔄 Refresh after ${type} event...`);
+        fetchData();
+      }, 1000);
+    });
+
+    return () => {
+      unsubscribe();
+      clearTimeout(pending);
+    };
+  }, [isLoggedIn, fetchData]);
+
+  // Slow safety-net refresh in case the event stream is unavailable
   useEffect(() => {
     if (!isLoggedIn) return;
 
     const interval = setInterval(() => {
       console.log('🔄 Periodic refresh...');
       fetchData();
-    }, 10000); // Refresh every 10 seconds for real-time updates
+    }, 60000);
 
     return () => clearInterval(interval);
   }, [isLoggedIn, fetchData]);
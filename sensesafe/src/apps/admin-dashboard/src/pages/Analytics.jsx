@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Users, AlertTriangle, Activity, Clock } from 'lucide-react';
-import { getAllAlertsForAdmin, getAllUsers, getAuditLogs, getSystemHealth } from '../services/api.js';
+import { getDashboard } from '../services/api.js';
 
 function Analytics() {
     const [counts, setCounts] = useState({
@@ -15,26 +15,18 @@ function Analytics() {
     useEffect(() => {
         const fetchAnalytics = async () => {
             try {
-                const [alertsData, usersData, logsData, healthData] = await Promise.all([
-                    getAllAlertsForAdmin(),
-                    getAllUsers({ page_size: 1 }), // Just need count
-                    getAuditLogs({ page_size: 5 }),
-                    getSystemHealth()
-                ]);
-
-                // Calculate active alerts (Active SOS + Active/Pending Incidents)
-                // Note: getAllAlertsForAdmin returns { messages, stats }
-                const activeAlerts = (alertsData.stats?.sos_count || 0) + (alertsData.stats?.incident_count || 0);
+                const dashboard = await getDashboard();
 
                 setCounts({
-                    users: usersData.total || 0,
-                    alerts: activeAlerts,
-                    health: healthData.status === 'healthy' ? '99.9%' : 'Degraded',
+                    users: dashboard.users,
+                    // Active alerts = active SOS + open incidents
+                    alerts: dashboard.sos.active + dashboard.incidents.open,
+                    health: dashboard.status === 'healthy' ? '99.9%' : 'Degraded',
                     avgResponse: '2.3s' // Placeholder as we don't track response time in DB yet
                 });
 
                 // Map audit logs to activity
-                const mappedActivity = (logsData.audit_logs || []).map(log => ({
+                const mappedActivity = dashboard.recent_activity.slice(0, 5).map(log => ({
                     id: log.id,
                     action: log.action.replace('_', ' '),
                     user: log.admin_email ? log.admin_email.split('@')[0] : 'System',
@@ -207,15 +207,16 @@ export const getSOSStats = async () => {
 
 /**
  * Get map data (incidents + SOS markers)
- * @returns {Promise<Object>} Map data with incidents and sos_alerts arrays
+ * @param {Object} [viewport] - Optional {bbox: 'west,south,east,north', zoom}; low zooms return clusters
+ * @returns {Promise<Object>} Map data with incidents, sos_alerts and clusters arrays
  */
-export const getMapData = async () => {
+export const getMapData = async (viewport = {}) => {
   try {
-    const response = await apiClient.get('/api/admin/map-data');
+    const response = await apiClient.get('/api/admin/map-data', { params: viewport });
     return response.data;
   } catch (error) {
     console.error('Get map data error:', error);
-    return { incidents: [], sos_alerts: [] };
+    return { incidents: [], sos_alerts: [], clusters: [] };
   }
 };
 
@@ -626,6 +627,22 @@ export const updateIncident = async (incidentId, updateData) => {
   }
 };
 
+// ==================== DASHBOARD ====================
+
+/**
+ * Get dashboard headline numbers and recent activity (Admin only)
+ * @returns {Promise<Object>} Dashboard snapshot {users, incidents, sos, active_alerts, messages, recent_activity, status}
+ */
+export const getDashboard = async () => {
+  try {
+    const response = await apiClient.get('/api/admin/dashboard');
+    return response.data;
+  } catch (error) {
+    console.error('Get dashboard error:', error);
+    throw error;
+  }
+};
+
 // ==================== AUDIT LOGS ====================
 
 /**
@@ -797,3 +814,60 @@ export const resolveAlert = async (alertId) => {
   }
 };
 
+
+/**
+ * Subscribe to live admin events (Server-Sent Events)
+ * The stream URL carries a single-use ticket rather than the access token, so
+ * every (re)connect first asks for a new ticket and resumes after the last event seen.
+ * @param {Function} onEvent - Called with (type, data); type 'reset' means events were missed
+ * @returns {Function} Unsubscribe
+ */
+export const subscribeToAdminEvents = (onEvent) => {
+  const types = [
+    'sos.created',
+    'sos.status_changed',
+    'incident.created',
+    'incident.status_changed',
+    'alert.created',
+    'message.created',
+    'reset',
+  ];
+  let source = null;
+  let lastEventId = null;
+  let retry = null;
+  let closed = false;
+
+  const reconnect = () => {
+    if (source) source.close();
+    source = null;
+    if (!closed) retry = setTimeout(connect, 3000);
+  };
+
+  const connect = async () => {
+    try {
+      const response = await apiClient.post('/api/admin/stream/ticket');
+      if (closed) return;
+      const params = new URLSearchParams({ ticket: response.data.ticket });
+      if (lastEventId) params.set('last_event_id', lastEventId);
+      source = new EventSource(`${apiClient.defaults.baseURL}/api/admin/stream?${params}`);
+      types.forEach((type) => {
+        source.addEventListener(type, (event) => {
+          if (event.lastEventId) lastEventId = event.lastEventId;
+          onEvent(type, event.data ? JSON.parse(event.data) : null);
+        });
+      });
+      // The ticket is spent; EventSource's own retry would be refused
+      source.onerror = reconnect;
+    } catch (error) {
+      console.error('Event stream ticket error:', error);
+      reconnect();
+    }
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retry);
+    if (source) source.close();
+  };
+};